@@ -0,0 +1,27 @@
+"""Entry point for the clwd command.
+
+Answers --version before the click command tree is imported; everything
+else, including --help, is handled by click.
+"""
+
+import sys
+
+_VERSION_FLAGS = (["--version"], ["-V"])
+
+
+def main() -> None:
+    """Run the Clwd CLI."""
+    if sys.argv[1:] in _VERSION_FLAGS:
+        from clwd import __version__
+
+        # Same format as click.version_option
+        print(f"clwd, version {__version__}")
+        sys.exit(0)
+
+    from clwd.cli.main import cli
+
+    cli(prog_name="clwd")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,159 @@
 """Main CLI interface for Clwd."""
 
-import asyncio
 import sys
-from typing import Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Coroutine, Dict, Iterator, Optional, Sequence, TypeVar, Union
 
 import click
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.prompt import Prompt
-from rich.table import Table
 
 from clwd import __version__
-from clwd.utils.config import Config, ProjectNotFoundError, ProjectExistsError
-from clwd.utils.ssh import ssh_manager, SSHError
-from clwd.utils.keychain import get_claude_authentication, validate_claude_authentication, KeychainError
-from clwd.providers.hetzner import HetznerProvider
-from clwd.providers import ProviderError
 
+if TYPE_CHECKING:
+    import asyncio
 
-console = Console()
+    from rich.console import Console
+    from rich.text import Text
 
+    from clwd.utils.config import Config
 
-def interactive_project_selection(config: Config, action: str = "select", filter_running: bool = False) -> Optional[str]:
+
+# Display colors for instance states; anything else is shown in yellow
+_STATUS_COLORS = {"running": "green"}
+
+# Claude Code settings installed for claude-user on new instances
+_CLAUDE_SETTINGS_JSON = b"""{
+  "$schema": "https://json.schemastore.org/claude-code-settings.json",
+  "permissions": {
+    "defaultMode": "acceptEdits"
+  },
+  "theme": "dark",
+  "autoUpdates": false
+}"""
+
+# Rich, the providers and the config store are imported inside the commands
+# that use them so that `--help`, `--version` and completion only load click.
+_CONSOLE: Optional["Console"] = None
+
+
+def _console() -> "Console":
+    """Get the shared Rich console, creating it on first use."""
+    global _CONSOLE
+    if _CONSOLE is None:
+        from rich.console import Console
+        _CONSOLE = Console()
+    return _CONSOLE
+
+
+@lru_cache(maxsize=None)
+def _label(markup: str) -> "Text":
+    """Parse a static markup label once; combine copies with ``+``."""
+    from rich.text import Text
+    return Text.from_markup(markup)
+
+
+def _status_text(status: str) -> "Text":
+    """Instance status styled by colour, without going through markup."""
+    from rich.text import Text
+    return Text(status, style=_STATUS_COLORS.get(status, "yellow"))
+
+
+def _emit_rows(headers: Sequence[str], rows: Sequence[Sequence[str]]) -> None:
+    """Write rows as tab-separated lines when output is not a terminal.
+    
+    Piped output gets no styling anyway, so Rich's table layout is skipped
+    and the result stays easy to parse with cut, awk or grep.
+    """
+    click.echo("\n".join("\t".join(row) for row in [headers, *rows]))
+
+
+@dataclass
+class _CliState:
+    """State shared by all commands through ``ctx.obj``."""
+    
+    debug: bool = False
+    _config: Optional["Config"] = None
+    
+    @property
+    def config(self) -> "Config":
+        """Project configuration, loaded on first access."""
+        if self._config is None:
+            from clwd.utils.config import Config
+            self._config = Config.load_cached()
+        return self._config
+
+
+class _NullProgress:
+    """Stand-in for rich.progress.Progress when output is not a terminal.
+    
+    Prints one plain line per step instead of running Rich's live display,
+    so redirected output and CI logs stay readable.
+    """
+    
+    def __init__(self, console: "Console") -> None:
+        self._console = console
+    
+    def add_task(self, description: str, **kwargs: Any) -> int:
+        self._console.print(f"[dim]→ {description}[/dim]")
+        return 0
+    
+    def update(self, task_id: int, description: Optional[str] = None, **kwargs: Any) -> None:
+        if description:
+            self._console.print(f"[dim]→ {description}[/dim]")
+
+
+@contextmanager
+def _progress(console: "Console") -> Iterator[Any]:
+    """Show a spinner on terminals and plain step lines everywhere else."""
+    if not console.is_terminal:
+        yield _NullProgress(console)
+        return
+    
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+    ) as progress:
+        yield progress
+
+
+T = TypeVar("T")
+
+
+def _run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a provider coroutine to completion on a fresh event loop.
+    
+    Commands are one-shot rather than long-running servers, so the loop is
+    driven directly instead of through asyncio.run: no SIGINT handler is
+    installed (Ctrl+C surfaces as KeyboardInterrupt to the caller) and there
+    is a single place to configure the loop. uvloop is used when the
+    ``fast`` extra is installed.
+    """
+    loop: "asyncio.AbstractEventLoop"
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        import asyncio
+        loop = asyncio.new_event_loop()
+    
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+def interactive_project_selection(config: "Config", action: str = "select", filter_running: bool = False) -> Optional[str]:
     """Interactive project selection with rich display."""
+    from rich.prompt import Prompt
+    
+    console = _console()
     try:
         projects = config.load_projects()
         if not projects:
@@ -36,43 +167,58 @@ def interactive_project_selection(config: Config, action: str = "select", filter
             # For now, we'll show all projects
             pass
         
-        # Create a table for display
-        table = Table(show_header=True, header_style="bold blue")
-        table.add_column("#", style="dim", width=3)
-        table.add_column("Name", style="cyan")
-        table.add_column("IP Address", style="green")
-        table.add_column("Provider", style="magenta") 
-        table.add_column("Created", style="dim")
-        
-        project_list = []
-        for i, (name, project) in enumerate(projects.items(), 1):
-            table.add_row(
+        # Build every row up front, then the table in one pass
+        project_list = list(projects)
+        rows = [
+            (
                 str(i),
                 name,
                 project.get('ip', 'N/A'),
                 project.get('provider', 'N/A'),
-                project.get('created_at', 'N/A')[:10] if project.get('created_at') else 'N/A'
+                (project.get('created_at') or 'N/A')[:10],
             )
-            project_list.append(name)
+            for i, (name, project) in enumerate(projects.items(), 1)
+        ]
         
         console.print(f"\n[bold]Select a project to {action}:[/bold]")
-        console.print(table)
+        
+        if console.is_terminal:
+            from rich.table import Table
+            
+            table = Table(show_header=True, header_style="bold blue")
+            table.add_column("#", style="dim", width=3, no_wrap=True)
+            table.add_column("Name", style="cyan", no_wrap=True)
+            table.add_column("IP Address", style="green", no_wrap=True)
+            table.add_column("Provider", style="magenta") 
+            table.add_column("Created", style="dim", no_wrap=True)
+            
+            for row in rows:
+                table.add_row(*row)
+            
+            console.print(table)
+        else:
+            _emit_rows(("#", "Name", "IP Address", "Provider", "Created"), rows)
         
         # Simple numbered selection (Rich doesn't have built-in arrow key navigation)
         while True:
             try:
+                # An empty answer quits, the same as 'q'
                 choice = Prompt.ask(
                     "\nEnter project number (or 'q' to quit)",
-                    choices=[str(i) for i in range(1, len(project_list) + 1)] + ['q'],
-                    show_choices=False
-                )
+                    default='q',
+                    show_default=False
+                ).strip()
                 
                 if choice == 'q':
                     return None
-                    
-                return project_list[int(choice) - 1]
                 
-            except (ValueError, IndexError):
+                index = int(choice)
+                if not 1 <= index <= len(project_list):
+                    raise ValueError(choice)
+                
+                return project_list[index - 1]
+                
+            except ValueError:
                 console.print("[red]Invalid selection. Try again.[/red]")
                 
     except Exception as e:
@@ -81,7 +227,7 @@ def interactive_project_selection(config: Config, action: str = "select", filter
 
 
 @click.group()
-@click.version_option(version=__version__)
+@click.version_option(__version__, "--version", "-V")
 @click.option("--debug/--no-debug", default=False, help="Enable debug mode")
 @click.pass_context
 def cli(ctx: click.Context, debug: bool) -> None:
@@ -90,12 +236,12 @@ def cli(ctx: click.Context, debug: bool) -> None:
     Deploy Claude Code instances to the cloud with live preview URLs
     and optional security hardening.
     """
-    ctx.ensure_object(dict)
-    ctx.obj["debug"] = debug
-    ctx.obj["config"] = Config()
+    # The project store is only loaded by commands that read it
+    state = ctx.ensure_object(_CliState)
+    state.debug = debug
     
     if debug:
-        console.print("[dim]Debug mode enabled[/dim]")
+        _console().print("[dim]Debug mode enabled[/dim]")
 
 
 @cli.command()
@@ -126,8 +272,9 @@ def init(
     Creates a new cloud instance with Claude Code pre-installed and
     authenticated, ready for development with live preview URLs.
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     # Resolve project name (positional argument takes precedence over --name option)
     project_name = name or kwargs.get('name')
@@ -149,7 +296,7 @@ def init(
     
     # Run async initialization
     try:
-        asyncio.run(_init_async(ctx, project_name, provider, size, hardening, region, skip_auth))
+        _run_async(_init_async(ctx, project_name, provider, size, hardening, region, skip_auth))
     except KeyboardInterrupt:
         console.print("\n[yellow]Operation cancelled by user[/yellow]")
         sys.exit(1)
@@ -170,8 +317,11 @@ def ssh(ctx: click.Context, name: str, user: str) -> None:
     Connects to the cloud instance with a standard SSH session for 
     debugging, administration, or direct shell access.
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    from clwd.utils.ssh import SSHError, ssh_manager
+    
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     try:
         # Get project from config
@@ -227,7 +377,10 @@ def open(ctx: click.Context, name: Optional[str], **kwargs) -> None:
     Connects to the cloud instance and starts Claude Code in interactive mode
     in the /app directory, ready for development and conversation.
     """
-    config = ctx.obj["config"]
+    from clwd.utils.ssh import SSH_CONNECTION_FAILED, SSHError, ssh_manager
+    
+    console = _console()
+    config = ctx.obj.config
     
     # Resolve project name (positional argument takes precedence over --name option)
     project_name = name or kwargs.get('name')
@@ -236,7 +389,7 @@ def open(ctx: click.Context, name: Optional[str], **kwargs) -> None:
         project_name = interactive_project_selection(config, "open")
         if not project_name:
             sys.exit(0)  # User cancelled or no projects
-    debug = ctx.obj.get("debug", False)
+    debug = ctx.obj.debug
     
     try:
         # Get project from config
@@ -252,20 +405,23 @@ def open(ctx: click.Context, name: Optional[str], **kwargs) -> None:
         # Get SSH session for claude-user
         ssh_session = ssh_manager.get_session(instance.ip, "claude-user")
         
-        # Test connection first
-        if not ssh_session.test_connection(timeout=10):
-            console.print(f"[red]✗ Cannot connect to {instance.ip}[/red]")
-            console.print("[dim]Make sure the instance is running and SSH is available[/dim]")
-            sys.exit(1)
-        
-        # Check if setup is complete (optional warning)
-        try:
-            return_code, _, _ = ssh_session.execute_command("test -f /tmp/clwd-setup-complete", timeout=5)
-            if return_code != 0:
+        # Setup completion never reverts, so once recorded the probe is skipped
+        # and connection errors surface from the session itself
+        if not instance.metadata.get("setup_complete"):
+            # Test the connection and the setup marker in one round trip
+            setup_complete = ssh_session.check_setup_complete(timeout=10)
+            if setup_complete is None:
+                console.print(f"[red]✗ Cannot connect to {instance.ip}[/red]")
+                console.print("[dim]Make sure the instance is running and SSH is available[/dim]")
+                sys.exit(1)
+            
+            if setup_complete:
+                config.update_project(project_name, {
+                    "metadata": {**instance.metadata, "setup_complete": True}
+                })
+            else:
                 console.print("[yellow]⚠ Instance setup may not be complete yet[/yellow]")
                 console.print("[dim]Some services may still be starting up[/dim]")
-        except SSHError:
-            pass  # Setup check is optional
         
         # Start Claude Code interactive session
         console.print("[dim]Starting Claude Code session... (press Ctrl+C to exit)[/dim]\n")
@@ -278,6 +434,10 @@ def open(ctx: click.Context, name: Optional[str], **kwargs) -> None:
             console.print("\n[green]✓ Claude Code session ended normally[/green]")
         elif exit_code == 130:
             console.print("\n[yellow]Claude Code session interrupted by user[/yellow]")
+        elif exit_code == SSH_CONNECTION_FAILED:
+            console.print(f"\n[red]✗ Cannot connect to {instance.ip}[/red]")
+            console.print("[dim]Make sure the instance is running and SSH is available[/dim]")
+            sys.exit(1)
         else:
             console.print(f"\n[yellow]Claude Code session ended with exit code {exit_code}[/yellow]")
         
@@ -314,8 +474,13 @@ def exec(ctx: click.Context, name: str, instruction: str, timeout: int, verbose:
       clwd exec --name myproject "add error handling to the API routes"
       clwd exec --name myproject "refactor the database connection code"
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    import shlex
+    
+    from clwd.utils.ssh import SSHError, ssh_manager
+    
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     try:
         # Get project from config
@@ -337,9 +502,13 @@ def exec(ctx: click.Context, name: str, instruction: str, timeout: int, verbose:
             console.print("[dim]Make sure the instance is running and Claude Code is set up[/dim]")
             sys.exit(1)
         
-        # Build Claude Code command
-        verbose_flag = "--verbose" if verbose else ""
-        claude_command = f"cd /app && claude -p --dangerously-skip-permissions {verbose_flag} '{instruction}'"
+        # Build Claude Code command; quoting keeps the instruction one argument
+        # to the remote shell whatever quotes or metacharacters it contains
+        claude_argv = ["claude", "-p", "--dangerously-skip-permissions"]
+        if verbose:
+            claude_argv.append("--verbose")
+        claude_argv.append(instruction)
+        claude_command = f"cd /app && {shlex.join(claude_argv)}"
         
         if debug:
             console.print(f"[dim]Remote command: {claude_command}[/dim]")
@@ -347,22 +516,15 @@ def exec(ctx: click.Context, name: str, instruction: str, timeout: int, verbose:
         console.print("[dim]Running Claude Code in headless mode...[/dim]")
         console.print("[dim]This may take a few minutes for complex instructions[/dim]")
         
-        # Execute Claude Code command with longer timeout
-        return_code, stdout, stderr = ssh_session.execute_command(
+        # Stream output straight to the terminal as Claude Code produces it
+        # rather than buffering the whole run in memory
+        console.print("\n[bold]Claude Code Output:[/bold]")
+        return_code, _, _ = ssh_session.execute_command(
             claude_command, 
             timeout=timeout,
-            capture_output=True
+            capture_output=False
         )
         
-        # Show output
-        if stdout.strip():
-            console.print("\n[bold]Claude Code Output:[/bold]")
-            console.print(stdout.strip())
-        
-        if stderr.strip():
-            console.print("\n[bold]Error Output:[/bold]")
-            console.print(f"[red]{stderr.strip()}[/red]")
-        
         # Show result
         if return_code == 0:
             console.print(f"\n[green]✓ Claude Code instruction completed successfully[/green]")
@@ -392,8 +554,15 @@ def status(ctx: click.Context, name: str) -> None:
     Displays current status, IP address, and other metadata for the
     specified project instance.
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    from rich.console import Group
+    from rich.table import Table
+    from rich.text import Text
+    
+    from clwd.utils.ssh import ssh_manager
+    
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     try:
         # Get project from config
@@ -403,31 +572,28 @@ def status(ctx: click.Context, name: str) -> None:
             console.print("Use 'clwd config list' to see all projects")
             sys.exit(1)
         
-        console.print(f"[bold]Status for project: {name}[/bold]\n")
-        
         # Display instance information
-        from rich.table import Table
-        
         table = Table(show_header=False, box=None, padding=(0, 2))
         table.add_column("Field", style="bold")
         table.add_column("Value")
         
         table.add_row("Project Name", name)
         table.add_row("Instance ID", instance.id)
-        table.add_row("IP Address", f"[link=http://{instance.ip}]{instance.ip}[/link]")
+        table.add_row("IP Address", Text(instance.ip, style=f"link http://{instance.ip}"))
         table.add_row("Provider", instance.provider)
-        table.add_row("Status", f"[{'green' if instance.status == 'running' else 'yellow'}]{instance.status}[/]")
+        table.add_row("Status", _status_text(instance.status))
         table.add_row("Created", instance.created_at)
         
         if instance.metadata:
             for key, value in instance.metadata.items():
                 table.add_row(key.replace("_", " ").title(), str(value))
         
-        console.print(table)
-        
-        # Additional information
-        console.print(f"\n[bold]Preview URL:[/bold] http://{instance.ip}")
-        console.print(f"[bold]SSH Command:[/bold] ssh root@{instance.ip}")
+        console.print(Group(
+            Text(f"Status for project: {name}\n", style="bold"),
+            table,
+            _label("\n[bold]Preview URL:[/bold] ") + f"http://{instance.ip}",
+            _label("[bold]SSH Command:[/bold] ") + f"ssh root@{instance.ip}",
+        ))
         
         # Test SSH connection if requested
         if debug:
@@ -444,9 +610,11 @@ def status(ctx: click.Context, name: str) -> None:
             else:
                 console.print("[dim]✗ SSH connection not available[/dim]")
         
-        console.print(f"\n[bold]Next steps:[/bold]")
-        console.print(f"  clwd open --name {name}      # Open interactive session")
-        console.print(f"  clwd exec --name {name} 'ls' # Execute command")
+        console.print(Group(
+            _label("\n[bold]Next steps:[/bold]"),
+            Text(f"  clwd open --name {name}      # Open interactive session"),
+            Text(f"  clwd exec --name {name} 'ls' # Execute command"),
+        ))
             
     except Exception as e:
         console.print(f"[red]✗ Error checking status: {e}[/red]")
@@ -466,8 +634,9 @@ def destroy(ctx: click.Context, name: Optional[str], force: bool, **kwargs) -> N
     Permanently destroys the specified cloud instance and removes all data.
     This action cannot be undone.
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     # Resolve project name (positional argument takes precedence over --name option)
     project_name = name or kwargs.get('name')
@@ -486,20 +655,35 @@ def destroy(ctx: click.Context, name: Optional[str], force: bool, **kwargs) -> N
         
         # Confirm destruction
         if not force:
-            console.print(f"[yellow]About to destroy:[/yellow]")
-            console.print(f"  Project: {project_name}")
-            console.print(f"  Instance ID: {instance.id}")
-            console.print(f"  IP Address: {instance.ip}")
-            console.print(f"  Provider: {instance.provider}")
+            from rich.panel import Panel
+            from rich.prompt import Confirm
+            
+            console.print(Panel.fit(
+                f"Project: {project_name}\n"
+                f"Instance ID: {instance.id}\n"
+                f"IP Address: {instance.ip}\n"
+                f"Provider: {instance.provider}",
+                title="[yellow]About to destroy[/yellow]",
+                border_style="yellow",
+            ))
+            
+            try:
+                confirmed = Confirm.ask(
+                    f"Are you sure you want to destroy project '{project_name}'?",
+                    default=False,
+                    console=console,
+                )
+            except EOFError:
+                confirmed = False
             
-            if not click.confirm(f"\nAre you sure you want to destroy project '{project_name}'?"):
+            if not confirmed:
                 console.print("[yellow]Operation cancelled.[/yellow]")
                 return
         
         console.print(f"[bold red]Destroying project: {project_name}[/bold red]")
         
         # Run async destruction
-        asyncio.run(_destroy_async(ctx, project_name, instance))
+        _run_async(_destroy_async(ctx, project_name, instance))
         
     except Exception as e:
         console.print(f"[red]✗ Error destroying project: {e}[/red]")
@@ -518,7 +702,8 @@ def config_group() -> None:
 @click.pass_context
 def config_list(ctx: click.Context) -> None:
     """List all configured projects."""
-    config = ctx.obj["config"]
+    console = _console()
+    config = ctx.obj.config
     
     try:
         project_details = config.list_project_details()
@@ -530,24 +715,33 @@ def config_list(ctx: click.Context) -> None:
         
         console.print(f"[bold]Configured projects ({len(project_details)}):[/bold]\n")
         
+        # Build every row up front, then the table in one pass
+        rows = [
+            (
+                detail["project_name"],
+                detail["status"],
+                detail["ip"],
+                detail["provider"],
+                (detail["created_at"] or "")[:10],
+            )
+            for detail in project_details
+        ]
+        
+        if not console.is_terminal:
+            _emit_rows(("Project", "Status", "IP Address", "Provider", "Created"), rows)
+            return
+        
         from rich.table import Table
         
         table = Table()
-        table.add_column("Project", style="bold")
-        table.add_column("Status")
-        table.add_column("IP Address")
+        table.add_column("Project", style="bold", no_wrap=True)
+        table.add_column("Status", no_wrap=True)
+        table.add_column("IP Address", no_wrap=True)
         table.add_column("Provider") 
-        table.add_column("Created")
+        table.add_column("Created", no_wrap=True)
         
-        for detail in project_details:
-            status_color = "green" if detail["status"] == "running" else "yellow"
-            table.add_row(
-                detail["project_name"],
-                f"[{status_color}]{detail['status']}[/]",
-                detail["ip"],
-                detail["provider"],
-                detail["created_at"][:10] if detail["created_at"] else ""
-            )
+        for project_name, project_status, *rest in rows:
+            table.add_row(project_name, _status_text(project_status), *rest)
         
         console.print(table)
         
@@ -561,7 +755,13 @@ def config_list(ctx: click.Context) -> None:
 @click.pass_context
 def config_show(ctx: click.Context, name: str) -> None:
     """Show detailed configuration for a project."""
-    config = ctx.obj["config"]
+    from rich.panel import Panel
+    from rich.text import Text
+    
+    from clwd.utils.config import format_json
+    
+    console = _console()
+    config = ctx.obj.config
     
     try:
         project_data = config.get_project(name)
@@ -571,11 +771,9 @@ def config_show(ctx: click.Context, name: str) -> None:
         
         console.print(f"[bold]Configuration for project: {name}[/bold]\n")
         
-        from rich.panel import Panel
-        import json
-        
-        # Format the configuration as pretty JSON
-        config_json = json.dumps(project_data, indent=2, sort_keys=True)
+        # Format the configuration as pretty JSON; as Text it is rendered
+        # verbatim rather than re-scanned for markup
+        config_json = Text(format_json(project_data))
         
         panel = Panel(
             config_json,
@@ -601,6 +799,7 @@ def premium_group() -> None:
 @click.pass_context
 def premium_status(ctx: click.Context) -> None:
     """Check premium service status and subscription."""
+    console = _console()
     console.print("[bold]Premium service status:[/bold]")
     console.print("[yellow]Premium service is not yet available.[/yellow]")
 
@@ -609,6 +808,7 @@ def premium_status(ctx: click.Context) -> None:
 @click.pass_context
 def premium_login(ctx: click.Context) -> None:
     """Authenticate with premium service."""
+    console = _console()
     console.print("[bold]Premium service authentication:[/bold]")
     console.print("[yellow]Premium service is not yet available.[/yellow]")
 
@@ -622,8 +822,11 @@ def auth(ctx: click.Context, name: str) -> None:
     Opens an interactive session to run 'claude auth login' on the instance.
     Useful when automatic authentication failed or credentials expired.
     """
-    config = ctx.obj["config"]
-    debug = ctx.obj.get("debug", False)
+    from clwd.utils.ssh import SSHError, ssh_manager
+    
+    console = _console()
+    config = ctx.obj.config
+    debug = ctx.obj.debug
     
     try:
         # Get project from config
@@ -679,35 +882,53 @@ async def _init_async(
     skip_auth: bool,
 ) -> None:
     """Async implementation of init command."""
-    debug = ctx.obj.get("debug", False)
-    config = ctx.obj["config"]
+    import asyncio
     
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
+    from rich.console import Group
+    from rich.text import Text
+    
+    from clwd.providers import ProviderError, get_provider_class
+    from clwd.utils.keychain import get_claude_authentication
+    from clwd.utils.ssh import ssh_manager
+    
+    console = _console()
+    debug = ctx.obj.debug
+    config = ctx.obj.config
+    
+    with _progress(console) as progress:
         task = progress.add_task("Initializing project...", total=None)
         
         try:
-            # Initialize provider
-            progress.update(task, description="Initializing cloud provider...")
-            
-            if provider == "hetzner":
-                cloud_provider = HetznerProvider(region=region or "nbg1")
-            else:
-                raise ValueError(f"Unsupported provider: {provider}")
+            provider_class = get_provider_class(provider)
             
             # Prepare Claude authentication data
             credentials_json = None
             session_json = None  
             claude_json_content = None
             
-            if not skip_auth:
-                progress.update(task, description="Preparing Claude Code authentication...")
+            # Provider setup probes the API; it runs in a thread so the local
+            # keychain read can overlap it. Neither creates anything, so a
+            # failure in either still stops before an instance exists.
+            provider_setup = asyncio.to_thread(provider_class, region=region or "nbg1")
+            
+            if skip_auth:
+                progress.update(task, description="Initializing cloud provider...")
+                cloud_provider = await provider_setup
+            else:
+                progress.update(task, description="Initializing cloud provider and preparing Claude Code authentication...")
+                provider_result, auth_result = await asyncio.gather(
+                    provider_setup,
+                    asyncio.to_thread(get_claude_authentication),
+                    return_exceptions=True,
+                )
+                if isinstance(provider_result, BaseException):
+                    raise provider_result
+                cloud_provider = provider_result
                 
                 try:
-                    credentials_json, session_json = get_claude_authentication()
+                    if isinstance(auth_result, BaseException):
+                        raise auth_result
+                    credentials_json, session_json = auth_result
                     
                     # Follow prototype's fail-fast approach - require keychain credentials
                     if not credentials_json:
@@ -759,75 +980,39 @@ async def _init_async(
 
             if not setup_complete:
                 raise ProviderError("Instance setup did not complete after 5 minutes")
+            config.update_project(name, {
+                "metadata": {**instance.metadata, "setup_complete": True}
+            })
             
             # Copy Claude Code authentication after setup is complete
             if not skip_auth and credentials_json:
                 progress.update(task, description="Copying Claude Code credentials...")
                 
                 try:
-                    # Clear any cached sessions to ensure fresh connection
-                    ssh_manager.clear_all_sessions()
-                    
-                    # Brief delay to ensure SSH daemon is fully ready
-                    await asyncio.sleep(3)
-                    
                     ssh_session = ssh_manager.get_session(instance.ip, "claude-user")
                     
-                    # Test connection first before proceeding
-                    if not ssh_session.test_connection(timeout=10):
-                        raise Exception("SSH connection test failed")
-                    
-                    # Create .claude directory
-                    ssh_session.execute_command("mkdir -p ~/.claude", timeout=30)
-                    
-                    # Copy .credentials.json from keychain
-                    import tempfile
-                    import os
-                    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_creds:
-                        temp_creds.write(credentials_json)
-                        temp_creds_path = temp_creds.name
-                    
-                    try:
-                        if ssh_session.copy_file_to_remote(temp_creds_path, "~/.claude/.credentials.json"):
-                            console.print("[green]✓[/green] Keychain credentials copied")
-                        else:
-                            console.print("[yellow]⚠[/yellow] Could not copy keychain credentials")
-                    finally:
-                        os.unlink(temp_creds_path)
-                    
-                    # Copy full .claude.json content (from session_json)
-                    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_session:
-                        temp_session.write(session_json)
-                        temp_session_path = temp_session.name
+                    # Keychain credentials, the full session and settings go
+                    # over in a single SSH round trip
+                    if session_json is None:
+                        raise RuntimeError("Claude Code session not found")
+                    files: Dict[str, Union[str, bytes]] = {
+                        ".claude/.credentials.json": credentials_json,
+                        ".claude.json": session_json,
+                        ".claude/settings.json": _CLAUDE_SETTINGS_JSON,
+                    }
                     
-                    try:
-                        if ssh_session.copy_file_to_remote(temp_session_path, "~/.claude.json"):
-                            console.print("[green]✓[/green] Full Claude session copied")
-                        else:
-                            console.print("[yellow]⚠[/yellow] Could not copy Claude session file")
-                    finally:
-                        os.unlink(temp_session_path)
+                    # The upload doubles as the connection check; only if it
+                    # fails do we wait for the claude-user login and retry
+                    copied = ssh_session.write_files(files)
+                    if not copied:
+                        if not ssh_session.wait_for_connection(timeout=30):
+                            raise Exception("SSH connection test failed")
+                        copied = ssh_session.write_files(files)
                     
-                    # Create settings.json
-                    settings_content = """{
-  "$schema": "https://json.schemastore.org/claude-code-settings.json",
-  "permissions": {
-    "defaultMode": "acceptEdits"
-  },
-  "theme": "dark",
-  "autoUpdates": false
-}"""
-                    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_settings:
-                        temp_settings.write(settings_content)
-                        temp_settings_path = temp_settings.name
-                    
-                    try:
-                        if ssh_session.copy_file_to_remote(temp_settings_path, "~/.claude/settings.json"):
-                            console.print("[green]✓[/green] Claude Code settings configured")
-                        else:
-                            console.print("[yellow]⚠[/yellow] Could not copy settings file")
-                    finally:
-                        os.unlink(temp_settings_path)
+                    if copied:
+                        console.print("[green]✓[/green] Claude Code credentials, session and settings copied")
+                    else:
+                        console.print("[yellow]⚠[/yellow] Could not copy Claude Code credentials")
                         
                 except Exception as e:
                     console.print(f"[yellow]⚠[/yellow] Could not copy credentials via SSH: {e}")
@@ -838,47 +1023,48 @@ async def _init_async(
         except Exception as e:
             raise RuntimeError(f"Unexpected error: {e}")
     
-    # Success message
-    console.print(f"[green]✓ Project '{name}' created successfully![/green]")
-    console.print(f"[dim]Provider: {provider} | Size: {size} | Hardening: {hardening}[/dim]")
-    console.print(f"[dim]IP Address: {instance.ip}[/dim]")
-    console.print(f"[dim]Instance ID: {instance.id}[/dim]")
-    
-    console.print("\n[bold]Next steps:[/bold]")
-    console.print(f"  clwd open --name {name}     # Open interactive session")
-    console.print(f"  clwd status --name {name}   # Check instance status") 
-    console.print(f"  clwd destroy --name {name}  # Destroy when done")
-    
-    console.print(f"\n[bold]Preview URL:[/bold] http://{instance.ip}")
-    console.print("[dim]Note: It may take a few minutes for services to start[/dim]")
+    # Success message, rendered in a single pass
+    console.print(Group(
+        Text.from_markup(f"[green]✓ Project '{name}' created successfully![/green]"),
+        Text.from_markup(f"[dim]Provider: {provider} | Size: {size} | Hardening: {hardening}[/dim]"),
+        Text.from_markup(f"[dim]IP Address: {instance.ip}[/dim]"),
+        Text.from_markup(f"[dim]Instance ID: {instance.id}[/dim]"),
+        Text.from_markup("\n[bold]Next steps:[/bold]"),
+        Text(f"  clwd open --name {name}     # Open interactive session"),
+        Text(f"  clwd status --name {name}   # Check instance status"),
+        Text(f"  clwd destroy --name {name}  # Destroy when done"),
+        Text.from_markup(f"\n[bold]Preview URL:[/bold] http://{instance.ip}"),
+        Text.from_markup("[dim]Note: It may take a few minutes for services to start[/dim]"),
+    ))
 
 
 async def _destroy_async(ctx: click.Context, name: str, instance) -> None:
     """Async implementation of destroy command."""
-    config = ctx.obj["config"]
+    from clwd.providers import get_provider_class
+    from clwd.utils.ssh import ssh_manager
     
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
+    console = _console()
+    config = ctx.obj.config
+    
+    with _progress(console) as progress:
         task = progress.add_task("Destroying instance...", total=None)
         
         try:
             # Initialize provider
             progress.update(task, description="Initializing cloud provider...")
             
-            if instance.provider == "hetzner":
-                # Get region from metadata if available
-                region = instance.metadata.get("region", "nbg1")
-                cloud_provider = HetznerProvider(region=region)
-            else:
-                raise ValueError(f"Unsupported provider: {instance.provider}")
+            # Get region from metadata if available
+            region = instance.metadata.get("region", "nbg1")
+            cloud_provider = get_provider_class(instance.provider)(region=region)
             
             # Destroy cloud instance
             progress.update(task, description="Destroying cloud instance...")
             await cloud_provider.destroy_instance(instance.id)
             
+            # Drop shared SSH connections to the old address
+            for user in ("root", "claude-user"):
+                ssh_manager.remove_session(instance.ip, user)
+            
             # Remove from config
             progress.update(task, description="Removing project configuration...")
             config.remove_project(name)
@@ -1,46 +1,66 @@
 """CLI settings and environment variables."""
 
 import os
+import re
+from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+# KEY=value lines; blank lines and lines starting with # never match
+_ENV_LINE = re.compile(r"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=([^\n]*)$", re.MULTILINE)
 
 
 class Settings:
-    """Global settings for Clwd CLI."""
+    """Global settings for Clwd CLI.
+    
+    Values come from the environment as it was before any .env file in the
+    working directory was loaded; both are read when a value is first used.
+    The .env file only fills in variables for code that reads os.environ.
+    """
     
     def __init__(self) -> None:
-        """Initialize settings from environment variables."""
-        # Premium service configuration
-        self.premium_server_url = os.getenv("CLWD_PREMIUM_SERVER_URL", "https://premium.clwd.com")
-        self.premium_token_file = os.path.expanduser(
-            os.getenv("CLWD_PREMIUM_TOKEN_FILE", "~/.clwd/premium_token")
+        """Initialize settings; nothing is read until a value is used."""
+        self._environ: Optional[Dict[str, str]] = None
+    
+    def _getenv(self, key: str, default: str) -> str:
+        """Read an environment variable as it was before .env was loaded."""
+        if self._environ is None:
+            self._environ = dict(os.environ)
+            self._load_env_file()
+        return self._environ.get(key, default)
+    
+    @cached_property
+    def premium_server_url(self) -> str:
+        """Premium service URL."""
+        return self._getenv("CLWD_PREMIUM_SERVER_URL", "https://premium.clwd.com")
+    
+    @cached_property
+    def premium_token_file(self) -> str:
+        """Path of the premium token file."""
+        return os.path.expanduser(
+            self._getenv("CLWD_PREMIUM_TOKEN_FILE", "~/.clwd/premium_token")
         )
-        
-        # Standard provisioning fallback
-        self.hetzner_api_token = os.getenv("HETZNER_API_TOKEN", "")
-        
-        # Debug mode
-        self.debug = os.getenv("CLWD_DEBUG", "false").lower() in ("true", "1", "yes")
-        
-        # Load .env file if it exists
-        self._load_env_file()
+    
+    @cached_property
+    def hetzner_api_token(self) -> str:
+        """Hetzner API token for standard provisioning."""
+        return self._getenv("HETZNER_API_TOKEN", "")
+    
+    @cached_property
+    def debug(self) -> bool:
+        """Whether debug mode is enabled."""
+        return self._getenv("CLWD_DEBUG", "false").lower() in ("true", "1", "yes")
     
     def _load_env_file(self) -> None:
         """Load .env file if it exists."""
-        env_file = Path.cwd() / ".env"
-        if env_file.exists():
-            try:
-                with open(env_file) as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith("#") and "=" in line:
-                            key, value = line.split("=", 1)
-                            key = key.strip()
-                            value = value.strip().strip('"').strip("'")
-                            if key and not os.getenv(key):
-                                os.environ[key] = value
-            except Exception:
-                pass  # Silently ignore .env file errors
+        try:
+            content = (Path.cwd() / ".env").read_text()
+        except Exception:
+            return  # Missing or unreadable .env files are ignored
+        
+        for key, value in _ENV_LINE.findall(content):
+            if not os.environ.get(key):
+                os.environ[key] = value.strip().strip('"').strip("'")
     
     @property
     def is_premium_configured(self) -> bool:
@@ -58,5 +78,9 @@ class Settings:
         return bool(self.hetzner_api_token)
 
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+def __getattr__(name: str) -> Settings:
+    """Create the global ``settings`` instance on first import or access."""
+    if name == "settings":
+        instance = globals()["settings"] = Settings()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,21 @@
 """Cloud provider implementations for Clwd."""
 
+import importlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping, Type, cast
 from datetime import datetime
 
 
+# Instance fields that must be non-empty, with their names for error messages
+_REQUIRED_INSTANCE_FIELDS = (
+    ("id", "ID"),
+    ("name", "name"),
+    ("ip", "IP"),
+    ("provider", "provider"),
+)
+
+
 @dataclass
 class Instance:
     """Represents a cloud instance with all associated metadata."""
@@ -20,14 +30,12 @@ class Instance:
     
     def __post_init__(self) -> None:
         """Validate instance data after initialization."""
-        if not self.id:
-            raise ValueError("Instance ID cannot be empty")
-        if not self.name:
-            raise ValueError("Instance name cannot be empty")
-        if not self.ip:
-            raise ValueError("Instance IP cannot be empty")
-        if not self.provider:
-            raise ValueError("Instance provider cannot be empty")
+        # One combined test on the common path; name the culprit only on failure
+        if self.id and self.name and self.ip and self.provider:
+            return
+        for field_name, label in _REQUIRED_INSTANCE_FIELDS:
+            if not getattr(self, field_name):
+                raise ValueError(f"Instance {label} cannot be empty")
 
 
 class Provider(ABC):
@@ -37,6 +45,15 @@ class Provider(ABC):
     and implement the required abstract methods.
     """
     
+    def __init__(self, region: Optional[str] = None, **kwargs: Any) -> None:
+        """Initialize the provider for a region.
+        
+        Args:
+            region: Provider region code, or None for the provider's default
+            **kwargs: Provider-specific options, such as credentials
+        """
+        self.region = region
+    
     @abstractmethod
     async def create_instance(
         self,
@@ -113,11 +130,11 @@ class Provider(ABC):
         pass
     
     @abstractmethod
-    def get_supported_regions(self) -> Dict[str, str]:
+    def get_supported_regions(self) -> Mapping[str, str]:
         """Get supported regions for this provider.
         
         Returns:
-            Dict mapping region codes to region names
+            Mapping of region codes to region names
         """
         pass
 
@@ -143,4 +160,32 @@ class QuotaExceededError(ProviderError):
 
 class AuthenticationError(ProviderError):
     """Raised when provider authentication fails."""
-    pass
\ No newline at end of file
+    pass
+
+
+# Registered providers as "module:Class", imported only when selected so
+# a provider's SDK never loads for commands that do not use it
+PROVIDERS: Dict[str, str] = {
+    "hetzner": "clwd.providers.hetzner:HetznerProvider",
+}
+
+
+def get_provider_class(name: str) -> Type[Provider]:
+    """Look up and import the provider class registered under a name.
+    
+    Args:
+        name: Provider name, e.g. "hetzner"
+        
+    Returns:
+        Provider subclass
+        
+    Raises:
+        ValueError: If no provider is registered under the name
+    """
+    try:
+        target = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported provider: {name}")
+    
+    module_name, _, class_name = target.partition(":")
+    return cast(Type[Provider], getattr(importlib.import_module(module_name), class_name))
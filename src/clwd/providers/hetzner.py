@@ -3,11 +3,12 @@
 import asyncio
 import base64
 import os
-import socket
 import time
+import zlib
 from pathlib import Path
-from typing import Dict, Any, Optional
-from datetime import datetime
+from types import MappingProxyType
+from typing import ClassVar, Dict, Any, Mapping, Optional, Set, Tuple
+from datetime import datetime, timezone
 
 from hcloud import Client, APIException
 from hcloud.server_types import ServerType
@@ -23,155 +24,12 @@ from . import (
     QuotaExceededError
 )
 
-
-class HetznerProvider(Provider):
-    """Hetzner Cloud provider implementation using the official hcloud SDK.
-    
-    This provider handles server creation, management, and destruction on
-    Hetzner Cloud infrastructure with full support for cloud-init scripts
-    and SSH key management.
-    """
-    
-    # Server type mapping for different sizes
-    SIZE_MAP = {
-        "small": "cpx11",   # 2 vCPU, 4GB RAM - €4.51/month
-        "medium": "cpx21",  # 3 vCPU, 8GB RAM - €9.07/month  
-        "large": "cpx31",   # 4 vCPU, 16GB RAM - €17.86/month
-    }
-    
-    # Supported regions
-    REGIONS = {
-        "nbg1": "Nuremberg DC Park 1",
-        "fsn1": "Falkenstein DC Park 1", 
-        "hel1": "Helsinki DC Park 1",
-        "ash": "Ashburn, VA",
-        "hil": "Hillsboro, OR",
-    }
-    
-    def __init__(self, api_token: Optional[str] = None, region: str = "nbg1") -> None:
-        """Initialize Hetzner provider.
-        
-        Args:
-            api_token: Hetzner API token. If None, uses HETZNER_API_TOKEN env var
-            region: Hetzner region code (default: nbg1)
-            
-        Raises:
-            AuthenticationError: If API token is missing or invalid
-        """
-        self.api_token = api_token or os.getenv("HETZNER_API_TOKEN")
-        if not self.api_token:
-            raise AuthenticationError(
-                "Hetzner API token not provided. Set HETZNER_API_TOKEN environment variable.",
-                provider="hetzner"
-            )
-        
-        self.region = region
-        if region not in self.REGIONS:
-            raise ValueError(f"Unsupported region: {region}. Supported: {list(self.REGIONS.keys())}")
-        
-        try:
-            self.client = Client(token=self.api_token)
-            # Test the connection
-            self.client.server_types.get_all()
-        except APIException as e:
-            raise AuthenticationError(
-                f"Failed to authenticate with Hetzner API: {e}",
-                provider="hetzner"
-            )
-    
-    def _get_local_ssh_key(self) -> str:
-        """Find and read local SSH public key.
-        
-        Returns:
-            SSH public key content
-            
-        Raises:
-            ValueError: If no SSH key is found
-        """
-        ssh_key_paths = [
-            "~/.ssh/id_ed25519.pub",
-            "~/.ssh/id_rsa.pub", 
-            "~/.ssh/id_ecdsa.pub"
-        ]
-        
-        for key_path in ssh_key_paths:
-            expanded_path = Path(key_path).expanduser()
-            if expanded_path.exists():
-                return expanded_path.read_text().strip()
-        
-        raise ValueError(
-            "No SSH key found. Please generate one with: ssh-keygen -t ed25519"
-        )
-    
-    def _ensure_ssh_key_uploaded(self) -> SSHKey:
-        """Ensure local SSH key is uploaded to Hetzner Cloud.
-        
-        Returns:
-            SSHKey object from Hetzner Cloud
-            
-        Raises:
-            ProviderError: If SSH key upload fails
-        """
-        try:
-            local_key_content = self._get_local_ssh_key()
-            
-            # Check if key already exists
-            existing_keys = self.client.ssh_keys.get_all()
-            for key in existing_keys:
-                if key.public_key.strip() == local_key_content.strip():
-                    return key
-            
-            # Upload new key
-            ssh_key = self.client.ssh_keys.create(
-                name=f"clwd-{int(time.time())}",
-                public_key=local_key_content,
-                labels={"managed-by": "clwd"}
-            )
-            
-            return ssh_key
-            
-        except APIException as e:
-            raise ProviderError(
-                f"Failed to upload SSH key to Hetzner: {e}",
-                provider="hetzner"
-            )
-    
-    def _generate_cloud_init_script(
-        self, 
-        name: str, 
-        hardening_level: str = "none",
-        claude_json_content: Optional[str] = None
-    ) -> str:
-        """Generate cloud-init script for server setup.
-        
-        Args:
-            name: Project name
-            hardening_level: Security hardening level (none, minimal, full)
-            claude_json_content: Claude Code authentication content
-            
-        Returns:
-            Base64-encoded cloud-init script
-        """
-        script_parts = [
-            self._get_base_setup_script(),
-            self._get_nodejs_setup_script(),
-            self._get_claude_setup_script(claude_json_content),
-            self._get_nginx_setup_script(),
-            self._get_hardening_script(hardening_level),
-            self._get_completion_script()
-        ]
-        
-        script = "\n".join(script_parts)
-        return base64.b64encode(script.encode('utf-8')).decode('ascii')
-    
-    def _get_base_setup_script(self) -> str:
-        """Get base system setup script."""
-        return """#!/bin/bash
+_BASE_SCRIPT = """#!/bin/bash
 set -e
 
 # Update system and install base packages
 apt-get update
-apt-get install -y curl wget gnupg2 software-properties-common nginx ufw sudo
+apt-get install -y curl wget gnupg2 software-properties-common nginx ufw sudo inotify-tools
 
 # Create claude-user with proper home directory
 useradd -m -s /bin/bash claude-user
@@ -191,30 +49,29 @@ chmod 600 /home/claude-user/.ssh/authorized_keys
 
 # Allow claude-user sudo without password for initial setup
 echo 'claude-user ALL=(ALL) NOPASSWD:ALL' > /etc/sudoers.d/claude-user"""
-    
-    def _get_nodejs_setup_script(self) -> str:
-        """Get Node.js installation script."""
-        return """
+
+_NODEJS_SCRIPT = """
 # Install Node.js 20.x
 curl -fsSL https://deb.nodesource.com/setup_20.x | bash -
 apt-get install -y nodejs
 
 # Install Claude Code CLI
 npm install -g @anthropic-ai/claude-code"""
-    
-    def _get_claude_setup_script(self, claude_json_content: Optional[str]) -> str:
-        """Get Claude Code authentication setup script."""
-        if not claude_json_content:
-            return """
+
+_CLAUDE_NO_AUTH_SCRIPT = """
 # No Claude authentication provided - manual setup required
 echo "# Claude Code authentication not configured" > /app/README.md
 echo "# Run 'claude auth login' to authenticate" >> /app/README.md"""
-        
-        return f"""
+
+# Written around the Claude authentication content, which is streamed
+# in between rather than formatted into a copy of the script
+_CLAUDE_AUTH_HEAD = """
 # Set up Claude Code authentication for claude-user
 mkdir -p /home/claude-user/.claude
 cat > /home/claude-user/.claude.json << 'EOF'
-{claude_json_content}
+"""
+
+_CLAUDE_AUTH_TAIL = """
 EOF
 chown -R claude-user:claude-user /home/claude-user/.claude
 chmod 700 /home/claude-user/.claude
@@ -222,21 +79,19 @@ chmod 644 /home/claude-user/.claude.json
 
 # Create Claude Code settings
 cat > /home/claude-user/.claude/settings.json << 'EOF'
-{{
+{
   "$schema": "https://json.schemastore.org/claude-code-settings.json",
-  "permissions": {{
+  "permissions": {
     "defaultMode": "acceptEdits"
-  }},
+  },
   "theme": "dark",
   "autoUpdates": false
-}}
+}
 EOF
 chown claude-user:claude-user /home/claude-user/.claude/settings.json
 chmod 600 /home/claude-user/.claude/settings.json"""
-    
-    def _get_nginx_setup_script(self) -> str:
-        """Get Nginx configuration script."""
-        return """
+
+_NGINX_SCRIPT = """
 # Configure Nginx for preview
 cat > /etc/nginx/sites-available/default << 'EOF'
 server {
@@ -293,16 +148,14 @@ cat > /app/index.html << 'EOF'
 EOF
 
 systemctl restart nginx"""
-    
-    def _get_hardening_script(self, hardening_level: str) -> str:
-        """Get security hardening script based on level."""
-        if hardening_level == "none":
-            return """
+
+# Security hardening scripts keyed by level
+_HARDENING_SCRIPTS = {
+    "none": """
 # Development mode - minimal hardening
 # Keep password authentication enabled for development
-# Allow root login for debugging"""
-        elif hardening_level == "minimal":
-            return """
+# Allow root login for debugging""",
+    "minimal": """
 # Minimal security hardening - development friendly
 ufw --force enable
 ufw allow ssh
@@ -320,9 +173,8 @@ sed -i 's/#PubkeyAuthentication yes/PubkeyAuthentication yes/' /etc/ssh/sshd_con
 apt-get install -y unattended-upgrades
 echo 'Unattended-Upgrade::Automatic-Reboot "false";' >> /etc/apt/apt.conf.d/50unattended-upgrades
 
-systemctl restart sshd"""
-        elif hardening_level == "full":
-            return """
+systemctl restart sshd""",
+    "full": """
 # Full security hardening - production ready
 ufw --force enable
 ufw allow ssh
@@ -363,16 +215,208 @@ echo 'claude-user ALL=(ALL) ALL' > /etc/sudoers.d/claude-user-secure
 apt-get install -y unattended-upgrades
 echo 'Unattended-Upgrade::Automatic-Reboot "false";' >> /etc/apt/apt.conf.d/50unattended-upgrades
 
-systemctl restart sshd"""
-        else:
-            return "# Unknown hardening level"
-    
-    def _get_completion_script(self) -> str:
-        """Get setup completion marker script."""
-        return """
+systemctl restart sshd""",
+}
+
+_COMPLETION_SCRIPT = """
 # Mark setup as complete
 touch /tmp/clwd-setup-complete
 echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
+
+
+def _build_cloud_init(hardening_level: str, claude_json_content: Optional[str]) -> str:
+    """Assemble, gzip and base64-encode the cloud-init script.
+    
+    cloud-init detects gzip payloads and decompresses them itself, which
+    keeps large Claude session data well inside the user_data size limit.
+    
+    Args:
+        hardening_level: Security hardening level (none, minimal, full)
+        claude_json_content: Claude Code authentication content
+        
+    Returns:
+        Base64-encoded, gzip-compressed cloud-init script
+    """
+    claude_parts: Tuple[str, ...]
+    if claude_json_content:
+        claude_parts = (_CLAUDE_AUTH_HEAD, claude_json_content, _CLAUDE_AUTH_TAIL)
+    else:
+        claude_parts = (_CLAUDE_NO_AUTH_SCRIPT,)
+    
+    parts = (
+        _BASE_SCRIPT, "\n",
+        _NODEJS_SCRIPT, "\n",
+        *claude_parts, "\n",
+        _NGINX_SCRIPT, "\n",
+        _HARDENING_SCRIPTS.get(hardening_level, "# Unknown hardening level"), "\n",
+        _COMPLETION_SCRIPT,
+    )
+    
+    # Feed the parts straight into one gzip stream instead of joining and
+    # encoding the whole script first
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    compressed = b"".join([compressor.compress(part.encode('utf-8')) for part in parts])
+    compressed += compressor.flush()
+    return base64.b64encode(compressed).decode('ascii')
+
+
+class HetznerProvider(Provider):
+    """Hetzner Cloud provider implementation using the official hcloud SDK.
+    
+    This provider handles server creation, management, and destruction on
+    Hetzner Cloud infrastructure with full support for cloud-init scripts
+    and SSH key management.
+    """
+    
+    # Server type mapping for different sizes (read-only)
+    SIZE_MAP: Mapping[str, str] = MappingProxyType({
+        "small": "cpx11",   # 2 vCPU, 4GB RAM - €4.51/month
+        "medium": "cpx21",  # 3 vCPU, 8GB RAM - €9.07/month  
+        "large": "cpx31",   # 4 vCPU, 16GB RAM - €17.86/month
+    })
+    
+    # Supported regions (read-only, so it can be handed out without copying)
+    REGIONS: Mapping[str, str] = MappingProxyType({
+        "nbg1": "Nuremberg DC Park 1",
+        "fsn1": "Falkenstein DC Park 1", 
+        "hel1": "Helsinki DC Park 1",
+        "ash": "Ashburn, VA",
+        "hil": "Hillsboro, OR",
+    })
+    
+    # Tokens that already passed the authentication probe in this process
+    _verified_tokens: ClassVar[Set[str]] = set()
+    
+    def __init__(self, api_token: Optional[str] = None, region: str = "nbg1") -> None:
+        """Initialize Hetzner provider.
+        
+        Args:
+            api_token: Hetzner API token. If None, uses HETZNER_API_TOKEN env var
+            region: Hetzner region code (default: nbg1)
+            
+        Raises:
+            AuthenticationError: If API token is missing or invalid
+        """
+        self.api_token = api_token or os.getenv("HETZNER_API_TOKEN")
+        if not self.api_token:
+            raise AuthenticationError(
+                "Hetzner API token not provided. Set HETZNER_API_TOKEN environment variable.",
+                provider="hetzner"
+            )
+        
+        self.region: str = region
+        if region not in self.REGIONS:
+            raise ValueError(f"Unsupported region: {region}. Supported: {list(self.REGIONS.keys())}")
+        
+        # Server types, images and locations by name; static for the process lifetime
+        self._catalog: Dict[Tuple[str, str], Any] = {}
+        
+        try:
+            # The client holds one keep-alive HTTP session; every API call made
+            # through this provider reuses its pooled connection
+            self.client = Client(token=self.api_token)
+            
+            # Test the connection once per token; a single-item page is the
+            # cheapest authenticated request
+            if self.api_token not in self._verified_tokens:
+                self.client.server_types.get_list(page=1, per_page=1)
+                self._verified_tokens.add(self.api_token)
+        except APIException as e:
+            raise AuthenticationError(
+                f"Failed to authenticate with Hetzner API: {e}",
+                provider="hetzner"
+            )
+    
+    def _get_local_ssh_key(self) -> str:
+        """Find and read local SSH public key.
+        
+        Returns:
+            SSH public key content
+            
+        Raises:
+            ValueError: If no SSH key is found
+        """
+        ssh_dir = Path("~/.ssh").expanduser()
+        
+        # In order of preference; reading directly avoids a stat per candidate
+        for key_name in ("id_ed25519.pub", "id_rsa.pub", "id_ecdsa.pub"):
+            try:
+                return (ssh_dir / key_name).read_text().strip()
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        
+        raise ValueError(
+            "No SSH key found. Please generate one with: ssh-keygen -t ed25519"
+        )
+    
+    def _get_by_name(self, kind: str, name: str) -> Any:
+        """Look up a catalog resource by name, caching hits.
+        
+        Args:
+            kind: Client resource collection (server_types, images, locations)
+            name: Resource name
+            
+        Returns:
+            The resource, or None if it does not exist
+        """
+        key = (kind, name)
+        resource = self._catalog.get(key)
+        if resource is None:
+            resource = getattr(self.client, kind).get_by_name(name)
+            if resource is not None:
+                self._catalog[key] = resource
+        return resource
+    
+    def _ensure_ssh_key_uploaded(self) -> SSHKey:
+        """Ensure local SSH key is uploaded to Hetzner Cloud.
+        
+        Returns:
+            SSHKey object from Hetzner Cloud
+            
+        Raises:
+            ProviderError: If SSH key upload fails
+        """
+        try:
+            local_key_content = self._get_local_ssh_key()
+            
+            # Check if key already exists
+            existing_keys = self.client.ssh_keys.get_all()
+            for key in existing_keys:
+                if key.public_key.strip() == local_key_content.strip():
+                    return key
+            
+            # Upload new key
+            ssh_key = self.client.ssh_keys.create(
+                name=f"clwd-{int(time.time())}",
+                public_key=local_key_content,
+                labels={"managed-by": "clwd"}
+            )
+            
+            return ssh_key
+            
+        except APIException as e:
+            raise ProviderError(
+                f"Failed to upload SSH key to Hetzner: {e}",
+                provider="hetzner"
+            )
+    
+    def _generate_cloud_init_script(
+        self, 
+        name: str, 
+        hardening_level: str = "none",
+        claude_json_content: Optional[str] = None
+    ) -> str:
+        """Generate cloud-init script for server setup.
+        
+        Args:
+            name: Project name
+            hardening_level: Security hardening level (none, minimal, full)
+            claude_json_content: Claude Code authentication content
+            
+        Returns:
+            Base64-encoded, gzip-compressed cloud-init script
+        """
+        return _build_cloud_init(hardening_level, claude_json_content)
     
     async def create_instance(
         self,
@@ -404,29 +448,31 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
             if not server_type_name:
                 raise ValueError(f"Unsupported size: {size}. Supported: {list(self.SIZE_MAP.keys())}")
             
-            # Ensure SSH key is uploaded
-            ssh_key = self._ensure_ssh_key_uploaded()
+            # SSH key upload and catalog lookups are independent blocking API
+            # calls; run them side by side off the event loop
+            ssh_key, server_type, image, location = await asyncio.gather(
+                asyncio.to_thread(self._ensure_ssh_key_uploaded),
+                asyncio.to_thread(self._get_by_name, "server_types", server_type_name),
+                asyncio.to_thread(self._get_by_name, "images", "ubuntu-24.04"),
+                asyncio.to_thread(self._get_by_name, "locations", self.region),
+            )
             
-            # Get server type and image
-            server_type = self.client.server_types.get_by_name(server_type_name)
             if not server_type:
                 raise ProviderError(f"Server type not found: {server_type_name}", provider="hetzner")
                 
-            image = self.client.images.get_by_name("ubuntu-24.04")
             if not image:
                 raise ProviderError("Ubuntu 24.04 image not found", provider="hetzner")
             
-            # Generate cloud-init script
-            user_data = self._generate_cloud_init_script(name, hardening_level, claude_json_content)
-            
-            # Get location object
-            location = self.client.locations.get_by_name(self.region)
             if not location:
                 raise ProviderError(f"Location not found: {self.region}", provider="hetzner")
             
+            # Generate cloud-init script
+            user_data = self._generate_cloud_init_script(name, hardening_level, claude_json_content)
+            
             # Create server
             server_name = f"clwd-{name}-{int(time.time())}"
-            response = self.client.servers.create(
+            response = await asyncio.to_thread(
+                self.client.servers.create,
                 name=server_name,
                 server_type=server_type,
                 image=image,
@@ -448,7 +494,7 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
                 ip=server.public_net.ipv4.ip,
                 provider="hetzner",
                 status=server.status,
-                created_at=datetime.now().isoformat(),
+                created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
                 metadata={
                     "server_type": server_type_name,
                     "region": self.region,
@@ -474,14 +520,14 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
             ProviderError: If destruction fails
         """
         try:
-            server = self.client.servers.get_by_id(int(instance_id))
+            server = await asyncio.to_thread(self.client.servers.get_by_id, int(instance_id))
             if not server:
                 raise InstanceNotFoundError(
                     f"Instance not found: {instance_id}", 
                     provider="hetzner"
                 )
             
-            server.delete()
+            await asyncio.to_thread(server.delete)
             
         except APIException as e:
             raise ProviderError(f"Failed to destroy instance: {e}", provider="hetzner")
@@ -505,7 +551,7 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
             ProviderError: If status check fails
         """
         try:
-            server = self.client.servers.get_by_id(int(instance_id))
+            server = await asyncio.to_thread(self.client.servers.get_by_id, int(instance_id))
             if not server:
                 raise InstanceNotFoundError(
                     f"Instance not found: {instance_id}",
@@ -532,27 +578,55 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
         Returns:
             True if SSH is available, False if timeout
         """
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
-        while asyncio.get_event_loop().time() - start_time < timeout:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                result = sock.connect_ex((ip, 22))
-                sock.close()
-                
-                if result == 0:
-                    # Give SSH daemon a moment to fully initialize
-                    await asyncio.sleep(5)
-                    return True
-                    
-            except Exception:
-                pass
+        # Probe quickly at first, backing off to every 5 seconds while it boots
+        delay = 0.5
+        
+        while loop.time() < deadline:
+            if await self._ssh_banner_ready(ip):
+                return True
             
-            await asyncio.sleep(2)
+            await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+            delay = min(delay * 2, 5.0)
         
         return False
     
+    async def _ssh_banner_ready(self, ip: str, timeout: float = 5, port: int = 22) -> bool:
+        """Check that an SSH daemon on the instance answers with its banner.
+        
+        An open port alone can precede sshd accepting sessions; the
+        ``SSH-`` identification line shows the daemon is actually talking.
+        
+        Args:
+            ip: IPv4 or IPv6 address to check
+            timeout: Seconds allowed for the connect and for the banner
+            port: SSH port
+            
+        Returns:
+            True if the SSH banner was received
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port), timeout=timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        
+        try:
+            banner = await asyncio.wait_for(reader.readline(), timeout=timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        
+        return banner.startswith(b"SSH-")
+    
     def get_supported_sizes(self) -> Dict[str, Dict[str, Any]]:
         """Get supported instance sizes and their specifications.
         
@@ -583,10 +657,10 @@ echo "Setup completed at $(date)" > /var/log/clwd-setup.log"""
             }
         }
     
-    def get_supported_regions(self) -> Dict[str, str]:
+    def get_supported_regions(self) -> Mapping[str, str]:
         """Get supported regions for Hetzner Cloud.
         
         Returns:
-            Dict mapping region codes to region names
+            Read-only mapping of region codes to region names
         """
-        return self.REGIONS.copy()
\ No newline at end of file
+        return self.REGIONS
\ No newline at end of file
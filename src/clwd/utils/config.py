@@ -1,14 +1,44 @@
 """Configuration management for Clwd projects and settings."""
 
+import copy
 import json
 import os
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, Optional, List, Tuple, TypeVar, cast
 from dataclasses import asdict
 
 from ..providers import Instance
+from .jsonio import dumps, loads, read_json, stat_key
+
+
+_T = TypeVar("_T")
+
+# Sentinel for absent keys, distinct from a stored null
+_MISSING = object()
+
+# Shared Config instances by directory, see Config.load_cached()
+_CACHE: Dict[Path, "Config"] = {}
+
+# Fields every stored project must have, checked by Config.validate_config()
+_REQUIRED_PROJECT_FIELDS = ("id", "name", "ip", "provider", "status")
+_REQUIRED_PROJECT_KEYS = frozenset(_REQUIRED_PROJECT_FIELDS)
+
+
+def format_json(data: Any) -> str:
+    """Format data as indented JSON with sorted keys for display.
+    
+    Uses orjson when it is installed and falls back to the standard library.
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        JSON text indented by two spaces
+    """
+    return dumps(data).decode()
 
 
 class ConfigError(Exception):
@@ -38,6 +68,10 @@ class Config:
     CONFIG_FILE = "config.json"
     BACKUP_SUFFIX = ".backup"
     
+    # Files whose indented form would exceed this many bytes are written
+    # without whitespace, which makes them smaller to write and faster to parse
+    COMPACT_JSON_THRESHOLD = 1024 * 1024
+    
     def __init__(self, config_dir: Optional[str] = None) -> None:
         """Initialize configuration manager.
         
@@ -48,8 +82,40 @@ class Config:
         self.projects_file = self.config_dir / self.PROJECTS_FILE
         self.config_file = self.config_dir / self.CONFIG_FILE
         
+        # Parsed JSON files keyed by path, validated against (inode, mtime,
+        # size), along with the raw bytes last read or written (None for
+        # large files that were parsed from a memory map)
+        self._json_cache: Dict[Path, Tuple[Tuple[int, int, int], Any, Optional[bytes]]] = {}
+        
+        # Values derived from one parsed projects mapping (Instances, sorted
+        # names and summaries), dropped when that mapping is replaced
+        self._derived: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None
+        
+        # Saves deferred by batch(), written when the outermost batch exits
+        self._batch_depth = 0
+        self._pending_saves: Dict[Path, Any] = {}
+        
         self._ensure_config_dir()
     
+    @classmethod
+    def load_cached(cls, config_dir: Optional[str] = None) -> "Config":
+        """Get a shared Config for a directory, creating it on first use.
+        
+        Reusing the instance keeps its parsed-file cache warm, so repeated
+        lookups only cost an os.stat while the files are unchanged.
+        
+        Args:
+            config_dir: Custom configuration directory. Defaults to ~/.clwd
+            
+        Returns:
+            Config instance for the directory
+        """
+        path = Path(config_dir or os.path.expanduser(cls.DEFAULT_CONFIG_DIR))
+        config = _CACHE.get(path)
+        if config is None:
+            config = _CACHE[path] = cls(str(path))
+        return config
+    
     def _ensure_config_dir(self) -> None:
         """Ensure configuration directory exists with proper permissions."""
         try:
@@ -69,55 +135,238 @@ class Config:
             
         Raises:
             ConfigError: If file exists but cannot be parsed
+            
+        Note:
+            Parsed data is cached until the file changes on disk and the
+            same object is returned on every hit. Callers must not mutate it.
         """
-        if not file_path.exists():
+        if file_path in self._pending_saves:
+            return self._pending_saves[file_path]
+        
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
             return default if default is not None else {}
+        except OSError as e:
+            raise ConfigError(f"Failed to load {file_path}: {e}")
+        
+        # Saves replace the file, so the inode changes even within one mtime tick
+        key = stat_key(stat)
+        cached = self._json_cache.get(file_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
         
         try:
-            content = file_path.read_text()
-            return json.loads(content)
+            data, raw = read_json(file_path, stat.st_size)
         except (OSError, json.JSONDecodeError) as e:
             raise ConfigError(f"Failed to load {file_path}: {e}")
+        
+        self._json_cache[file_path] = (key, data, raw)
+        return data
     
-    def _save_json_file(self, file_path: Path, data: Any, backup: bool = True) -> None:
+    def _save_json_file(
+        self,
+        file_path: Path,
+        data: Any,
+        backup: bool = False,
+        durable: bool = False,
+        owned: bool = False
+    ) -> None:
         """Save data to JSON file with optional backup.
         
         Args:
             file_path: Path to JSON file
             data: Data to save
-            backup: Whether to create backup of existing file
+            backup: Whether to keep the existing file as a backup first
+            durable: Whether to fsync the file and directory before returning
+            owned: Whether data was built by Config itself and is not
+                reachable by callers, so it can be cached without a snapshot
             
         Raises:
             ConfigError: If save operation fails
+            
+        Note:
+            The saved data becomes the cached value for the file, so the
+            next load skips re-reading it. Unless owned, the cache keeps a
+            snapshot, parsed back from the written bytes, that later changes
+            to the caller's object cannot reach. Inside batch() the write is
+            deferred until the batch exits.
         """
+        if self._batch_depth:
+            # The file on disk is still the pre-batch version, so back it up now
+            if backup:
+                try:
+                    self._backup_file(file_path)
+                except OSError as e:
+                    raise ConfigError(f"Failed to back up {file_path}: {e}")
+            self._pending_saves[file_path] = data if owned else copy.deepcopy(data)
+            return
+        
+        payload = dumps(data)
+        if len(payload) > self.COMPACT_JSON_THRESHOLD:
+            payload = dumps(data, compact=True)
+        
         try:
-            # Create backup if requested and file exists
-            if backup and file_path.exists():
-                backup_path = file_path.with_suffix(file_path.suffix + self.BACKUP_SUFFIX)
-                shutil.copy2(file_path, backup_path)
+            # Nothing to do if the file still holds exactly these bytes
+            cached = self._json_cache.get(file_path)
+            if cached is not None and cached[2] == payload:
+                try:
+                    if stat_key(file_path.stat()) == cached[0]:
+                        return
+                except FileNotFoundError:
+                    pass
+            
+            self._json_cache.pop(file_path, None)
+            
+            if backup:
+                self._backup_file(file_path)
             
             # Write to temporary file first for atomic operation
             temp_path = file_path.with_suffix(file_path.suffix + ".tmp")
             
-            with temp_path.open('w') as f:
-                json.dump(data, f, indent=2, sort_keys=True)
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
             
             # Atomic move to final location
             temp_path.replace(file_path)
             
+            if durable and os.name == "posix":
+                dir_fd = os.open(file_path.parent, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            
+            # Write-through: what is now on disk is exactly `data`
+            cached_data = data if owned else loads(payload)
+            self._json_cache[file_path] = (stat_key(file_path.stat()), cached_data, payload)
+            
         except OSError as e:
             raise ConfigError(f"Failed to save {file_path}: {e}")
     
+    def _backup_file(self, file_path: Path) -> Optional[Path]:
+        """Keep the current version of a file next to it with BACKUP_SUFFIX.
+        
+        The backup is a hard link to the file's inode, and saves replace the
+        file with a new inode, so no data is copied.
+        
+        Args:
+            file_path: File to back up
+            
+        Returns:
+            Path of the backup, or None if the file does not exist
+            
+        Raises:
+            OSError: If the backup cannot be created
+        """
+        if not file_path.exists():
+            return None
+        
+        backup_path = file_path.with_suffix(file_path.suffix + self.BACKUP_SUFFIX)
+        try:
+            backup_path.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            os.link(file_path, backup_path)
+        except OSError:
+            # No hard links here; copyfile uses the platform's
+            # in-kernel copy and skips the copystat of copy2
+            shutil.copyfile(file_path, backup_path)
+        return backup_path
+    
+    def backup_projects(self) -> Optional[Path]:
+        """Keep a copy of the projects file as it is now on disk.
+        
+        Saves do not take backups themselves; this is called before changes
+        that drop project data (removing a project, replacing all projects
+        on import) and can be called before any other risky change.
+        
+        Returns:
+            Path of the backup, or None if there is no projects file yet
+            
+        Raises:
+            ConfigError: If the backup cannot be created
+        """
+        try:
+            return self._backup_file(self.projects_file)
+        except OSError as e:
+            raise ConfigError(f"Failed to back up {self.projects_file}: {e}")
+    
+    @contextmanager
+    def batch(self) -> Iterator["Config"]:
+        """Group several changes into one write per file.
+        
+        Saves made inside the block are kept in memory, and loads see them,
+        until the outermost batch exits. Then each changed file is written
+        once, even if the block raised.
+        
+        Yields:
+            This Config instance
+            
+        Raises:
+            ConfigError: If writing a deferred save fails
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                pending, self._pending_saves = self._pending_saves, {}
+                for file_path, data in pending.items():
+                    self._save_json_file(file_path, data, owned=True)
+    
+    def _cached_projects(self) -> Dict[str, Dict[str, Any]]:
+        """Get the cached projects mapping for read-only use."""
+        return self._load_json_file(self.projects_file, {})
+    
+    def _mutate_projects(self, change: Callable[[Dict[str, Dict[str, Any]]], _T]) -> _T:
+        """Apply a change to the projects mapping and save it, in one pass.
+        
+        Args:
+            change: Called with a shallow copy of the cached mapping. It may
+                add, replace or delete entries but must not modify the
+                existing project dicts, which are still shared with the cache.
+                Entries it adds are cached as given, so they must not be
+                reachable by callers of Config.
+                
+        Returns:
+            Whatever change returns
+            
+        Raises:
+            ConfigError: If the projects file cannot be loaded or saved
+        """
+        projects = dict(self._cached_projects())
+        result = change(projects)
+        self._save_json_file(self.projects_file, projects, owned=True)
+        return result
+    
+    def _derived_from_projects(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Get the cached projects mapping and its scratch space for derived values.
+        
+        The parsed mapping is replaced whenever the file changes, so its
+        identity tells whether previously derived values are still valid.
+        """
+        projects = self._cached_projects()
+        if self._derived is None or self._derived[0] is not projects:
+            self._derived = (projects, {})
+        return self._derived
+    
     def load_projects(self) -> Dict[str, Dict[str, Any]]:
         """Load all projects from state file.
         
         Returns:
-            Dictionary mapping project names to project data
+            Dictionary mapping project names to project data, as a deep
+            copy that is safe to modify
             
         Raises:
             ConfigError: If projects file cannot be loaded
         """
-        return self._load_json_file(self.projects_file, {})
+        return copy.deepcopy(self._cached_projects())
     
     def save_projects(self, projects: Dict[str, Dict[str, Any]]) -> None:
         """Save projects to state file.
@@ -141,25 +390,40 @@ class Config:
             ProjectExistsError: If project already exists
             ConfigError: If save operation fails
         """
+        if not self.add_project_if_missing(name, instance):
+            raise ProjectExistsError(f"Project '{name.strip()}' already exists")
+    
+    def add_project_if_missing(self, name: str, instance: Instance) -> bool:
+        """Add a project unless one with the same name already exists.
+        
+        Args:
+            name: Project name
+            instance: Instance object with project details
+            
+        Returns:
+            True if the project was added, False if the name was taken
+            
+        Raises:
+            ConfigError: If save operation fails
+        """
         if not name or not name.strip():
             raise ValueError("Project name cannot be empty")
         
         name = name.strip()
-        projects = self.load_projects()
-        
-        if name in projects:
-            raise ProjectExistsError(f"Project '{name}' already exists")
+        if name in self._cached_projects():
+            return False
         
         # Convert Instance to dict and add metadata
+        now = datetime.now().isoformat()
         project_data = asdict(instance)
         project_data.update({
             "project_name": name,
-            "added_at": datetime.now().isoformat(),
-            "last_accessed": datetime.now().isoformat()
+            "added_at": now,
+            "last_accessed": now
         })
         
-        projects[name] = project_data
-        self.save_projects(projects)
+        self._mutate_projects(lambda projects: projects.update({name: project_data}))
+        return True
     
     def get_project(self, name: str) -> Optional[Dict[str, Any]]:
         """Get project configuration by name.
@@ -173,8 +437,8 @@ class Config:
         if not name:
             return None
         
-        projects = self.load_projects()
-        return projects.get(name.strip())
+        project_data = self._cached_projects().get(name.strip())
+        return copy.deepcopy(project_data) if project_data is not None else None
     
     def get_project_instance(self, name: str) -> Optional[Instance]:
         """Get project as Instance object.
@@ -183,24 +447,35 @@ class Config:
             name: Project name
             
         Returns:
-            Instance object or None if not found
+            Instance object or None if not found. Instances are shared
+            until the projects file changes; callers must not mutate them.
         """
-        project_data = self.get_project(name)
-        if not project_data:
+        if not name:
             return None
         
-        # Extract Instance fields and create Instance object
-        instance_fields = {
-            "id": project_data.get("id"),
-            "name": project_data.get("name"),
-            "ip": project_data.get("ip"),
-            "provider": project_data.get("provider"),
-            "status": project_data.get("status"),
-            "created_at": project_data.get("created_at"),
-            "metadata": project_data.get("metadata", {})
-        }
-        
-        return Instance(**instance_fields)
+        name = name.strip()
+        projects, derived = self._derived_from_projects()
+        instances = derived.setdefault("instances", {})
+        
+        instance = cast(Optional[Instance], instances.get(name))
+        if instance is None:
+            project_data = projects.get(name)
+            if not project_data:
+                return None
+            
+            # Extract Instance fields and create Instance object
+            instance_fields: Dict[str, Any] = {
+                "id": project_data.get("id"),
+                "name": project_data.get("name"),
+                "ip": project_data.get("ip"),
+                "provider": project_data.get("provider"),
+                "status": project_data.get("status"),
+                "created_at": project_data.get("created_at"),
+                "metadata": project_data.get("metadata", {})
+            }
+            instance = instances[name] = Instance(**instance_fields)
+        
+        return instance
     
     def update_project(self, name: str, updates: Dict[str, Any]) -> None:
         """Update existing project configuration.
@@ -217,16 +492,19 @@ class Config:
             raise ValueError("Project name cannot be empty")
         
         name = name.strip()
-        projects = self.load_projects()
-        
-        if name not in projects:
+        if name not in self._cached_projects():
             raise ProjectNotFoundError(f"Project '{name}' not found")
         
-        # Update project data
-        projects[name].update(updates)
-        projects[name]["last_accessed"] = datetime.now().isoformat()
+        now = datetime.now().isoformat()
         
-        self.save_projects(projects)
+        # Replace rather than update the project dict, it is shared with the
+        # cache; the update values are copied so the caller keeps its own
+        updates = copy.deepcopy(updates)
+        
+        def apply(projects: Dict[str, Dict[str, Any]]) -> None:
+            projects[name] = {**projects[name], **updates, "last_accessed": now}
+        
+        self._mutate_projects(apply)
     
     def update_project_status(self, name: str, status: str) -> None:
         """Update project status.
@@ -254,13 +532,11 @@ class Config:
             raise ValueError("Project name cannot be empty")
         
         name = name.strip()
-        projects = self.load_projects()
-        
-        if name not in projects:
+        if name not in self._cached_projects():
             raise ProjectNotFoundError(f"Project '{name}' not found")
         
-        del projects[name]
-        self.save_projects(projects)
+        self.backup_projects()
+        self._mutate_projects(lambda projects: projects.pop(name))
     
     def list_projects(self) -> List[str]:
         """Get list of all project names.
@@ -268,31 +544,43 @@ class Config:
         Returns:
             List of project names sorted alphabetically
         """
-        projects = self.load_projects()
-        return sorted(projects.keys())
+        projects, derived = self._derived_from_projects()
+        names = derived.get("names")
+        
+        if names is None:
+            names = derived["names"] = sorted(projects)
+        
+        return list(names)
     
     def list_project_details(self) -> List[Dict[str, Any]]:
         """Get list of all projects with summary details.
         
         Returns:
-            List of project summaries containing name, status, IP, provider
+            List of project summaries containing name, status, IP, provider.
+            The list is new, but the summary dicts are shared until the
+            projects file changes; callers must not mutate them.
         """
-        projects = self.load_projects()
-        details = []
-        
-        for name, data in projects.items():
-            details.append({
-                "project_name": name,
-                "status": data.get("status", "unknown"),
-                "ip": data.get("ip", ""),
-                "provider": data.get("provider", ""),
-                "created_at": data.get("created_at", ""),
-                "last_accessed": data.get("last_accessed", "")
-            })
-        
-        # Sort by last accessed (most recent first)
-        details.sort(key=lambda x: x.get("last_accessed", ""), reverse=True)
-        return details
+        projects, derived = self._derived_from_projects()
+        details = derived.get("details")
+        
+        if details is None:
+            details = [
+                {
+                    "project_name": name,
+                    "status": data.get("status", "unknown"),
+                    "ip": data.get("ip", ""),
+                    "provider": data.get("provider", ""),
+                    "created_at": data.get("created_at", ""),
+                    "last_accessed": data.get("last_accessed", "")
+                }
+                for name, data in projects.items()
+            ]
+            
+            # Sort by last accessed (most recent first)
+            details.sort(key=lambda x: x["last_accessed"], reverse=True)
+            derived["details"] = details
+        
+        return list(details)
     
     def project_exists(self, name: str) -> bool:
         """Check if project exists.
@@ -303,15 +591,15 @@ class Config:
         Returns:
             True if project exists, False otherwise
         """
-        return self.get_project(name) is not None
+        return bool(name) and name.strip() in self._cached_projects()
     
     def load_global_config(self) -> Dict[str, Any]:
         """Load global configuration settings.
         
         Returns:
-            Global configuration dictionary
+            Global configuration dictionary (a deep copy that is safe to modify)
         """
-        return self._load_json_file(self.config_file, {})
+        return copy.deepcopy(self._load_json_file(self.config_file, {}))
     
     def save_global_config(self, config: Dict[str, Any]) -> None:
         """Save global configuration settings.
@@ -331,8 +619,7 @@ class Config:
         Returns:
             Configuration value or default
         """
-        config = self.load_global_config()
-        return config.get(key, default)
+        return self._load_json_file(self.config_file, {}).get(key, default)
     
     def set_config_value(self, key: str, value: Any) -> None:
         """Set a global configuration value.
@@ -340,10 +627,17 @@ class Config:
         Args:
             key: Configuration key
             value: Value to set
+            
+        Note:
+            Setting a key to the value it already has does not touch the
+            file.
         """
-        config = self.load_global_config()
-        config[key] = value
-        self.save_global_config(config)
+        config = self._load_json_file(self.config_file, {})
+        current = config.get(key, _MISSING)
+        if type(current) is type(value) and current == value:
+            return
+        
+        self._save_json_file(self.config_file, {**config, key: value})
     
     def cleanup_backups(self, max_backups: int = 5) -> None:
         """Clean up old backup files.
@@ -351,19 +645,28 @@ class Config:
         Args:
             max_backups: Maximum number of backup files to keep
         """
-        backup_pattern = f"*{self.BACKUP_SUFFIX}"
-        backup_files = list(self.config_dir.glob(backup_pattern))
+        try:
+            with os.scandir(self.config_dir) as entries:
+                backup_files = [e for e in entries if e.name.endswith(self.BACKUP_SUFFIX)]
+        except OSError:
+            return
         
         if len(backup_files) <= max_backups:
             return
         
+        def mtime(entry: os.DirEntry[str]) -> int:
+            try:
+                return entry.stat(follow_symlinks=False).st_mtime_ns
+            except OSError:
+                return 0
+        
         # Sort by modification time (oldest first)
-        backup_files.sort(key=lambda f: f.stat().st_mtime)
+        backup_files.sort(key=mtime)
         
         # Remove oldest backups
         for backup_file in backup_files[:-max_backups]:
             try:
-                backup_file.unlink()
+                os.unlink(backup_file.path)
             except OSError:
                 pass  # Ignore errors when cleaning up
     
@@ -384,9 +687,7 @@ class Config:
         }
         
         try:
-            output_file = Path(output_path)
-            with output_file.open('w') as f:
-                json.dump(export_data, f, indent=2, sort_keys=True)
+            Path(output_path).write_bytes(dumps(export_data))
         except OSError as e:
             raise ConfigError(f"Failed to export projects to {output_path}: {e}")
     
@@ -402,19 +703,22 @@ class Config:
         """
         try:
             import_file = Path(import_path)
-            with import_file.open('r') as f:
-                import_data = json.load(f)
+            import_data, _ = read_json(import_file, import_file.stat().st_size)
             
-            imported_projects = import_data.get("projects", {})
+            imported_projects = import_data.get("projects") if isinstance(import_data, dict) else None
+            if not isinstance(imported_projects, dict):
+                raise ConfigError(f"Failed to import projects from {import_path}: no projects mapping")
             
             if merge:
-                existing_projects = self.load_projects()
-                existing_projects.update(imported_projects)
-                self.save_projects(existing_projects)
-            else:
-                self.save_projects(imported_projects)
+                # Shallow merge; untouched projects keep sharing the cached dicts
+                imported_projects = {**self._cached_projects(), **imported_projects}
+            
+            # A bulk replacement of project state is worth a backup and an fsync
+            self._save_json_file(
+                self.projects_file, imported_projects, backup=True, durable=True, owned=True
+            )
                 
-        except (OSError, json.JSONDecodeError, KeyError) as e:
+        except (OSError, json.JSONDecodeError) as e:
             raise ConfigError(f"Failed to import projects from {import_path}: {e}")
     
     def validate_config(self) -> List[str]:
@@ -429,25 +733,33 @@ class Config:
         if not os.access(self.config_dir, os.R_OK | os.W_OK):
             issues.append(f"Config directory not accessible: {self.config_dir}")
         
-        # Validate projects file
+        # Validate projects file; the result is kept until the file changes
         try:
-            projects = self.load_projects()
-            for name, data in projects.items():
-                if not isinstance(data, dict):
-                    issues.append(f"Invalid project data for '{name}': not a dictionary")
-                    continue
-                
-                required_fields = ["id", "name", "ip", "provider", "status"]
-                for field in required_fields:
-                    if field not in data:
-                        issues.append(f"Project '{name}' missing required field: {field}")
-                        
+            projects, derived = self._derived_from_projects()
+            project_issues = derived.get("issues")
+            
+            if project_issues is None:
+                project_issues = []
+                for name, data in projects.items():
+                    if not isinstance(data, dict):
+                        project_issues.append(f"Invalid project data for '{name}': not a dictionary")
+                        continue
+                    
+                    if data.keys() >= _REQUIRED_PROJECT_KEYS:
+                        continue
+                    
+                    for field in _REQUIRED_PROJECT_FIELDS:
+                        if field not in data:
+                            project_issues.append(f"Project '{name}' missing required field: {field}")
+                derived["issues"] = project_issues
+            
+            issues.extend(project_issues)
         except ConfigError as e:
             issues.append(f"Projects file validation failed: {e}")
         
         # Validate global config
         try:
-            self.load_global_config()
+            self._load_json_file(self.config_file, {})
         except ConfigError as e:
             issues.append(f"Global config validation failed: {e}")
         
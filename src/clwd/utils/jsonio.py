@@ -0,0 +1,76 @@
+"""JSON encoding and file-version helpers shared by Clwd's local state modules."""
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup, see the "fast" extra
+    orjson = None  # type: ignore[assignment]
+
+
+# Files above this size are parsed straight from a memory map when orjson
+# is available, skipping the copy into a bytes object
+MMAP_THRESHOLD = 64 * 1024
+
+
+def dumps(data: Any, compact: bool = False, sort_keys: bool = True) -> bytes:
+    """Encode data as UTF-8 JSON.
+    
+    Uses orjson when it is installed and falls back to the standard library.
+    
+    Args:
+        data: JSON-serializable data
+        compact: Omit all whitespace instead of indenting by two spaces
+        sort_keys: Sort object keys; otherwise insertion order is kept
+        
+    Returns:
+        The encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if compact:
+        return json.dumps(data, separators=(",", ":"), sort_keys=sort_keys).encode()
+    return json.dumps(data, indent=2, sort_keys=sort_keys).encode()
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """Decode JSON bytes or text; errors subclass json.JSONDecodeError either way."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def read_json(path: Path, size: int) -> Tuple[Any, Optional[bytes]]:
+    """Parse a JSON file, memory-mapping it when it is large.
+    
+    Args:
+        path: File to parse
+        size: File size in bytes, as already known from a stat
+        
+    Returns:
+        Tuple of (parsed data, raw file bytes or None when memory-mapped)
+        
+    Raises:
+        OSError: If the file cannot be read
+        json.JSONDecodeError: If the content is not valid JSON
+    """
+    if orjson is not None and size > MMAP_THRESHOLD:
+        with open(path, "rb") as f, \
+             mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+             memoryview(mapped) as view:
+            return orjson.loads(view), None
+    
+    raw = path.read_bytes()
+    return loads(raw), raw
+
+
+def stat_key(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Identify a file version by inode, modification time and size."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
@@ -2,12 +2,19 @@
 
 import json
 import os
+import re
 import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Iterator, Tuple
 
 from rich.console import Console
 
+from .jsonio import dumps, loads, stat_key
+
 console = Console()
 
 
@@ -16,9 +23,166 @@ class KeychainError(Exception):
     pass
 
 
+# Recent `security` lookup as (time.monotonic() when run, result); each
+# lookup forks a process and may show a Keychain prompt
+_KEYCHAIN_LOOKUP: Optional[Tuple[float, "subprocess.CompletedProcess[str]"]] = None
+_KEYCHAIN_LOOKUP_TTL = 30.0
+
+# Security.framework handle for reading the Keychain in-process: None until
+# first use, False if it cannot be loaded (then `security` is run instead).
+# Only used when CLWD_NATIVE_KEYCHAIN is set: the Keychain item's access list
+# trusts /usr/bin/security, so reading it from Python can show a new prompt.
+_SECURITY: Any = None
+_SECURITY_FRAMEWORK = "/System/Library/Frameworks/Security.framework/Security"
+_KEYCHAIN_SERVICE = "Claude Code-credentials"
+_ERR_SEC_ITEM_NOT_FOUND = -25300
+
+# Parsed ~/.claude.json as ((path, inode, mtime, size), data, text)
+_CLAUDE_SESSION: Optional[Tuple[Tuple[Path, int, int, int], Any, str]] = None
+
+# Top-level fields create_minimal_claude_json() copies from the local
+# session, with the value used when the session lacks them
+_MINIMAL_SESSION_FIELDS: Dict[str, Any] = {
+    "firstStartTime": "2025-01-01T00:00:00.000Z",
+    "oauthAccount": None,
+    "isQualifiedForDataSharing": False,
+    "lastOnboardingVersion": "1.0.69",
+}
+
+# The encoded minimal session split around those fields: literal chunks at
+# even indices, field names at odd ones. Encoded once, filled in per call.
+_MINIMAL_SESSION_PARTS = re.split(rb'"@@(\w+)@@"', dumps({
+    "installMethod": "clwd",
+    "autoUpdates": False,
+    "firstStartTime": "@@firstStartTime@@",
+    "oauthAccount": "@@oauthAccount@@",
+    "isQualifiedForDataSharing": "@@isQualifiedForDataSharing@@",
+    "hasCompletedOnboarding": True,
+    "lastOnboardingVersion": "@@lastOnboardingVersion@@",
+    "projects": {
+        "/app": {
+            "allowedTools": [],
+            "history": [],
+            "mcpContextUris": [],
+            "mcpServers": {},
+            "enabledMcpjsonServers": [],
+            "disabledMcpjsonServers": [],
+            "hasTrustDialogAccepted": False,
+            "projectOnboardingSeenCount": 0,
+            "hasClaudeMdExternalIncludesApproved": False,
+            "hasClaudeMdExternalIncludesWarningShown": False
+        }
+    }
+}, sort_keys=False))
+
+
 def is_macos() -> bool:
     """Check if running on macOS."""
-    return os.name == 'posix' and hasattr(os, 'uname') and os.uname().sysname == 'Darwin'
+    return sys.platform == 'darwin'
+
+
+def _security_framework() -> Any:
+    """Load Security.framework through ctypes on first use.
+    
+    Returns:
+        The library handle, or None if it is not available
+    """
+    global _SECURITY
+    
+    if _SECURITY is None:
+        try:
+            import ctypes
+            
+            lib = ctypes.CDLL(_SECURITY_FRAMEWORK)
+            lib.SecKeychainFindGenericPassword.argtypes = [
+                ctypes.c_void_p,                    # keychain search list (default)
+                ctypes.c_uint32, ctypes.c_char_p,   # service name
+                ctypes.c_uint32, ctypes.c_char_p,   # account name (any)
+                ctypes.POINTER(ctypes.c_uint32),    # password length out
+                ctypes.POINTER(ctypes.c_void_p),    # password data out
+                ctypes.c_void_p,                    # item ref out (unused)
+            ]
+            lib.SecKeychainFindGenericPassword.restype = ctypes.c_int32
+            lib.SecKeychainItemFreeContent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+            lib.SecKeychainItemFreeContent.restype = ctypes.c_int32
+            _SECURITY = lib
+        except (OSError, AttributeError):
+            _SECURITY = False
+    
+    return _SECURITY or None
+
+
+def _read_keychain_natively() -> "Optional[subprocess.CompletedProcess[str]]":
+    """Look up the Claude Code Keychain item without forking `security`.
+    
+    Returns:
+        A result shaped like `security find-generic-password -w` output
+        (exit status 44 when the item does not exist), or None if the
+        framework is unavailable or the password is not text
+    """
+    lib = _security_framework()
+    if lib is None:
+        return None
+    
+    import ctypes
+    
+    service = _KEYCHAIN_SERVICE.encode()
+    length = ctypes.c_uint32()
+    data = ctypes.c_void_p()
+    status = lib.SecKeychainFindGenericPassword(
+        None, len(service), service, 0, None,
+        ctypes.pointer(length), ctypes.pointer(data), None
+    )
+    args = ["SecKeychainFindGenericPassword", _KEYCHAIN_SERVICE]
+    
+    if status != 0:
+        returncode = 44 if status == _ERR_SEC_ITEM_NOT_FOUND else 1
+        return subprocess.CompletedProcess(args, returncode, "", f"OSStatus {status}")
+    
+    try:
+        address = data.value
+        if address is None:
+            return None
+        password = ctypes.string_at(address, length.value)
+    finally:
+        lib.SecKeychainItemFreeContent(None, data)
+    
+    try:
+        return subprocess.CompletedProcess(args, 0, password.decode() + "\n", "")
+    except UnicodeDecodeError:
+        return None
+
+
+def _find_keychain_password() -> "subprocess.CompletedProcess[str]":
+    """Look up the Claude Code Keychain item, reusing a recent lookup.
+    
+    Returns:
+        Completed `security find-generic-password -w` process, or an
+        equivalent result when Security.framework was called in-process
+        (opt-in through CLWD_NATIVE_KEYCHAIN)
+        
+    Raises:
+        subprocess.TimeoutExpired: If the lookup times out
+        subprocess.SubprocessError: If `security` cannot be run
+    """
+    global _KEYCHAIN_LOOKUP
+    
+    now = time.monotonic()
+    if _KEYCHAIN_LOOKUP is not None and now - _KEYCHAIN_LOOKUP[0] < _KEYCHAIN_LOOKUP_TTL:
+        return _KEYCHAIN_LOOKUP[1]
+    
+    result = None
+    if os.environ.get("CLWD_NATIVE_KEYCHAIN", "").lower() in ("true", "1", "yes"):
+        result = _read_keychain_natively()
+    if result is None:
+        result = subprocess.run([
+            'security', 'find-generic-password', 
+            '-s', _KEYCHAIN_SERVICE,
+            '-w'  # Output just the password
+        ], capture_output=True, text=True, timeout=30)
+    
+    _KEYCHAIN_LOOKUP = (now, result)
+    return result
 
 
 def get_claude_credentials_from_keychain() -> Optional[Dict[str, Any]]:
@@ -39,11 +203,7 @@ def get_claude_credentials_from_keychain() -> Optional[Dict[str, Any]]:
         console.print("[dim]Requesting access to Claude Code credentials in Keychain...[/dim]")
         
         # Look for Claude Code credentials in keychain
-        result = subprocess.run([
-            'security', 'find-generic-password', 
-            '-s', 'Claude Code-credentials',
-            '-w'  # Output just the password
-        ], capture_output=True, text=True, timeout=30)
+        result = _find_keychain_password()
         
         if result.returncode == 0 and result.stdout.strip():
             credentials['claude_code'] = result.stdout.strip()
@@ -61,32 +221,71 @@ def get_claude_credentials_from_keychain() -> Optional[Dict[str, Any]]:
         raise KeychainError(f"Unexpected error accessing Keychain: {e}")
 
 
-def get_claude_session_from_file() -> Optional[str]:
-    """Get Claude Code session data from ~/.claude.json file.
+def _load_claude_session() -> Tuple[Any, str]:
+    """Read and parse ~/.claude.json, reusing the result while it is unchanged.
     
     Returns:
-        JSON content as string or None if not found
+        Tuple of (parsed JSON, file content as text)
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        OSError: If the file cannot be read
+        ValueError: If the content is not valid UTF-8 JSON
     """
+    global _CLAUDE_SESSION
+    
     claude_json_path = Path.home() / ".claude.json"
+    key = (claude_json_path, *stat_key(claude_json_path.stat()))
+    if _CLAUDE_SESSION is not None and _CLAUDE_SESSION[0] == key:
+        return _CLAUDE_SESSION[1], _CLAUDE_SESSION[2]
     
-    if not claude_json_path.exists():
-        return None
+    content = claude_json_path.read_bytes()
+    data = loads(content)
+    text = content.decode()
+    
+    _CLAUDE_SESSION = (key, data, text)
+    return data, text
+
+
+@contextmanager
+def _prefetching_claude_session() -> Iterator[None]:
+    """Read ~/.claude.json in the background while the block runs.
+    
+    Meant to wrap a Keychain lookup, which can take a while (a process
+    fork or a user prompt). The parse lands in the session cache for the
+    read that follows; errors are dropped here and raised again by it.
+    """
+    if not is_macos():
+        yield
+        return
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(_load_claude_session)
+        yield
+
+
+def get_claude_session_from_file() -> Optional[str]:
+    """Get Claude Code session data from ~/.claude.json file.
     
+    Returns:
+        JSON content as string or None if not found. The file's own text is
+        returned as is; it is never re-encoded.
+    """
     try:
-        content = claude_json_path.read_text()
-        
-        # Validate it's proper JSON
-        json.loads(content)
-        
-        console.print("[green]✓[/green] Found Claude Code session file")
-        return content
-        
+        # The content is uploaded verbatim, so it must be checked locally.
+        # The parse is cached per file version and shared with validation.
+        _, content = _load_claude_session()
+    except FileNotFoundError:
+        return None
     except json.JSONDecodeError:
         console.print("[yellow]⚠[/yellow] ~/.claude.json exists but contains invalid JSON")
         return None
     except Exception as e:
         console.print(f"[yellow]⚠[/yellow] Could not read ~/.claude.json: {e}")
         return None
+    
+    console.print("[green]✓[/green] Found Claude Code session file")
+    return content
 
 
 def create_minimal_claude_json(full_data: Dict[str, Any]) -> Optional[str]:
@@ -103,32 +302,15 @@ def create_minimal_claude_json(full_data: Dict[str, Any]) -> Optional[str]:
             console.print("[yellow]⚠[/yellow] No oauthAccount found in Claude session")
             return None
         
-        # Extract only essential OAuth data to avoid cloud-init size limits
-        minimal_data = {
-            "installMethod": "clwd",
-            "autoUpdates": False,
-            "firstStartTime": full_data.get("firstStartTime", "2025-01-01T00:00:00.000Z"),
-            "oauthAccount": full_data["oauthAccount"],
-            "isQualifiedForDataSharing": full_data.get("isQualifiedForDataSharing", False),
-            "hasCompletedOnboarding": True,
-            "lastOnboardingVersion": full_data.get("lastOnboardingVersion", "1.0.69"),
-            "projects": {
-                "/app": {
-                    "allowedTools": [],
-                    "history": [],
-                    "mcpContextUris": [],
-                    "mcpServers": {},
-                    "enabledMcpjsonServers": [],
-                    "disabledMcpjsonServers": [],
-                    "hasTrustDialogAccepted": False,
-                    "projectOnboardingSeenCount": 0,
-                    "hasClaudeMdExternalIncludesApproved": False,
-                    "hasClaudeMdExternalIncludesWarningShown": False
-                }
-            }
-        }
+        # Extract only essential OAuth data to avoid cloud-init size limits.
+        # Field values sit one level deep, so indent their continuation lines.
+        parts = list(_MINIMAL_SESSION_PARTS)
+        for i in range(1, len(parts), 2):
+            field = parts[i].decode()
+            value = full_data.get(field, _MINIMAL_SESSION_FIELDS[field])
+            parts[i] = dumps(value, sort_keys=False).replace(b"\n", b"\n  ")
         
-        minimal_json = json.dumps(minimal_data, indent=2)
+        minimal_json = b"".join(parts).decode()
         console.print(f"[green]✓[/green] Created minimal Claude session data ({len(minimal_json)} chars)")
         
         return minimal_json
@@ -155,13 +337,13 @@ def create_credentials_json(credentials: Dict[str, Any]) -> Optional[str]:
     if 'claude_code' in credentials:
         try:
             # Try to parse as JSON if it's structured data
-            parsed = json.loads(credentials['claude_code'])
+            parsed = loads(credentials['claude_code'])
             creds_data.update(parsed)
         except json.JSONDecodeError:
             # If it's not JSON, store as a token
             creds_data['token'] = credentials['claude_code']
     
-    return json.dumps(creds_data, indent=2) if creds_data else None
+    return dumps(creds_data, sort_keys=False).decode() if creds_data else None
 
 
 def get_claude_authentication() -> Tuple[Optional[str], Optional[str]]:
@@ -171,21 +353,18 @@ def get_claude_authentication() -> Tuple[Optional[str], Optional[str]]:
         Tuple of (credentials_json, session_json) - both may be None
     """
     credentials_json = None
-    session_json = None
     
     # Try to get credentials from keychain
-    try:
-        keychain_creds = get_claude_credentials_from_keychain()
-        if keychain_creds:
-            credentials_json = create_credentials_json(keychain_creds)
-    except KeychainError as e:
-        console.print(f"[yellow]⚠[/yellow] Keychain error: {e}")
+    with _prefetching_claude_session():
+        try:
+            keychain_creds = get_claude_credentials_from_keychain()
+            if keychain_creds:
+                credentials_json = create_credentials_json(keychain_creds)
+        except KeychainError as e:
+            console.print(f"[yellow]⚠[/yellow] Keychain error: {e}")
     
     # Try to get session from file (return full content, not minimal)
-    session_content = get_claude_session_from_file()
-    if session_content:
-        # Return the full session content instead of creating minimal version
-        session_json = session_content
+    session_json = get_claude_session_from_file() or None
     
     return credentials_json, session_json
 
@@ -200,13 +379,7 @@ def test_keychain_access() -> bool:
         return False
     
     try:
-        result = subprocess.run([
-            'security', 'find-generic-password',
-            '-s', 'Claude Code-credentials',
-        ], capture_output=True, text=True, timeout=10)
-        
-        return result.returncode == 0
-        
+        return _find_keychain_password().returncode == 0
     except Exception:
         return False
 
@@ -226,25 +399,25 @@ def validate_claude_authentication() -> Dict[str, Any]:
     }
     
     if is_macos():
-        result["keychain_available"] = test_keychain_access()
-        
-        try:
-            creds = get_claude_credentials_from_keychain()
-            result["keychain_credentials"] = bool(creds)
-        except KeychainError:
-            pass
+        # Both checks share one `security` lookup
+        with _prefetching_claude_session():
+            result["keychain_available"] = test_keychain_access()
+            
+            try:
+                creds = get_claude_credentials_from_keychain()
+                result["keychain_credentials"] = bool(creds)
+            except KeychainError:
+                pass
     
-    # Check session file
-    claude_json_path = Path.home() / ".claude.json"
-    result["session_file"] = claude_json_path.exists()
-    
-    if result["session_file"]:
-        try:
-            session_content = claude_json_path.read_text()
-            session_data = json.loads(session_content)
-            result["session_valid"] = "oauthAccount" in session_data
-        except Exception:
-            pass
+    # Check session file; the parse is shared with get_claude_session_from_file
+    try:
+        session_data, _ = _load_claude_session()
+        result["session_file"] = True
+        result["session_valid"] = "oauthAccount" in session_data
+    except FileNotFoundError:
+        pass
+    except Exception:
+        result["session_file"] = True
     
     # Ready if we have either credentials or valid session
     result["ready_for_deployment"] = (
@@ -1,21 +1,119 @@
 """SSH operations for connecting to and managing remote instances."""
 
-import asyncio
 import os
+import queue
+import re
+import secrets
 import shlex
+import shutil
 import subprocess
 import sys
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import IO, Callable, Optional, Tuple, Dict, Any, List, Union, overload
 
 from ..providers import ProviderError
 
+# test_connection() trusts a command that reached the host this recently
+# instead of probing again; ssh exits with 255 only when it could not connect
+CONNECTION_VERIFIED_TTL = 30.0
+SSH_CONNECTION_FAILED = 255
+
+# Client executables, resolved against PATH once at import rather than by
+# every spawn. Spawns keep subprocess defaults (no preexec_fn, session or
+# credential changes), which lets CPython 3.10+ start them with vfork instead
+# of copying the interpreter's page tables. close_fds stays on: a control
+# master outlives the command and must not inherit our descriptors.
+_SSH = shutil.which("ssh") or "ssh"
+_SFTP = shutil.which("sftp") or "sftp"
+
+# Connection-sharing sockets live here; one master per user@host is reused
+# by every ssh/scp call and kept alive between CLI invocations.
+CONTROL_DIR = Path("~/.cache/clwd").expanduser()
+CONTROL_PERSIST = 600
+
+# Cipher preference for new connections: AES-GCM runs on the CPU's AES
+# instructions; every entry has been in OpenSSH since 6.5
+CIPHERS = "aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,aes256-gcm@openssh.com,aes128-ctr"
+
+# Remote loop for wait_for_setup_complete(): prints READY once cloud-init
+# has written its marker file. inotifywait wakes as soon as anything is
+# created in /tmp; its two-second limit covers a marker written just before
+# it started watching. Without inotify-tools (or if it fails) the loop
+# sleeps two seconds between checks instead.
+SETUP_WAIT_COMMAND = (
+    "while ! test -f /tmp/clwd-setup-complete; do "
+    "if command -v inotifywait >/dev/null 2>&1; then "
+    "inotifywait -qq -t 2 -e create -e moved_to /tmp || test $? -eq 2 || sleep 2; "
+    "else sleep 2; fi; "
+    "done; echo READY"
+)
+
+# Transfers with a file larger than this are compressed, unless every such
+# file is already in a compressed format
+COMPRESS_MIN_SIZE = 64 * 1024
+COMPRESSED_SUFFIXES = frozenset({
+    ".gz", ".tgz", ".bz2", ".xz", ".zst", ".zip", ".7z",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp4", ".woff", ".woff2",
+})
+
+# Everything get_instance_info() reports, gathered in one remote command:
+# a connection marker, a setup marker, then the kernel and uptime lines
+INSTANCE_INFO_COMMAND = (
+    "echo __CONN_OK__; "
+    "if test -f /tmp/clwd-setup-complete; then echo __SETUP_OK__; else echo __SETUP_NO__; fi; "
+    "uname -a; uptime"
+)
+
 
 class SSHError(Exception):
     """SSH operation failed."""
     pass
 
 
+def _sftp_quote(path: str) -> str:
+    """Quote a path for an sftp batch file, escaping quotes and glob characters."""
+    escaped = "".join("\\" + c if c in '\\"*?[]' else c for c in path)
+    return f'"{escaped}"'
+
+
+@lru_cache(maxsize=1)
+def _default_ssh_key() -> Optional[str]:
+    """Find the first existing default SSH private key, once per process.
+    
+    Returns:
+        Path to SSH private key or None if not found
+    """
+    key_paths = [
+        "~/.ssh/id_ed25519",
+        "~/.ssh/id_rsa", 
+        "~/.ssh/id_ecdsa"
+    ]
+    
+    for key_path in key_paths:
+        expanded_path = Path(key_path).expanduser()
+        if expanded_path.exists():
+            return str(expanded_path)
+    
+    return None
+
+
+def _split_on_markers(text: str, markers: "re.Pattern[str]") -> Tuple[List[Tuple[str, "re.Match[str]"]], str]:
+    """Split command output at marker lines.
+    
+    Returns:
+        Tuple of ([(text before each marker, marker match)], text after the last)
+    """
+    segments = []
+    position = 0
+    for match in markers.finditer(text):
+        segments.append((text[position:match.start()], match))
+        position = match.end()
+    return segments, text[position:]
+
+
 class SSHOperations:
     """Handle SSH connections and operations for cloud instances."""
     
@@ -31,24 +129,38 @@ class SSHOperations:
         self.user = user
         self.ssh_key_path = ssh_key_path or self._find_ssh_key()
         
+        # Options shared by every ssh command, built on first use
+        self._ssh_options: Optional[Tuple[str, ...]] = None
+        # time.monotonic() of the last command known to have reached the host
+        self._last_ok = float("-inf")
+        
     def _find_ssh_key(self) -> Optional[str]:
         """Find the SSH private key to use.
         
         Returns:
             Path to SSH private key or None if not found
         """
-        key_paths = [
-            "~/.ssh/id_ed25519",
-            "~/.ssh/id_rsa", 
-            "~/.ssh/id_ecdsa"
-        ]
+        return _default_ssh_key()
+    
+    def _control_path(self) -> Path:
+        """Path of the control socket for this user@host (ssh's ``%r@%h:%p``)."""
+        return CONTROL_DIR / f"cm-{self.user}@{self.ip}:22"
+    
+    def _control_options(self) -> list[str]:
+        """Build OpenSSH options that multiplex over a shared master connection.
         
-        for key_path in key_paths:
-            expanded_path = Path(key_path).expanduser()
-            if expanded_path.exists():
-                return str(expanded_path)
+        Returns:
+            Option list, empty on Windows where ControlMaster is unsupported
+        """
+        if sys.platform == "win32":
+            return []
         
-        return None
+        CONTROL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={CONTROL_DIR}/cm-%r@%h:%p",
+            "-o", f"ControlPersist={CONTROL_PERSIST}",
+        ]
     
     def _build_ssh_command(self, command: Optional[str] = None, tty: bool = False) -> list[str]:
         """Build SSH command with proper options.
@@ -60,21 +172,26 @@ class SSHOperations:
         Returns:
             SSH command as list of strings
         """
-        ssh_cmd = ["ssh"]
-        
-        # SSH options for automation and security
-        ssh_cmd.extend([
-            "-o", "StrictHostKeyChecking=no",  # Accept new host keys automatically
-            "-o", "UserKnownHostsFile=/dev/null",  # Don't save host keys
-            "-o", "LogLevel=ERROR",  # Reduce SSH output noise
-            "-o", "ConnectTimeout=10",  # Connection timeout
-            "-o", "ServerAliveInterval=60",  # Keep connection alive
-            "-o", "ServerAliveCountMax=3",  # Max failed keepalives
-        ])
+        if self._ssh_options is None:
+            # SSH options for automation and security
+            options = [
+                "-o", "StrictHostKeyChecking=no",  # Accept new host keys automatically
+                "-o", "UserKnownHostsFile=/dev/null",  # Don't save host keys
+                "-o", "LogLevel=ERROR",  # Reduce SSH output noise
+                "-o", "ConnectTimeout=10",  # Connection timeout
+                "-o", "ServerAliveInterval=60",  # Keep connection alive
+                "-o", "ServerAliveCountMax=3",  # Max failed keepalives
+                "-o", f"Ciphers={CIPHERS}",  # Prefer hardware-accelerated AES-GCM
+            ]
+            options.extend(self._control_options())
+            
+            # Add SSH key if available
+            if self.ssh_key_path:
+                options.extend(["-i", self.ssh_key_path])
+            
+            self._ssh_options = tuple(options)
         
-        # Add SSH key if available
-        if self.ssh_key_path:
-            ssh_cmd.extend(["-i", self.ssh_key_path])
+        ssh_cmd = [_SSH, *self._ssh_options]
         
         # Add TTY allocation if requested
         if tty:
@@ -98,33 +215,109 @@ class SSHOperations:
         Returns:
             True if connection successful, False otherwise
         """
+        if time.monotonic() - self._last_ok < CONNECTION_VERIFIED_TTL:
+            return True
+        
         try:
-            cmd = self._build_ssh_command("echo 'SSH connection test'")
+            cmd = self._build_ssh_command("true")
             result = subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=timeout
             )
+            if result.returncode == 0:
+                self._last_ok = time.monotonic()
             return result.returncode == 0
         except (subprocess.SubprocessError, subprocess.TimeoutExpired):
             return False
     
+    def check_setup_complete(self, timeout: int = 10) -> Optional[bool]:
+        """Probe connectivity and the setup marker in a single round trip.
+        
+        Args:
+            timeout: Connection timeout in seconds
+            
+        Returns:
+            True if setup completed, False if it is still running, None if
+            the instance cannot be reached
+        """
+        try:
+            return_code, _, _ = self.execute_command(
+                "test -f /tmp/clwd-setup-complete",
+                timeout=timeout,
+                discard_output=True
+            )
+        except SSHError:
+            return None
+        
+        if return_code == SSH_CONNECTION_FAILED:
+            return None
+        return return_code == 0
+    
+    def wait_for_connection(self, timeout: int = 30, interval: float = 1.0) -> bool:
+        """Poll until an SSH connection succeeds.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            interval: Delay between failed attempts in seconds
+            
+        Returns:
+            True as soon as a connection succeeds, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if self.test_connection(timeout=max(1, min(10, int(remaining)))):
+                return True
+            if time.monotonic() + interval >= deadline:
+                return False
+            time.sleep(interval)
+    
+    @overload
+    def execute_command(
+        self,
+        command: str,
+        timeout: int = ...,
+        capture_output: bool = ...,
+        discard_output: bool = ...,
+        encoding: str = ...
+    ) -> Tuple[int, str, str]: ...
+    
+    @overload
+    def execute_command(
+        self,
+        command: str,
+        timeout: int = ...,
+        capture_output: bool = ...,
+        discard_output: bool = ...,
+        *,
+        encoding: None
+    ) -> Tuple[int, bytes, bytes]: ...
+    
     def execute_command(
         self, 
         command: str, 
         timeout: int = 120,
-        capture_output: bool = True
-    ) -> Tuple[int, str, str]:
+        capture_output: bool = True,
+        discard_output: bool = False,
+        encoding: Optional[str] = "utf-8"
+    ) -> Tuple[int, Union[str, bytes], Union[str, bytes]]:
         """Execute a command on the remote instance.
         
         Args:
             command: Command to execute
             timeout: Command timeout in seconds
-            capture_output: Whether to capture stdout/stderr
+            capture_output: Whether to capture stdout/stderr; if not, they go
+                to the terminal
+            discard_output: Send stdout/stderr to /dev/null, for callers that
+                only need the return code. Takes precedence over capture_output.
+            encoding: Decoding for captured output, with undecodable bytes
+                replaced; None returns the raw bytes
             
         Returns:
-            Tuple of (return_code, stdout, stderr)
+            Tuple of (return_code, stdout, stderr); the output is empty unless
+            captured, and bytes when encoding is None
             
         Raises:
             SSHError: If SSH execution fails
@@ -133,20 +326,202 @@ class SSHOperations:
             # Build SSH command with the raw command (SSH handles the escaping)
             ssh_cmd = self._build_ssh_command(command)
             
+            if discard_output:
+                output: Dict[str, Any] = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+            else:
+                output = {"capture_output": capture_output}
+            if encoding is not None:
+                output.update(encoding=encoding, errors="replace")
+            
             result = subprocess.run(
                 ssh_cmd,
-                capture_output=capture_output,
-                text=True,
-                timeout=timeout
+                timeout=timeout,
+                **output
             )
             
-            return result.returncode, result.stdout or "", result.stderr or ""
+            if result.returncode != SSH_CONNECTION_FAILED:
+                self._last_ok = time.monotonic()
+            if discard_output or not capture_output:
+                empty = b"" if encoding is None else ""
+                return result.returncode, empty, empty
+            return result.returncode, result.stdout, result.stderr
             
         except subprocess.TimeoutExpired:
             raise SSHError(f"Command timed out after {timeout} seconds")
         except subprocess.SubprocessError as e:
             raise SSHError(f"SSH command execution failed: {e}")
     
+    def execute_command_streaming(
+        self,
+        command: str,
+        on_stdout: Callable[[str], None],
+        on_stderr: Optional[Callable[[str], None]] = None,
+        timeout: float = 120
+    ) -> int:
+        """Execute a command, handing each line of output over as it arrives.
+        
+        Unlike execute_command(), output is never accumulated, so chatty
+        commands run in constant memory and the caller sees progress
+        immediately.
+        
+        Args:
+            command: Command to execute
+            on_stdout: Called with each stdout line, newline included
+            on_stderr: Called with each stderr line; defaults to on_stdout
+            timeout: Seconds before the command is killed
+            
+        Returns:
+            The command's return code
+            
+        Raises:
+            SSHError: If SSH execution fails or the timeout is reached
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            proc = subprocess.Popen(
+                self._build_ssh_command(command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1
+            )
+        except OSError as e:
+            raise SSHError(f"SSH command execution failed: {e}")
+        
+        # Reader threads drain both pipes so neither can fill up and stall
+        # the command; callbacks still run on the calling thread
+        lines: "queue.Queue[Optional[Tuple[Callable[[str], None], str]]]" = queue.Queue()
+        
+        def pump(stream: IO[str], handler: Callable[[str], None]) -> None:
+            # Always signal the end, so a reader that dies is not taken for a timeout
+            try:
+                with stream:
+                    for line in stream:
+                        lines.put((handler, line))
+            finally:
+                lines.put(None)
+        
+        for stream, handler in ((proc.stdout, on_stdout), (proc.stderr, on_stderr or on_stdout)):
+            threading.Thread(target=pump, args=(stream, handler), daemon=True).start()
+        
+        open_streams = 2
+        try:
+            while open_streams:
+                item = lines.get(timeout=max(deadline - time.monotonic(), 0))
+                if item is None:
+                    open_streams -= 1
+                else:
+                    handler, line = item
+                    handler(line)
+            return proc.wait(timeout=max(deadline - time.monotonic(), 0))
+        except (queue.Empty, subprocess.TimeoutExpired):
+            raise SSHError(f"Command timed out after {timeout} seconds")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+    
+    async def execute_command_async(self, command: str, timeout: int = 120) -> Tuple[int, str, str]:
+        """Execute a command on the remote instance without blocking the event loop.
+        
+        Args:
+            command: Command to execute
+            timeout: Command timeout in seconds
+            
+        Returns:
+            Tuple of (return_code, stdout, stderr)
+            
+        Raises:
+            SSHError: If SSH execution fails
+        """
+        import asyncio
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self._build_ssh_command(command),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            raise SSHError(f"SSH command execution failed: {e}")
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise SSHError(f"Command timed out after {timeout} seconds")
+        
+        # The process has exited once communicate() returns; wait() just reports it
+        return_code = await proc.wait()
+        return return_code, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    
+    def execute_many(self, commands: List[str], timeout: int = 120) -> List[Tuple[int, str, str]]:
+        """Execute several commands on the remote instance over one SSH session.
+        
+        The commands are fed to a remote shell one after another, each in its
+        own subshell with stdin from /dev/null, so one failing or calling
+        exit does not stop the rest. Marker lines after each command separate
+        their output and carry the exit status.
+        
+        Args:
+            commands: Commands to execute, in order
+            timeout: Timeout for the whole sequence in seconds
+            
+        Returns:
+            (return_code, stdout, stderr) for each command. If the session
+            ends early, the remaining commands get the ssh exit status.
+            
+        Raises:
+            SSHError: If SSH execution fails
+        """
+        if not commands:
+            return []
+        
+        nonce = secrets.token_hex(8)
+        script = "".join(
+            f"( {command}\n) </dev/null\n"
+            f"printf '\\n__CLWD_RC_{nonce}_{i}__ %d\\n' $?\n"
+            f"printf '\\n__CLWD_ERR_{nonce}_{i}__\\n' >&2\n"
+            for i, command in enumerate(commands)
+        )
+        
+        try:
+            result = subprocess.run(
+                self._build_ssh_command("bash -s"),
+                input=script,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise SSHError(f"Commands timed out after {timeout} seconds")
+        except subprocess.SubprocessError as e:
+            raise SSHError(f"SSH command execution failed: {e}")
+        
+        stdout_markers = re.compile(rf"\n__CLWD_RC_{nonce}_(\d+)__ (\d+)\n")
+        stderr_markers = re.compile(rf"\n__CLWD_ERR_{nonce}_(\d+)__\n")
+        
+        # The markers start with a newline so they sit on their own line;
+        # it belongs to the marker, not to the command's output
+        outputs, stdout_rest = _split_on_markers(result.stdout or "", stdout_markers)
+        errors, stderr_rest = _split_on_markers(result.stderr or "", stderr_markers)
+        
+        results = []
+        for i in range(len(commands)):
+            if i < len(outputs):
+                out, match = outputs[i]
+                err = errors[i][0] if i < len(errors) else ""
+                results.append((int(match.group(2)), out, err))
+            elif i == len(outputs):
+                results.append((result.returncode, stdout_rest, stderr_rest))
+            else:
+                results.append((result.returncode, "", ""))
+        
+        return results
     
     def execute_interactive(self, command: Optional[str] = None) -> int:
         """Start an interactive SSH session.
@@ -179,7 +554,7 @@ class SSHOperations:
         remote_path: str,
         timeout: int = 60
     ) -> bool:
-        """Copy a file to the remote instance using SCP.
+        """Copy a file to the remote instance.
         
         Args:
             local_path: Local file path
@@ -189,74 +564,172 @@ class SSHOperations:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            scp_cmd = ["scp"]
+        return self.copy_files_to_remote([(local_path, remote_path)], timeout=timeout)
+    
+    def copy_files_to_remote(self, pairs: List[Tuple[str, str]], timeout: int = 60) -> bool:
+        """Copy several files to the remote instance in one SFTP session.
+        
+        Args:
+            pairs: (local path, remote path) for each file
+            timeout: Timeout for the whole transfer in seconds
             
-            # SCP options matching SSH options
-            scp_cmd.extend([
-                "-o", "StrictHostKeyChecking=no",
-                "-o", "UserKnownHostsFile=/dev/null", 
-                "-o", "LogLevel=ERROR",
-                "-o", "ConnectTimeout=10",
-            ])
+        Returns:
+            True if every file was copied, False otherwise
+        """
+        if not pairs:
+            return True
+        
+        sftp_cmd = [_SFTP, "-b", "-"]  # Batch from stdin; abort on first error
+        
+        # SFTP options matching SSH options
+        sftp_cmd.extend([
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "UserKnownHostsFile=/dev/null", 
+            "-o", "LogLevel=ERROR",
+            "-o", "ConnectTimeout=10",
+            "-o", f"Ciphers={CIPHERS}",
+        ])
+        sftp_cmd.extend(self._control_options())
+        
+        if self._worth_compressing(local for local, _ in pairs):
+            sftp_cmd.append("-C")
+        
+        # Add SSH key if available
+        if self.ssh_key_path:
+            sftp_cmd.extend(["-i", self.ssh_key_path])
+        
+        sftp_cmd.append(f"{self.user}@{self.ip}")
+        
+        batch = "".join(
+            f"put {_sftp_quote(local)} {_sftp_quote(remote)}\n" for local, remote in pairs
+        )
+        
+        try:
+            result = subprocess.run(
+                sftp_cmd,
+                input=batch,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
             
-            # Add SSH key if available
-            if self.ssh_key_path:
-                scp_cmd.extend(["-i", self.ssh_key_path])
+            return result.returncode == 0
             
-            # Add source and destination
-            scp_cmd.extend([
-                local_path,
-                f"{self.user}@{self.ip}:{remote_path}"
-            ])
+        except (OSError, subprocess.SubprocessError):
+            return False
+    
+    @staticmethod
+    def _worth_compressing(local_paths: Any) -> bool:
+        """Check whether any file is large and not already compressed."""
+        for local_path in local_paths:
+            if Path(local_path).suffix.lower() in COMPRESSED_SUFFIXES:
+                continue
+            try:
+                if os.path.getsize(local_path) > COMPRESS_MIN_SIZE:
+                    return True
+            except OSError:
+                continue
+        return False
+    
+    def write_files(self, files: Dict[str, Union[str, bytes]], timeout: int = 60) -> bool:
+        """Write several small files below the remote home directory at once.
+        
+        The files are packed into an in-memory tar archive and unpacked by a
+        single remote tar process, so nothing is written to local disk and
+        only one SSH session is used however many files there are.
+        
+        Args:
+            files: Mapping of paths relative to the remote home directory
+                to text or raw file contents; missing parent directories
+                are created
+            timeout: Transfer timeout in seconds
             
+        Returns:
+            True if successful, False otherwise
+        """
+        import io
+        import tarfile
+        
+        # Plain ustar headers; a few small files never need pax extensions
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w", format=tarfile.USTAR_FORMAT) as archive:
+            for path, content in files.items():
+                data = content.encode() if isinstance(content, str) else content
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mode = 0o600
+                archive.addfile(info, io.BytesIO(data))
+        
+        try:
             result = subprocess.run(
-                scp_cmd,
+                self._build_ssh_command('tar -xmf - -C "$HOME"'),
+                input=buffer.getvalue(),
                 capture_output=True,
                 timeout=timeout
             )
-            
             return result.returncode == 0
-            
         except (subprocess.SubprocessError, subprocess.TimeoutExpired):
             return False
     
-    def wait_for_setup_complete(self, timeout: int = 300) -> bool:
+    def wait_for_setup_complete(self, timeout: int = 300, retry_interval: float = 5.0) -> bool:
         """Wait for instance setup to complete by checking for marker file.
         
+        A single ssh session runs a remote loop that watches for the marker,
+        instead of connecting again for every check. The session is only
+        re-established if it cannot connect or drops before the deadline.
+        
         Args:
             timeout: Maximum time to wait in seconds
+            retry_interval: Delay before reconnecting after a failed session
             
         Returns:
             True if setup completed, False if timeout
         """
-        start_time = asyncio.get_event_loop().time() if hasattr(asyncio, 'get_event_loop') else 0
+        deadline = time.monotonic() + timeout
         
         while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            
             try:
-                # Check for setup completion marker
-                return_code, stdout, stderr = self.execute_command(
-                    "test -f /tmp/clwd-setup-complete",
-                    timeout=10
+                proc = subprocess.Popen(
+                    self._build_ssh_command(SETUP_WAIT_COMMAND),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
                 )
-                
-                if return_code == 0:
-                    return True
-                    
-                # Check for timeout
-                current_time = asyncio.get_event_loop().time() if hasattr(asyncio, 'get_event_loop') else start_time + 1
-                if current_time - start_time > timeout:
-                    return False
-                
-                # Wait before retrying
-                import time
-                time.sleep(5)
-                
-            except SSHError:
-                # SSH not ready yet, continue waiting
-                import time
-                time.sleep(5)
-                continue
+            except OSError:
+                return False
+            
+            try:
+                stdout, _ = proc.communicate(timeout=remaining)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                return False
+            
+            if proc.returncode == 0 and b"READY" in stdout:
+                return True
+            
+            # Not reachable yet, or the session dropped; try again shortly
+            time.sleep(max(0.0, min(retry_interval, deadline - time.monotonic())))
+    
+    def close(self) -> None:
+        """Stop the shared master connection for this host, if one is running."""
+        self._last_ok = float("-inf")
+        control_path = self._control_path()
+        if not control_path.exists():
+            return
+        
+        try:
+            subprocess.run(
+                [_SSH, "-o", f"ControlPath={control_path}", "-O", "exit", f"{self.user}@{self.ip}"],
+                capture_output=True,
+                timeout=5
+            )
+        except (OSError, subprocess.SubprocessError):
+            pass  # The master exits on its own after ControlPersist
     
     def get_instance_info(self) -> Dict[str, Any]:
         """Get basic information about the remote instance.
@@ -274,28 +747,26 @@ class SSHOperations:
         }
         
         try:
-            # Test connection
-            info["connection_available"] = self.test_connection(timeout=5)
-            
-            if info["connection_available"]:
-                # Check setup status
-                return_code, _, _ = self.execute_command("test -f /tmp/clwd-setup-complete", timeout=5)
-                info["setup_complete"] = (return_code == 0)
-                
-                # Get basic system info
-                try:
-                    return_code, stdout, _ = self.execute_command("uname -a && uptime", timeout=10)
-                    if return_code == 0:
-                        lines = stdout.strip().split('\n')
-                        if len(lines) >= 2:
-                            info["system_info"]["kernel"] = lines[0]
-                            info["system_info"]["uptime"] = lines[1]
-                except SSHError:
-                    pass  # System info is optional
-                    
+            _, stdout, _ = self.execute_command(INSTANCE_INFO_COMMAND, timeout=10)
         except Exception:
-            pass  # Connection info is best-effort
-            
+            return info  # Connection info is best-effort
+        
+        lines = stdout.splitlines()
+        if "__CONN_OK__" not in lines:
+            return info
+        
+        info["connection_available"] = True
+        info["setup_complete"] = "__SETUP_OK__" in lines
+        
+        # System info is optional; it follows the setup marker
+        for marker in ("__SETUP_OK__", "__SETUP_NO__"):
+            if marker in lines:
+                system_lines = lines[lines.index(marker) + 1:]
+                if len(system_lines) >= 2:
+                    info["system_info"]["kernel"] = system_lines[0]
+                    info["system_info"]["uptime"] = system_lines[1]
+                break
+        
         return info
 
 
@@ -305,6 +776,9 @@ class SSHSessionManager:
     def __init__(self):
         """Initialize session manager."""
         self._sessions: Dict[str, SSHOperations] = {}
+        # Guards session creation so concurrent callers share one session
+        # (and so one control master) per user@host
+        self._lock = threading.Lock()
     
     def get_session(self, ip: str, user: str = "root") -> SSHOperations:
         """Get or create SSH session for an instance.
@@ -318,24 +792,55 @@ class SSHSessionManager:
         """
         session_key = f"{user}@{ip}"
         
-        if session_key not in self._sessions:
-            self._sessions[session_key] = SSHOperations(ip, user)
+        session = self._sessions.get(session_key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.setdefault(session_key, SSHOperations(ip, user))
         
-        return self._sessions[session_key]
+        return session
     
     def remove_session(self, ip: str, user: str = "root") -> None:
-        """Remove SSH session from cache.
+        """Remove SSH session from cache and close its master connection.
         
         Args:
             ip: Instance IP address
             user: SSH user
         """
         session_key = f"{user}@{ip}"
-        self._sessions.pop(session_key, None)
+        session = self._sessions.pop(session_key, None) or SSHOperations(ip, user)
+        session.close()
+    
+    async def gather(
+        self,
+        ops: List[Tuple[SSHOperations, str]],
+        timeout: int = 120
+    ) -> List[Tuple[int, str, str]]:
+        """Run commands on several sessions concurrently.
+        
+        Args:
+            ops: (session, command) pairs
+            timeout: Timeout for each command in seconds
+            
+        Returns:
+            (return_code, stdout, stderr) for each pair, in order
+            
+        Raises:
+            SSHError: If any SSH execution fails
+        """
+        import asyncio
+        
+        return list(await asyncio.gather(*(
+            session.execute_command_async(command, timeout=timeout) for session, command in ops
+        )))
     
     def clear_all_sessions(self) -> None:
-        """Clear all cached SSH sessions."""
-        self._sessions.clear()
+        """Clear all cached SSH sessions and close their master connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        
+        for session in sessions:
+            session.close()
 
 
 # Global session manager instance
@@ -0,0 +1,10 @@
+"""Shared test fixtures."""
+
+import pytest
+from click.testing import CliRunner
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """CLI runner shared by all tests; each invoke() isolates its own I/O."""
+    return CliRunner()
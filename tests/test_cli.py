@@ -1,17 +1,26 @@
 """Tests for CLI interface."""
 
+import io
+import os
+import subprocess
+import sys
+
 import pytest
-from click.testing import CliRunner
+from rich.console import Console
+from unittest.mock import patch
+
+from clwd.providers import Instance
+from clwd.utils.config import Config
 
-from clwd.cli.main import cli
+from clwd.cli.__main__ import main
+from clwd.cli.main import _NullProgress, _progress, _run_async, cli
 
 
 class TestCLI:
     """Test the main CLI interface."""
     
-    def test_cli_help(self):
+    def test_cli_help(self, runner):
         """Test CLI help output."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["--help"])
         
         assert result.exit_code == 0
@@ -22,17 +31,60 @@ class TestCLI:
         assert "status" in result.output
         assert "destroy" in result.output
     
-    def test_cli_version(self):
+    def test_cli_version(self, runner):
         """Test CLI version output."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["--version"])
         
         assert result.exit_code == 0
         assert "1.0.0" in result.output
     
-    def test_init_command_help(self):
+    def test_cli_short_version(self, runner):
+        """Test -V is accepted as an alias for --version."""
+        result = runner.invoke(cli, ["-V"])
+        
+        assert result.exit_code == 0
+        assert "1.0.0" in result.output
+    
+    def test_entry_point_version_fast_path(self, monkeypatch, capsys):
+        """Test the entry point answers --version without click."""
+        monkeypatch.setattr(sys, "argv", ["clwd", "--version"])
+        
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        
+        assert exc_info.value.code == 0
+        assert capsys.readouterr().out == "clwd, version 1.0.0\n"
+    
+    def test_import_keeps_startup_light(self):
+        """Test importing the command tree does not load Rich or providers."""
+        script = (
+            "import sys, clwd.cli.main; "
+            "print(' '.join(m for m in ('rich', 'hcloud', 'asyncio', 'clwd.providers.hetzner') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.strip() == ""
+    
+    def test_empty_config_list_skips_table_import(self, tmp_path):
+        """Test listing an empty store does not load Rich's table module."""
+        script = (
+            "import sys; from clwd.cli.main import cli; "
+            "cli(['config', 'list'], standalone_mode=False); "
+            "print('rich.table' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+            env={**os.environ, "HOME": str(tmp_path)}
+        )
+        
+        assert "No projects configured yet" in result.stdout
+        assert result.stdout.strip().endswith("False")
+    
+    def test_init_command_help(self, runner):
         """Test init command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["init", "--help"])
         
         assert result.exit_code == 0
@@ -42,34 +94,30 @@ class TestCLI:
         assert "--hardening" in result.output
         assert "--premium" in result.output
     
-    def test_init_command_missing_name(self):
+    def test_init_command_missing_name(self, runner):
         """Test init command fails without name."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["init"])
         
         assert result.exit_code != 0
         assert "Missing option '--name'" in result.output
     
-    def test_init_command_with_premium_flag(self):
+    def test_init_command_with_premium_flag(self, runner):
         """Test init command with premium flag shows warning."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["init", "--name", "test-project", "--premium"])
         
         assert "Premium service is not yet available" in result.output
         assert "test-project" in result.output
     
-    def test_open_command_help(self):
+    def test_open_command_help(self, runner):
         """Test open command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["open", "--help"])
         
         assert result.exit_code == 0
         assert "--name" in result.output
         assert "interactive SSH session" in result.output
     
-    def test_exec_command_help(self):
+    def test_exec_command_help(self, runner):
         """Test exec command help."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["exec", "--help"])
         
         assert result.exit_code == 0
@@ -77,67 +125,366 @@ class TestCLI:
         assert "--timeout" in result.output
         assert "COMMAND" in result.output
     
-    def test_status_command_not_implemented(self):
+    def test_status_command_not_implemented(self, runner):
         """Test status command shows not implemented message."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["status", "--name", "test"])
         
         assert "not yet implemented" in result.output
     
-    def test_destroy_command_with_force(self):
+    def test_destroy_command_with_force(self, runner):
         """Test destroy command with force flag."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["destroy", "--name", "test", "--force"])
         
         assert "Destroying project: test" in result.output
         assert "not yet implemented" in result.output
     
-    def test_destroy_command_without_force_cancelled(self):
+    def test_destroy_command_without_force_cancelled(self, runner):
         """Test destroy command without force gets cancelled."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["destroy", "--name", "test"], input="n\n")
         
         assert "Operation cancelled" in result.output
     
-    def test_config_list_command(self):
+    def test_config_list_command(self, runner):
         """Test config list command."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["config", "list"])
         
         assert result.exit_code == 0
         assert "Configured projects" in result.output
         assert "No projects configured yet" in result.output
     
-    def test_config_show_command(self):
+    def test_config_show_command(self, runner):
         """Test config show command."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["config", "show", "--name", "test"])
         
         assert "Configuration for project: test" in result.output
         assert "not yet implemented" in result.output
     
-    def test_premium_status_command(self):
+    def test_premium_status_command(self, runner):
         """Test premium status command."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["premium", "status"])
         
         assert result.exit_code == 0
         assert "Premium service status" in result.output
         assert "not yet available" in result.output
     
-    def test_premium_login_command(self):
+    def test_premium_login_command(self, runner):
         """Test premium login command."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["premium", "login"])
         
         assert result.exit_code == 0
         assert "Premium service authentication" in result.output
         assert "not yet available" in result.output
     
-    def test_debug_flag(self):
+    def test_config_not_loaded_until_needed(self, runner):
+        """Test commands that never read projects skip loading the store."""
+        with patch("clwd.utils.config.Config.load_cached") as mock_load:
+            result = runner.invoke(cli, ["premium", "status"])
+        
+        assert result.exit_code == 0
+        mock_load.assert_not_called()
+    
+    def test_debug_flag(self, runner):
         """Test debug flag is passed through context."""
-        runner = CliRunner()
         result = runner.invoke(cli, ["--debug", "config", "list"])
         
         assert result.exit_code == 0
-        assert "Debug mode enabled" in result.output
\ No newline at end of file
+        assert "Debug mode enabled" in result.output
+
+
+class TestProjectCommands:
+    """Test commands that read configured projects."""
+    
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Config with a single running project."""
+        config = Config(str(tmp_path))
+        config.add_project("demo", Instance(
+            id="42", name="clwd-demo", ip="1.2.3.4", provider="hetzner",
+            status="running", created_at="2024-01-01T00:00:00",
+            metadata={"region": "nbg1"}
+        ))
+        with patch("clwd.utils.config.Config.load_cached", return_value=config):
+            yield config
+    
+    def test_status_shows_instance_details(self, config, runner):
+        """Test status prints the instance table, URLs and next steps."""
+        result = runner.invoke(cli, ["status", "--name", "demo"])
+        
+        assert result.exit_code == 0
+        assert "Status for project: demo" in result.output
+        assert "1.2.3.4" in result.output
+        assert "Region" in result.output
+        assert "Preview URL: http://1.2.3.4" in result.output
+        assert "SSH Command: ssh root@1.2.3.4" in result.output
+        assert "clwd open --name demo" in result.output
+    
+    def test_config_list_shows_projects(self, config, runner):
+        """Test config list renders one row per project."""
+        result = runner.invoke(cli, ["config", "list"])
+        
+        assert result.exit_code == 0
+        assert "Configured projects (1)" in result.output
+        assert "demo" in result.output
+        assert "running" in result.output
+        assert "1.2.3.4" in result.output
+        assert "2024-01-01" in result.output
+        assert "T00:00:00" not in result.output
+    
+    def test_config_show_renders_json_verbatim(self, config, runner):
+        """Test project JSON is shown as-is, without markup interpretation."""
+        config.update_project("demo", {"note": "[bold]keep[/bold]"})
+        
+        result = runner.invoke(cli, ["config", "show", "--name", "demo"])
+        
+        assert result.exit_code == 0
+        assert '"ip": "1.2.3.4"' in result.output
+        assert "[bold]keep[/bold]" in result.output
+    
+    def test_init_missing_credentials_creates_nothing(self, config, runner):
+        """Test auth prep overlaps provider setup but still fails before create."""
+        from unittest.mock import AsyncMock, Mock
+        
+        provider = Mock(create_instance=AsyncMock())
+        with patch("clwd.providers.hetzner.HetznerProvider", return_value=provider) as mock_provider, \
+             patch("clwd.utils.keychain.get_claude_authentication", return_value=(None, None)) as mock_auth:
+            result = runner.invoke(cli, ["init", "fresh"])
+        
+        assert result.exit_code == 1
+        assert "No Claude Code credentials found" in result.output
+        mock_provider.assert_called_once_with(region="nbg1")
+        mock_auth.assert_called_once_with()
+        provider.create_instance.assert_not_called()
+        assert not config.project_exists("fresh")
+    
+    def test_init_reads_credentials_off_the_event_loop(self, config, runner):
+        """Test the keychain read runs in a worker thread, not on the loop."""
+        import threading
+        from unittest.mock import AsyncMock, Mock
+        
+        auth_threads = []
+        
+        def read_credentials():
+            auth_threads.append(threading.current_thread())
+            return None, None
+        
+        provider = Mock(create_instance=AsyncMock())
+        with patch("clwd.providers.hetzner.HetznerProvider", return_value=provider), \
+             patch("clwd.utils.keychain.get_claude_authentication", side_effect=read_credentials):
+            runner.invoke(cli, ["init", "fresh"])
+        
+        assert len(auth_threads) == 1
+        assert auth_threads[0] is not threading.main_thread()
+
+    def test_init_copies_credentials_without_fixed_delay(self, config, runner):
+        """Test credentials go over as soon as claude-user can log in."""
+        from unittest.mock import AsyncMock, Mock
+        
+        instance = Instance(
+            id="7", name="clwd-fresh", ip="5.6.7.8", provider="hetzner",
+            status="running", created_at="2024-01-01T00:00:00", metadata={}
+        )
+        provider = Mock(
+            create_instance=AsyncMock(return_value=instance),
+            wait_for_ssh=AsyncMock(return_value=True),
+        )
+        session = Mock()
+        session.wait_for_setup_complete.return_value = True
+        session.wait_for_connection.return_value = True
+        session.write_files.return_value = True
+        
+        with patch("clwd.providers.hetzner.HetznerProvider", return_value=provider), \
+             patch("clwd.utils.keychain.get_claude_authentication", return_value=('{"t": 1}', "{}")), \
+             patch("clwd.utils.ssh.ssh_manager.get_session", return_value=session), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = runner.invoke(cli, ["init", "fresh"])
+        
+        assert result.exit_code == 0, result.output
+        mock_sleep.assert_not_called()
+        session.write_files.assert_called_once()
+        session.wait_for_connection.assert_not_called()
+        assert config.get_project("fresh")["metadata"]["setup_complete"] is True
+    
+    def test_init_retries_credential_copy_after_login_wait(self, config, runner):
+        """Test a failed upload waits for the claude-user login and retries once."""
+        from unittest.mock import AsyncMock, Mock
+        
+        instance = Instance(
+            id="7", name="clwd-fresh", ip="5.6.7.8", provider="hetzner",
+            status="running", created_at="2024-01-01T00:00:00", metadata={}
+        )
+        provider = Mock(
+            create_instance=AsyncMock(return_value=instance),
+            wait_for_ssh=AsyncMock(return_value=True),
+        )
+        session = Mock()
+        session.wait_for_setup_complete.return_value = True
+        session.wait_for_connection.return_value = True
+        session.write_files.side_effect = [False, True]
+        
+        with patch("clwd.providers.hetzner.HetznerProvider", return_value=provider), \
+             patch("clwd.utils.keychain.get_claude_authentication", return_value=('{"t": 1}', "{}")), \
+             patch("clwd.utils.ssh.ssh_manager.get_session", return_value=session):
+            result = runner.invoke(cli, ["init", "fresh"])
+        
+        assert result.exit_code == 0, result.output
+        session.wait_for_connection.assert_called_once_with(timeout=30)
+        assert session.write_files.call_count == 2
+        assert "credentials, session and settings copied" in result.output
+    
+    def test_claude_settings_ready_to_upload(self):
+        """Test the settings shipped to instances are prebuilt JSON bytes."""
+        import json
+
+        from clwd.cli.main import _CLAUDE_SETTINGS_JSON
+
+        assert isinstance(_CLAUDE_SETTINGS_JSON, bytes)
+        settings = json.loads(_CLAUDE_SETTINGS_JSON)
+        assert settings["permissions"] == {"defaultMode": "acceptEdits"}
+        assert settings["autoUpdates"] is False
+
+    def test_open_records_setup_and_skips_probe_afterwards(self, config, runner):
+        """Test the setup probe runs until completion is recorded, then not again."""
+        with patch("clwd.utils.ssh.SSHOperations.check_setup_complete", return_value=True) as mock_probe, \
+             patch("clwd.utils.ssh.SSHOperations.execute_interactive", return_value=0) as mock_shell:
+            first = runner.invoke(cli, ["open", "demo"])
+            second = runner.invoke(cli, ["open", "demo"])
+        
+        assert first.exit_code == 0
+        assert second.exit_code == 0
+        mock_probe.assert_called_once()
+        assert mock_shell.call_count == 2
+        assert config.get_project("demo")["metadata"]["setup_complete"] is True
+    
+    def test_config_list_piped_output_is_tab_separated(self, config, runner):
+        """Test non-terminal output skips the table for parseable rows."""
+        result = runner.invoke(cli, ["config", "list"])
+        
+        assert result.exit_code == 0
+        assert "Project\tStatus\tIP Address\tProvider\tCreated" in result.output
+        assert "demo\trunning\t1.2.3.4\thetzner\t2024-01-01" in result.output
+    
+    def test_config_list_terminal_output_is_a_table(self, config, runner):
+        """Test terminal output still renders the Rich table."""
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=True, width=100)
+        
+        with patch("clwd.cli.main._console", return_value=console):
+            result = runner.invoke(cli, ["config", "list"])
+        
+        assert result.exit_code == 0
+        assert "\t" not in output.getvalue()
+        assert "┏━" in output.getvalue()
+    
+    def test_exec_quotes_instruction_for_remote_shell(self, config, runner):
+        """Test quotes and shell metacharacters reach claude as one argument."""
+        import shlex
+        
+        instruction = "fix the user's $HOME `bug`; rm -rf /"
+        with patch("clwd.utils.ssh.SSHOperations.test_connection", return_value=True), \
+             patch("clwd.utils.ssh.SSHOperations.execute_command", return_value=(0, "done", "")) as mock_exec:
+            result = runner.invoke(cli, ["exec", "--name", "demo", instruction])
+        
+        assert result.exit_code == 0
+        assert mock_exec.call_args.kwargs["capture_output"] is False
+        command = mock_exec.call_args[0][0]
+        assert command.startswith("cd /app && ")
+        assert shlex.split(command.split(" && ", 1)[1]) == [
+            "claude", "-p", "--dangerously-skip-permissions", instruction
+        ]
+    
+    def test_status_unknown_project(self, config, runner):
+        """Test status fails for a project that does not exist."""
+        result = runner.invoke(cli, ["status", "--name", "missing"])
+        
+        assert result.exit_code == 1
+        assert "Project 'missing' not found" in result.output
+    
+    def test_destroy_declined_keeps_project(self, config, runner):
+        """Test declining the destroy prompt leaves the project in place."""
+        result = runner.invoke(cli, ["destroy", "demo"], input="n\n")
+        
+        assert result.exit_code == 0
+        assert "About to destroy" in result.output
+        assert "Instance ID: 42" in result.output
+        assert "Operation cancelled" in result.output
+        assert config.project_exists("demo")
+    
+    def test_project_selection_lists_projects(self, config, runner):
+        """Test the selection table shows each project with a short date."""
+        result = runner.invoke(cli, ["destroy"], input="q\n")
+        
+        assert result.exit_code == 0
+        assert "Select a project to destroy" in result.output
+        assert "demo" in result.output
+        assert "2024-01-01" in result.output
+        assert "T00:00:00" not in result.output
+    
+    def test_project_selection_retries_invalid_choice(self, config, runner):
+        """Test out-of-range and non-numeric choices prompt again."""
+        result = runner.invoke(cli, ["destroy", "--force"], input="0\nabc\n2\nq\n")
+        
+        assert result.exit_code == 0
+        assert result.output.count("Invalid selection") == 3
+        assert config.project_exists("demo")
+    
+    def test_project_selection_empty_answer_quits(self, config, runner):
+        """Test pressing enter without a choice cancels the selection."""
+        result = runner.invoke(cli, ["destroy", "--force"], input="\n")
+        
+        assert result.exit_code == 0
+        assert "Invalid selection" not in result.output
+        assert config.project_exists("demo")
+
+
+class TestRunAsync:
+    """Test the event loop helper used by provider-backed commands."""
+    
+    def test_returns_coroutine_result(self):
+        """Test the coroutine result is returned to the caller."""
+        async def provision():
+            return "instance-1"
+        
+        assert _run_async(provision()) == "instance-1"
+    
+    def test_propagates_exceptions(self):
+        """Test exceptions raised inside the coroutine reach the caller."""
+        async def provision():
+            raise RuntimeError("quota exceeded")
+        
+        with pytest.raises(RuntimeError, match="quota exceeded"):
+            _run_async(provision())
+    
+    def test_uses_uvloop_when_installed(self):
+        """Test the uvloop event loop is preferred when importable."""
+        import asyncio
+        from unittest.mock import Mock
+        
+        fake_uvloop = Mock(new_event_loop=Mock(side_effect=asyncio.new_event_loop))
+        
+        async def provision():
+            return "instance-1"
+        
+        with patch.dict(sys.modules, {"uvloop": fake_uvloop}):
+            assert _run_async(provision()) == "instance-1"
+        
+        fake_uvloop.new_event_loop.assert_called_once_with()
+
+
+
+class TestProgress:
+    """Test progress reporting for provider-backed commands."""
+    
+    def test_plain_lines_when_not_a_terminal(self):
+        """Test redirected output gets one line per step, no live display."""
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=False)
+        
+        with _progress(console) as progress:
+            assert isinstance(progress, _NullProgress)
+            task = progress.add_task("Initializing project...", total=None)
+            progress.update(task, description="Creating cloud instance...")
+        
+        assert output.getvalue().splitlines() == [
+            "→ Initializing project...",
+            "→ Creating cloud instance...",
+        ]
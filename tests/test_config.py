@@ -3,7 +3,6 @@
 import json
 import os
 import pytest
-import tempfile
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import patch, mock_open
@@ -13,13 +12,28 @@ from clwd.utils.config import (
     Config,
     ConfigError,
     ProjectNotFoundError,
-    ProjectExistsError
+    ProjectExistsError,
+    format_json
 )
+from clwd.utils.jsonio import dumps
 
 
 class TestConfig:
     """Test the Config class."""
     
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Config rooted in the test's own temporary directory."""
+        return Config(str(tmp_path))
+    
+    @pytest.fixture
+    def instance(self):
+        """Instance used by tests that only need some project to store."""
+        return Instance(
+            id="123", name="test", ip="1.1.1.1", provider="test",
+            status="running", created_at="2024-01-01", metadata={}
+        )
+    
     def test_init_default_config_dir(self):
         """Test initialization with default config directory."""
         with patch('pathlib.Path.mkdir') as mock_mkdir:
@@ -43,470 +57,702 @@ class TestConfig:
             with pytest.raises(ConfigError, match="Failed to create config directory"):
                 Config()
     
-    def test_load_projects_empty(self):
+    def test_load_projects_empty(self, config):
         """Test loading projects when file doesn't exist."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            projects = config.load_projects()
-            
-            assert projects == {}
+        projects = config.load_projects()
+        
+        assert projects == {}
     
-    def test_load_projects_with_data(self):
+    def test_load_projects_with_data(self, config):
         """Test loading projects with existing data."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Create test data
-            test_projects = {
-                "test-project": {
-                    "id": "123",
-                    "name": "test-instance",
-                    "ip": "192.168.1.1",
-                    "provider": "hetzner",
-                    "status": "running"
-                }
+        # Create test data
+        test_projects = {
+            "test-project": {
+                "id": "123",
+                "name": "test-instance",
+                "ip": "192.168.1.1",
+                "provider": "hetzner",
+                "status": "running"
             }
-            
-            # Write test data
-            config.projects_file.write_text(json.dumps(test_projects))
-            
-            projects = config.load_projects()
-            assert projects == test_projects
+        }
+        
+        # Write test data
+        config.projects_file.write_text(json.dumps(test_projects))
+        
+        projects = config.load_projects()
+        assert projects == test_projects
     
-    def test_load_projects_invalid_json(self):
+    def test_load_projects_invalid_json(self, config):
         """Test loading projects with invalid JSON."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Write invalid JSON
-            config.projects_file.write_text("{ invalid json")
-            
-            with pytest.raises(ConfigError, match="Failed to load"):
-                config.load_projects()
+        # Write invalid JSON
+        config.projects_file.write_text("{ invalid json")
+        
+        with pytest.raises(ConfigError, match="Failed to load"):
+            config.load_projects()
     
-    def test_save_projects(self):
+    def test_save_projects(self, config):
         """Test saving projects to file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            test_projects = {
-                "project1": {"id": "123", "name": "test"}
-            }
-            
-            config.save_projects(test_projects)
-            
-            # Verify file was created with correct content
-            assert config.projects_file.exists()
-            saved_data = json.loads(config.projects_file.read_text())
-            assert saved_data == test_projects
-    
-    def test_save_projects_creates_backup(self):
-        """Test that saving creates backup of existing file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Create initial file
-            initial_data = {"old": "data"}
-            config.projects_file.write_text(json.dumps(initial_data))
-            
-            # Save new data
-            new_data = {"new": "data"}
-            config.save_projects(new_data)
-            
-            # Check backup was created
-            backup_file = config.projects_file.with_suffix(".json.backup")
-            assert backup_file.exists()
-            
-            backup_data = json.loads(backup_file.read_text())
-            assert backup_data == initial_data
+        test_projects = {
+            "project1": {"id": "123", "name": "test"}
+        }
+        
+        config.save_projects(test_projects)
+        
+        # Verify file was created with correct content
+        assert config.projects_file.exists()
+        saved_data = json.loads(config.projects_file.read_text())
+        assert saved_data == test_projects
     
-    def test_add_project(self):
+    def test_save_projects_does_not_create_backup(self, config):
+        """Test that plain saves leave no backup behind."""
+        config.projects_file.write_text(json.dumps({"old": "data"}))
+        
+        config.save_projects({"new": "data"})
+        
+        assert not config.projects_file.with_suffix(".json.backup").exists()
+    
+    def test_backup_projects_creates_backup(self, config):
+        """Test that backup_projects keeps the current projects file."""
+        # Create initial file
+        initial_data = {"old": "data"}
+        config.projects_file.write_text(json.dumps(initial_data))
+        
+        backup_file = config.backup_projects()
+        config.save_projects({"new": "data"})
+        
+        assert backup_file == config.projects_file.with_suffix(".json.backup")
+        backup_data = json.loads(backup_file.read_text())
+        assert backup_data == initial_data
+    
+    def test_backup_projects_without_projects_file(self, config):
+        """Test that there is nothing to back up before the first save."""
+        assert config.backup_projects() is None
+    
+    def test_backup_is_hard_link_to_current_version(self, config):
+        """Test the backup reuses the file's inode instead of copying."""
+        config.save_projects({"v": 1})
+        
+        with patch('clwd.utils.config.shutil.copyfile') as mock_copy:
+            backup_file = config.backup_projects()
+        
+        assert backup_file.stat().st_ino == config.projects_file.stat().st_ino
+        mock_copy.assert_not_called()
+        
+        config.save_projects({"v": 2})
+        assert json.loads(backup_file.read_text()) == {"v": 1}
+    
+    def test_backup_copies_without_hard_links(self, config):
+        """Test backups fall back to a plain content copy when linking fails."""
+        config.save_projects({"v": 1})
+        
+        with patch('clwd.utils.config.os.link', side_effect=OSError("EPERM")), \
+             patch('clwd.utils.config.shutil.copy2') as mock_copy2:
+            backup_file = config.backup_projects()
+        
+        assert json.loads(backup_file.read_text()) == {"v": 1}
+        mock_copy2.assert_not_called()
+    
+    def test_remove_project_backs_up_first(self, config):
+        """Test removing a project keeps the previous projects file."""
+        config.save_projects({"p1": {"id": "1"}, "p2": {"id": "2"}})
+        
+        config.remove_project("p1")
+        
+        backup_file = config.projects_file.with_suffix(".json.backup")
+        assert json.loads(backup_file.read_text()) == {"p1": {"id": "1"}, "p2": {"id": "2"}}
+    
+    def test_save_unchanged_data_skips_write(self, config):
+        """Test saving identical content leaves the file and backup alone."""
+        config.save_projects({"project1": {"id": "123"}})
+        before = config.projects_file.stat()
+        
+        config.save_projects({"project1": {"id": "123"}})
+        
+        after = config.projects_file.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+        assert not config.projects_file.with_suffix(".json.backup").exists()
+    
+    def test_save_durable_fsyncs(self, config):
+        """Test fsync is only paid for durable saves."""
+        with patch('clwd.utils.config.os.fsync') as mock_fsync:
+            config.save_projects({"a": 1})
+            mock_fsync.assert_not_called()
+            
+            config._save_json_file(config.projects_file, {"a": 2}, durable=True)
+            assert mock_fsync.call_count >= 1
+    
+    def test_batch_writes_once(self, config):
+        """Test changes inside batch() are visible but written once on exit."""
+        with patch('clwd.utils.config.dumps', wraps=dumps) as mock_dumps:
+            with config.batch():
+                for i in range(3):
+                    config.add_project(f"p{i}", Instance(
+                        id=str(i), name=f"clwd-p{i}", ip="1.2.3.4", provider="hetzner",
+                        status="running", created_at="2024-01-01", metadata={}
+                    ))
+                assert config.project_exists("p2")
+                assert not config.projects_file.exists()
+            
+            assert mock_dumps.call_count == 1
+        
+        assert sorted(json.loads(config.projects_file.read_text())) == ["p0", "p1", "p2"]
+    
+    def test_add_project(self, config):
         """Test adding a new project."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123",
-                name="test-instance",
-                ip="192.168.1.1",
-                provider="hetzner",
-                status="running",
-                created_at="2024-01-01T00:00:00Z",
-                metadata={"size": "small"}
-            )
-            
-            config.add_project("test-project", instance)
-            
-            # Verify project was added
-            projects = config.load_projects()
-            assert "test-project" in projects
-            
-            project_data = projects["test-project"]
-            assert project_data["id"] == "123"
-            assert project_data["name"] == "test-instance"
-            assert project_data["project_name"] == "test-project"
-            assert "added_at" in project_data
-            assert "last_accessed" in project_data
-    
-    def test_add_project_empty_name(self):
+        instance = Instance(
+            id="123",
+            name="test-instance",
+            ip="192.168.1.1",
+            provider="hetzner",
+            status="running",
+            created_at="2024-01-01T00:00:00Z",
+            metadata={"size": "small"}
+        )
+        
+        config.add_project("test-project", instance)
+        
+        # Verify project was added
+        projects = config.load_projects()
+        assert "test-project" in projects
+        
+        project_data = projects["test-project"]
+        assert project_data["id"] == "123"
+        assert project_data["name"] == "test-instance"
+        assert project_data["project_name"] == "test-project"
+        assert "added_at" in project_data
+        assert project_data["last_accessed"] == project_data["added_at"]
+    
+    def test_add_project_empty_name(self, config, instance):
         """Test adding project with empty name fails."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            with pytest.raises(ValueError, match="Project name cannot be empty"):
-                config.add_project("", instance)
+        with pytest.raises(ValueError, match="Project name cannot be empty"):
+            config.add_project("", instance)
     
-    def test_add_project_already_exists(self):
+    def test_add_project_already_exists(self, config, instance):
         """Test adding project that already exists fails."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            # Add project first time
+        # Add project first time
+        config.add_project("test-project", instance)
+        
+        # Try to add again
+        with pytest.raises(ProjectExistsError, match="already exists"):
             config.add_project("test-project", instance)
-            
-            # Try to add again
-            with pytest.raises(ProjectExistsError, match="already exists"):
-                config.add_project("test-project", instance)
     
-    def test_get_project(self):
+    def test_add_project_if_missing(self, config, instance):
+        """Test the check and add happen in one pass without a second write."""
+        with patch('clwd.utils.config.dumps', wraps=dumps) as mock_dumps:
+            assert config.add_project_if_missing("test-project", instance) is True
+            assert config.add_project_if_missing(" test-project ", instance) is False
+            
+            assert mock_dumps.call_count == 1
+        assert config.list_projects() == ["test-project"]
+    
+    def test_mutations_copy_only_the_changed_project(self, config):
+        """Test updates leave other cached project dicts untouched and shared."""
+        config.save_projects({"a": {"status": "running"}, "b": {"status": "running"}})
+        before = config._cached_projects()
+        
+        config.update_project_status("a", "stopped")
+        
+        after = config._cached_projects()
+        assert before["a"] == {"status": "running"}
+        assert after["a"]["status"] == "stopped"
+        assert after["b"] is before["b"]
+        
+        config.remove_project("b")
+        assert config.list_projects() == ["a"]
+        assert "b" in before
+    
+    def test_get_project(self, config, instance):
         """Test getting project by name."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            
-            project_data = config.get_project("test-project")
-            assert project_data is not None
-            assert project_data["id"] == "123"
+        config.add_project("test-project", instance)
+        
+        project_data = config.get_project("test-project")
+        assert project_data is not None
+        assert project_data["id"] == "123"
     
-    def test_get_project_not_found(self):
+    def test_get_project_not_found(self, config):
         """Test getting non-existent project returns None."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            project_data = config.get_project("nonexistent")
-            assert project_data is None
+        project_data = config.get_project("nonexistent")
+        assert project_data is None
     
-    def test_get_project_instance(self):
+    def test_get_project_instance(self, config):
         """Test getting project as Instance object."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            original_instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={"size": "small"}
-            )
-            
-            config.add_project("test-project", original_instance)
-            
-            retrieved_instance = config.get_project_instance("test-project")
-            assert retrieved_instance is not None
-            assert isinstance(retrieved_instance, Instance)
-            assert retrieved_instance.id == "123"
-            assert retrieved_instance.name == "test"
-            assert retrieved_instance.metadata == {"size": "small"}
-    
-    def test_get_project_instance_not_found(self):
+        original_instance = Instance(
+            id="123", name="test", ip="1.1.1.1", provider="test",
+            status="running", created_at="2024-01-01", metadata={"size": "small"}
+        )
+        
+        config.add_project("test-project", original_instance)
+        
+        retrieved_instance = config.get_project_instance("test-project")
+        assert retrieved_instance is not None
+        assert isinstance(retrieved_instance, Instance)
+        assert retrieved_instance.id == "123"
+        assert retrieved_instance.name == "test"
+        assert retrieved_instance.metadata == {"size": "small"}
+    
+    def test_get_project_instance_reused_until_change(self, config):
+        """Test repeat lookups share one Instance until the project changes."""
+        config.add_project("test-project", Instance(
+            id="123", name="test", ip="1.1.1.1", provider="test",
+            status="creating", created_at="2024-01-01", metadata={}
+        ))
+        
+        first = config.get_project_instance("test-project")
+        assert config.get_project_instance(" test-project ") is first
+        
+        config.update_project_status("test-project", "running")
+        
+        updated = config.get_project_instance("test-project")
+        assert updated is not first
+        assert updated.status == "running"
+    
+    def test_get_project_instance_not_found(self, config):
         """Test getting non-existent project as Instance returns None."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = config.get_project_instance("nonexistent")
-            assert instance is None
+        instance = config.get_project_instance("nonexistent")
+        assert instance is None
     
-    def test_update_project(self):
+    def test_update_project(self, config):
         """Test updating existing project."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="creating", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            
-            # Update status
-            config.update_project("test-project", {"status": "running"})
-            
-            project_data = config.get_project("test-project")
-            assert project_data["status"] == "running"
-            assert "last_accessed" in project_data
+        instance = Instance(
+            id="123", name="test", ip="1.1.1.1", provider="test",
+            status="creating", created_at="2024-01-01", metadata={}
+        )
+        
+        config.add_project("test-project", instance)
+        
+        # Update status
+        config.update_project("test-project", {"status": "running"})
+        
+        project_data = config.get_project("test-project")
+        assert project_data["status"] == "running"
+        assert "last_accessed" in project_data
     
-    def test_update_project_not_found(self):
+    def test_update_project_not_found(self, config):
         """Test updating non-existent project fails."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            with pytest.raises(ProjectNotFoundError, match="not found"):
-                config.update_project("nonexistent", {"status": "running"})
+        with pytest.raises(ProjectNotFoundError, match="not found"):
+            config.update_project("nonexistent", {"status": "running"})
     
-    def test_update_project_status(self):
+    def test_update_project_status(self, config):
         """Test updating project status specifically."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="creating", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            config.update_project_status("test-project", "running")
-            
-            project_data = config.get_project("test-project")
-            assert project_data["status"] == "running"
+        instance = Instance(
+            id="123", name="test", ip="1.1.1.1", provider="test",
+            status="creating", created_at="2024-01-01", metadata={}
+        )
+        
+        config.add_project("test-project", instance)
+        config.update_project_status("test-project", "running")
+        
+        project_data = config.get_project("test-project")
+        assert project_data["status"] == "running"
     
-    def test_remove_project(self):
+    def test_remove_project(self, config, instance):
         """Test removing project."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            assert config.get_project("test-project") is not None
-            
-            config.remove_project("test-project")
-            assert config.get_project("test-project") is None
+        config.add_project("test-project", instance)
+        assert config.get_project("test-project") is not None
+        
+        config.remove_project("test-project")
+        assert config.get_project("test-project") is None
     
-    def test_remove_project_not_found(self):
+    def test_remove_project_not_found(self, config):
         """Test removing non-existent project fails."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            with pytest.raises(ProjectNotFoundError, match="not found"):
-                config.remove_project("nonexistent")
+        with pytest.raises(ProjectNotFoundError, match="not found"):
+            config.remove_project("nonexistent")
     
-    def test_list_projects(self):
+    def test_list_projects(self, config, instance):
         """Test listing all project names."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("project-b", instance)
-            config.add_project("project-a", instance)
-            config.add_project("project-c", instance)
-            
-            projects = config.list_projects()
-            assert projects == ["project-a", "project-b", "project-c"]  # Sorted
+        config.add_project("project-b", instance)
+        config.add_project("project-a", instance)
+        config.add_project("project-c", instance)
+        
+        projects = config.list_projects()
+        assert projects == ["project-a", "project-b", "project-c"]  # Sorted
     
-    def test_list_project_details(self):
+    def test_list_project_details(self, config):
         """Test listing project details."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="hetzner",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            
-            details = config.list_project_details()
-            assert len(details) == 1
-            
-            detail = details[0]
-            assert detail["project_name"] == "test-project"
-            assert detail["status"] == "running"
-            assert detail["ip"] == "1.1.1.1"
-            assert detail["provider"] == "hetzner"
+        instance = Instance(
+            id="123", name="test", ip="1.1.1.1", provider="hetzner",
+            status="running", created_at="2024-01-01", metadata={}
+        )
+        
+        config.add_project("test-project", instance)
+        
+        details = config.list_project_details()
+        assert len(details) == 1
+        
+        detail = details[0]
+        assert detail["project_name"] == "test-project"
+        assert detail["status"] == "running"
+        assert detail["ip"] == "1.1.1.1"
+        assert detail["provider"] == "hetzner"
     
-    def test_project_exists(self):
+    def test_project_exists(self, config, instance):
         """Test checking if project exists."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            assert config.project_exists("test-project") is False
-            
-            config.add_project("test-project", instance)
-            assert config.project_exists("test-project") is True
+        assert config.project_exists("test-project") is False
+        
+        config.add_project("test-project", instance)
+        assert config.project_exists("test-project") is True
     
-    def test_global_config_operations(self):
+    def test_global_config_operations(self, config):
         """Test global configuration operations."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Initially empty
-            global_config = config.load_global_config()
-            assert global_config == {}
-            
-            # Set some values
-            test_config = {
-                "default_provider": "hetzner",
-                "default_size": "medium",
-                "auto_hardening": True
-            }
-            config.save_global_config(test_config)
-            
-            # Load back
-            loaded_config = config.load_global_config()
-            assert loaded_config == test_config
+        # Initially empty
+        global_config = config.load_global_config()
+        assert global_config == {}
+        
+        # Set some values
+        test_config = {
+            "default_provider": "hetzner",
+            "default_size": "medium",
+            "auto_hardening": True
+        }
+        config.save_global_config(test_config)
+        
+        # Load back
+        loaded_config = config.load_global_config()
+        assert loaded_config == test_config
     
-    def test_config_value_operations(self):
+    def test_config_value_operations(self, config):
         """Test individual config value get/set operations."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Get non-existent value with default
-            value = config.get_config_value("nonexistent", "default")
-            assert value == "default"
-            
-            # Set value
-            config.set_config_value("test_key", "test_value")
-            
-            # Get value back
-            value = config.get_config_value("test_key")
-            assert value == "test_value"
+        # Get non-existent value with default
+        value = config.get_config_value("nonexistent", "default")
+        assert value == "default"
+        
+        # Set value
+        config.set_config_value("test_key", "test_value")
+        
+        # Get value back
+        value = config.get_config_value("test_key")
+        assert value == "test_value"
+    
+    def test_set_config_value_skips_no_op_and_backup(self, config):
+        """Test repeating a value writes nothing and changes skip the backup."""
+        config.set_config_value("flag", True)
+        
+        with patch.object(config, '_save_json_file', wraps=config._save_json_file) as mock_save:
+            config.set_config_value("flag", True)
+            mock_save.assert_not_called()
+            
+            config.set_config_value("flag", 1)
+            mock_save.assert_called_once()
+        
+        assert json.loads(config.config_file.read_text()) == {"flag": 1}
+        assert not config.config_file.with_suffix(".json.backup").exists()
+    
+    def test_cleanup_backups_keeps_newest(self, config):
+        """Test only the most recently modified backups are kept."""
+        for i in range(7):
+            backup = config.config_dir / f"file{i}.json.backup"
+            backup.write_text("{}")
+            os.utime(backup, ns=(i * 10**9, i * 10**9))
+        config.projects_file.write_text("{}")
+        
+        config.cleanup_backups(max_backups=5)
+        
+        remaining = sorted(p.name for p in config.config_dir.iterdir())
+        assert remaining == [f"file{i}.json.backup" for i in range(2, 7)] + ["projects.json"]
     
-    def test_export_projects(self):
+    def test_export_projects(self, config, tmp_path, instance):
         """Test exporting projects to external file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            
-            config.add_project("test-project", instance)
-            
-            export_file = Path(temp_dir) / "export.json"
-            config.export_projects(str(export_file))
-            
-            # Verify export file
-            assert export_file.exists()
-            export_data = json.loads(export_file.read_text())
-            
-            assert "exported_at" in export_data
-            assert "projects" in export_data
-            assert "test-project" in export_data["projects"]
+        config.add_project("test-project", instance)
+        
+        export_file = tmp_path / "export.json"
+        config.export_projects(str(export_file))
+        
+        # Verify export file
+        assert export_file.exists()
+        export_data = json.loads(export_file.read_text())
+        
+        assert "exported_at" in export_data
+        assert "projects" in export_data
+        assert "test-project" in export_data["projects"]
     
-    def test_import_projects_replace(self):
+    def test_import_projects_replace(self, config, tmp_path, instance):
         """Test importing projects with replace mode."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Add existing project
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            config.add_project("existing-project", instance)
-            
-            # Create import data
-            import_data = {
-                "exported_at": "2024-01-01T00:00:00Z",
-                "projects": {
-                    "imported-project": {
-                        "id": "456", "name": "imported", "ip": "2.2.2.2",
-                        "provider": "test", "status": "running", 
-                        "created_at": "2024-01-01", "metadata": {}
-                    }
+        # Add existing project
+        config.add_project("existing-project", instance)
+        
+        # Create import data
+        import_data = {
+            "exported_at": "2024-01-01T00:00:00Z",
+            "projects": {
+                "imported-project": {
+                    "id": "456", "name": "imported", "ip": "2.2.2.2",
+                    "provider": "test", "status": "running", 
+                    "created_at": "2024-01-01", "metadata": {}
                 }
             }
-            
-            import_file = Path(temp_dir) / "import.json"
-            import_file.write_text(json.dumps(import_data))
-            
-            # Import with replace (default)
-            config.import_projects(str(import_file), merge=False)
-            
-            # Verify existing project was replaced
-            projects = config.list_projects()
-            assert "existing-project" not in projects
-            assert "imported-project" in projects
+        }
+        
+        import_file = tmp_path / "import.json"
+        import_file.write_text(json.dumps(import_data))
+        
+        # Import with replace (default)
+        config.import_projects(str(import_file), merge=False)
+        
+        # Verify existing project was replaced
+        projects = config.list_projects()
+        assert "existing-project" not in projects
+        assert "imported-project" in projects
     
-    def test_import_projects_merge(self):
+    def test_import_projects_merge(self, config, tmp_path, instance):
         """Test importing projects with merge mode."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Add existing project
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            config.add_project("existing-project", instance)
-            
-            # Create import data
-            import_data = {
-                "exported_at": "2024-01-01T00:00:00Z",
-                "projects": {
-                    "imported-project": {
-                        "id": "456", "name": "imported", "ip": "2.2.2.2",
-                        "provider": "test", "status": "running",
-                        "created_at": "2024-01-01", "metadata": {}
-                    }
+        # Add existing project
+        config.add_project("existing-project", instance)
+        
+        # Create import data
+        import_data = {
+            "exported_at": "2024-01-01T00:00:00Z",
+            "projects": {
+                "imported-project": {
+                    "id": "456", "name": "imported", "ip": "2.2.2.2",
+                    "provider": "test", "status": "running",
+                    "created_at": "2024-01-01", "metadata": {}
                 }
             }
-            
-            import_file = Path(temp_dir) / "import.json"
-            import_file.write_text(json.dumps(import_data))
-            
-            # Import with merge
-            config.import_projects(str(import_file), merge=True)
-            
-            # Verify both projects exist
-            projects = config.list_projects()
-            assert "existing-project" in projects
-            assert "imported-project" in projects
+        }
+        
+        import_file = tmp_path / "import.json"
+        import_file.write_text(json.dumps(import_data))
+        
+        # Import with merge
+        config.import_projects(str(import_file), merge=True)
+        
+        # Verify both projects exist
+        projects = config.list_projects()
+        assert "existing-project" in projects
+        assert "imported-project" in projects
+    
+    def test_import_projects_rejects_malformed_file(self, config, tmp_path):
+        """Test an import without a projects mapping fails and changes nothing."""
+        config.save_projects({"keep": {"id": "1"}})
+        
+        for content in ('[1, 2]', '{"projects": ["a"]}'):
+            import_file = tmp_path / "import.json"
+            import_file.write_text(content)
+            
+            with pytest.raises(ConfigError, match="no projects mapping"):
+                config.import_projects(str(import_file), merge=True)
+        
+        assert config.load_projects() == {"keep": {"id": "1"}}
+    
+    def test_import_projects_without_projects_key_keeps_existing(self, config, tmp_path):
+        """Test a replacing import of a file with no projects key wipes nothing."""
+        config.save_projects({"keep": {"id": "1"}})
+        import_file = tmp_path / "import.json"
+        import_file.write_text('{"version": 1}')
+        
+        with pytest.raises(ConfigError, match="no projects mapping"):
+            config.import_projects(str(import_file), merge=False)
+        
+        assert config.load_projects() == {"keep": {"id": "1"}}
     
-    def test_validate_config_valid(self):
+    def test_validate_config_valid(self, config, instance):
         """Test config validation with valid configuration."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            instance = Instance(
-                id="123", name="test", ip="1.1.1.1", provider="test",
-                status="running", created_at="2024-01-01", metadata={}
-            )
-            config.add_project("test-project", instance)
-            
-            issues = config.validate_config()
-            assert issues == []
+        config.add_project("test-project", instance)
+        
+        issues = config.validate_config()
+        assert issues == []
     
-    def test_validate_config_missing_fields(self):
+    def test_validate_config_missing_fields(self, config):
         """Test config validation with missing required fields."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config = Config(temp_dir)
-            
-            # Create invalid project data (missing required fields)
-            invalid_projects = {
-                "invalid-project": {
-                    "id": "123"
-                    # Missing name, ip, provider, status
-                }
+        # Create invalid project data (missing required fields)
+        invalid_projects = {
+            "invalid-project": {
+                "id": "123"
+                # Missing name, ip, provider, status
             }
-            config.save_projects(invalid_projects)
-            
-            issues = config.validate_config()
-            assert len(issues) > 0
-            assert any("missing required field" in issue for issue in issues)
\ No newline at end of file
+        }
+        config.save_projects(invalid_projects)
+        
+        issues = config.validate_config()
+        assert len(issues) > 0
+        assert any("missing required field" in issue for issue in issues)
+    
+    def test_validate_config_follows_projects_file(self, config):
+        """Test validation results are reused only while projects are unchanged."""
+        config.save_projects({"broken": {"id": "123", "name": "broken"}})
+        
+        first = config.validate_config()
+        first.append("caller change")
+        
+        assert config.validate_config() == [
+            "Project 'broken' missing required field: ip",
+            "Project 'broken' missing required field: provider",
+            "Project 'broken' missing required field: status",
+        ]
+        
+        config.save_projects({"fixed": {
+            "id": "123", "name": "fixed", "ip": "1.1.1.1",
+            "provider": "hetzner", "status": "running",
+        }})
+        
+        assert config.validate_config() == []
+    
+    def test_load_projects_reuses_parse_until_file_changes(self, config):
+        """Test parsed projects are cached until the file changes on disk."""
+        config.save_projects({"project1": {"id": "123"}})
+        
+        config.load_projects()
+        with patch('clwd.utils.config.loads') as mock_loads:
+            assert config.load_projects() == {"project1": {"id": "123"}}
+            mock_loads.assert_not_called()
+        
+        # An external write is picked up on the next load
+        config.projects_file.write_text(json.dumps({"project2": {"id": "456"}}))
+        assert config.load_projects() == {"project2": {"id": "456"}}
+    
+    def test_save_keeps_written_data_cached(self, config):
+        """Test a save refreshes the cache so the next read skips the file."""
+        config.save_projects({"project1": {"id": "123"}})
+        
+        with patch('clwd.utils.config.loads') as mock_loads:
+            config.update_project_status("project1", "stopped")
+            assert config.get_project("project1")["status"] == "stopped"
+            assert config.list_projects() == ["project1"]
+            mock_loads.assert_not_called()
+        
+        # The cached copy matches what was written
+        assert json.loads(config.projects_file.read_text()) == config.load_projects()
+    
+    def test_cache_is_not_shared_with_saved_objects(self, config):
+        """Test changing an object after saving it does not change the cache."""
+        projects = {"b": {"id": "1", "metadata": {"k": 1}}}
+        config.save_projects(projects)
+        projects["b"]["metadata"]["k"] = 2
+        
+        updates = {"metadata": {"k": 3}}
+        config.update_project("b", updates)
+        updates["metadata"]["k"] = 4
+        
+        with config.batch():
+            settings = {"ssh": {"user": "root"}}
+            config.save_global_config(settings)
+            settings["ssh"]["user"] = "admin"
+        
+        assert config.get_project("b")["metadata"] == {"k": 3}
+        assert config.load_global_config() == {"ssh": {"user": "root"}}
+    
+    def test_loaded_copies_are_deep(self, config):
+        """Test nested values in returned copies can be changed safely."""
+        config.save_projects({"a": {"id": "1", "metadata": {"x": 1}}})
+        config.save_global_config({"ssh": {"user": "root"}})
+        
+        config.load_projects()["a"]["metadata"]["x"] = 99
+        config.get_project("a")["metadata"]["x"] = 98
+        config.load_global_config()["ssh"]["user"] = "admin"
+        
+        assert config.get_project("a")["metadata"] == {"x": 1}
+        assert config.load_global_config() == {"ssh": {"user": "root"}}
+    
+    def test_large_projects_file_parsed_from_memory_map(self, tmp_path):
+        """Test big files skip the read into bytes when orjson is available."""
+        pytest.importorskip("orjson")
+        projects = {f"p{i}": {"id": str(i), "note": "x" * 100} for i in range(1000)}
+        Config(tmp_path).save_projects(projects)
+        
+        config = Config(tmp_path)
+        with patch.object(Path, 'read_bytes', side_effect=AssertionError("read_bytes used")):
+            assert config.load_projects() == projects
+    
+    def test_large_projects_file_written_compact(self, config, tmp_path):
+        """Test files past the size threshold are saved without indentation."""
+        config.COMPACT_JSON_THRESHOLD = 100
+        small = {"p": {"id": "1"}}
+        large = {f"p{i}": {"id": str(i)} for i in range(20)}
+        
+        config.save_projects(small)
+        assert config.projects_file.read_bytes() == dumps(small)
+        
+        config.save_projects(large)
+        assert config.projects_file.read_bytes() == dumps(large, compact=True)
+        assert b"\n" not in config.projects_file.read_bytes()
+        assert Config(tmp_path).load_projects() == large
+    
+    def test_load_projects_returns_modifiable_copy(self, config):
+        """Test mutating loaded projects does not leak into the cache."""
+        config.save_projects({"project1": {"id": "123"}})
+        
+        projects = config.load_projects()
+        projects["project1"]["id"] = "changed"
+        projects["project2"] = {"id": "456"}
+        
+        assert config.load_projects() == {"project1": {"id": "123"}}
+    
+    def test_list_project_details_reuses_summary(self, config):
+        """Test project summaries are built once per version of the file."""
+        config.save_projects({
+            "old": {"status": "running", "last_accessed": "2024-01-01"},
+            "new": {"status": "stopped", "last_accessed": "2024-06-01"},
+        })
+        
+        first = config.list_project_details()
+        second = config.list_project_details()
+        assert [d["project_name"] for d in first] == ["new", "old"]
+        assert second == first and second is not first
+        assert second[0] is first[0]
+        
+        config.update_project_status("old", "stopped")
+        
+        refreshed = config.list_project_details()
+        assert refreshed[0]["project_name"] == "old"
+        assert refreshed[0]["status"] == "stopped"
+    
+    def test_list_projects_sorts_once_per_version(self, config):
+        """Test project names are sorted once until the projects change."""
+        config.save_projects({"b": {}, "a": {}})
+        
+        with patch('clwd.utils.config.sorted', create=True, side_effect=sorted) as mock_sorted:
+            names = config.list_projects()
+            names.append("caller change")
+            assert config.list_projects() == ["a", "b"]
+            assert mock_sorted.call_count == 1
+        
+        config.remove_project("a")
+        assert config.list_projects() == ["b"]
+    
+    def test_project_exists_uses_cached_index(self, config):
+        """Test repeated existence checks are lookups, not re-parses."""
+        config.save_projects({"project1": {"id": "123"}})
+        
+        assert config.project_exists("project1")
+        with patch('clwd.utils.config.loads') as mock_loads:
+            assert config.project_exists(" project1 ")
+            assert not config.project_exists("project2")
+            mock_loads.assert_not_called()
+        
+        # Removing the project on disk invalidates the index
+        config.projects_file.write_text("{}")
+        assert not config.project_exists("project1")
+    
+    def test_load_cached_returns_shared_instance(self, tmp_path):
+        """Test load_cached reuses one Config per directory."""
+        config = Config.load_cached(tmp_path)
+        
+        assert Config.load_cached(tmp_path) is config
+        assert config.config_dir == tmp_path
+
+
+class TestFormatJson:
+    """Test JSON formatting for display."""
+    
+    DATA = {"name": "test", "id": "123", "metadata": {"region": "nbg1", "cpu": 2}}
+    
+    def test_format_json_matches_stdlib(self):
+        """Test output matches indented, key-sorted stdlib JSON."""
+        assert format_json(self.DATA) == json.dumps(self.DATA, indent=2, sort_keys=True)
+    
+    def test_format_json_without_orjson(self):
+        """Test the stdlib fallback when orjson is not installed."""
+        with patch('clwd.utils.jsonio.orjson', None):
+            assert format_json(self.DATA) == json.dumps(self.DATA, indent=2, sort_keys=True)
+    
+    def test_projects_round_trip_without_orjson(self, tmp_path):
+        """Test files written with orjson load with the stdlib and vice versa."""
+        config = Config(tmp_path)
+        projects = {"café": {"id": "123", "metadata": {"region": "nbg1"}}}
+        
+        config.save_projects(projects)
+        with patch('clwd.utils.jsonio.orjson', None):
+            assert Config(tmp_path).load_projects() == projects
+            config.save_projects(projects)
+        
+        assert Config(tmp_path).load_projects() == projects
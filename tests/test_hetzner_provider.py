@@ -2,7 +2,7 @@
 
 import os
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from pathlib import Path
 
 from hcloud import APIException
@@ -55,42 +55,63 @@ class TestHetznerProvider:
     def test_init_with_api_error(self):
         """Test initialization fails with API error."""
         with patch('clwd.providers.hetzner.Client') as mock_client:
-            mock_client.return_value.server_types.get_all.side_effect = APIException(
+            mock_client.return_value.server_types.get_list.side_effect = APIException(
                 "Authentication failed", Mock()
             )
             
             with pytest.raises(AuthenticationError, match="Failed to authenticate"):
                 HetznerProvider(api_token="invalid-token")
     
-    def test_get_local_ssh_key_ed25519(self):
+    def test_init_probes_each_token_once(self):
+        """Test the authentication probe is skipped for a verified token."""
+        with patch('clwd.providers.hetzner.Client') as mock_client, \
+             patch.object(HetznerProvider, '_verified_tokens', set()):
+            HetznerProvider(api_token="probe-token")
+            HetznerProvider(api_token="probe-token")
+            
+            mock_client.return_value.server_types.get_list.assert_called_once_with(page=1, per_page=1)
+            mock_client.return_value.server_types.get_all.assert_not_called()
+    
+    def test_get_local_ssh_key_ed25519(self, tmp_path, monkeypatch):
         """Test finding ed25519 SSH key."""
         with patch('clwd.providers.hetzner.Client') as mock_client:
             mock_client.return_value.server_types.get_all.return_value = []
             provider = HetznerProvider(api_token="test-token")
         
-        with patch('pathlib.Path.expanduser') as mock_expand:
-            mock_path = Mock()
-            mock_path.exists.return_value = True
-            mock_path.read_text.return_value = "ssh-ed25519 AAAAC3... test@example.com"
-            mock_expand.return_value = mock_path
-            
-            key = provider._get_local_ssh_key()
-            
-            assert key == "ssh-ed25519 AAAAC3... test@example.com"
+        ssh_dir = tmp_path / ".ssh"
+        ssh_dir.mkdir()
+        (ssh_dir / "id_ed25519.pub").write_text("ssh-ed25519 AAAAC3... test@example.com\n")
+        (ssh_dir / "id_rsa.pub").write_text("ssh-rsa AAAAB3... test@example.com\n")
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        key = provider._get_local_ssh_key()
+        
+        assert key == "ssh-ed25519 AAAAC3... test@example.com"
     
-    def test_get_local_ssh_key_not_found(self):
+    def test_get_local_ssh_key_falls_back_in_order(self, tmp_path, monkeypatch):
+        """Test the next preferred key type is used when ed25519 is missing."""
+        with patch('clwd.providers.hetzner.Client') as mock_client:
+            mock_client.return_value.server_types.get_all.return_value = []
+            provider = HetznerProvider(api_token="test-token")
+        
+        ssh_dir = tmp_path / ".ssh"
+        ssh_dir.mkdir()
+        (ssh_dir / "id_ecdsa.pub").write_text("ecdsa-sha2-nistp256 AAAAE2...")
+        (ssh_dir / "id_rsa.pub").write_text("ssh-rsa AAAAB3...")
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        assert provider._get_local_ssh_key() == "ssh-rsa AAAAB3..."
+    
+    def test_get_local_ssh_key_not_found(self, tmp_path, monkeypatch):
         """Test error when no SSH key is found."""
         with patch('clwd.providers.hetzner.Client') as mock_client:
             mock_client.return_value.server_types.get_all.return_value = []
             provider = HetznerProvider(api_token="test-token")
         
-        with patch('pathlib.Path.expanduser') as mock_expand:
-            mock_path = Mock()
-            mock_path.exists.return_value = False
-            mock_expand.return_value = mock_path
-            
-            with pytest.raises(ValueError, match="No SSH key found"):
-                provider._get_local_ssh_key()
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        with pytest.raises(ValueError, match="No SSH key found"):
+            provider._get_local_ssh_key()
     
     def test_ensure_ssh_key_uploaded_existing(self):
         """Test using existing SSH key."""
@@ -144,9 +165,10 @@ class TestHetznerProvider:
             claude_json_content='{"key": "value"}'
         )
         
-        # Should be base64 encoded
+        # Should be gzip compressed, then base64 encoded
         import base64
-        decoded = base64.b64decode(script).decode('utf-8')
+        import gzip
+        decoded = gzip.decompress(base64.b64decode(script)).decode('utf-8')
         
         assert "#!/bin/bash" in decoded
         assert "apt-get update" in decoded
@@ -181,6 +203,10 @@ class TestHetznerProvider:
         assert "fsn1" in regions
         assert "hel1" in regions
         assert regions["nbg1"] == "Nuremberg DC Park 1"
+        
+        with pytest.raises(TypeError):
+            regions["xyz"] = "Nowhere"
+        assert "xyz" not in provider.get_supported_regions()
     
     @pytest.mark.asyncio
     async def test_create_instance_success(self):
@@ -221,6 +247,27 @@ class TestHetznerProvider:
         assert instance.provider == "hetzner"
         assert instance.metadata["server_type"] == "cpx21"
         assert instance.metadata["hardening_level"] == "minimal"
+        
+        from datetime import datetime, timezone
+        created = datetime.fromisoformat(instance.created_at)
+        assert created.tzinfo == timezone.utc
+        assert created.microsecond == 0
+    
+    @pytest.mark.asyncio
+    async def test_create_instance_reuses_catalog_lookups(self):
+        """Test server type, image and location are fetched once per provider."""
+        with patch('clwd.providers.hetzner.Client') as mock_client:
+            provider = HetznerProvider(api_token="test-token")
+        
+        client = mock_client.return_value
+        with patch.object(provider, '_ensure_ssh_key_uploaded', return_value=Mock()):
+            await provider.create_instance(name="one", size="small")
+            await provider.create_instance(name="two", size="small")
+        
+        client.server_types.get_by_name.assert_called_once_with("cpx11")
+        client.images.get_by_name.assert_called_once_with("ubuntu-24.04")
+        client.locations.get_by_name.assert_called_once_with("nbg1")
+        assert client.servers.create.call_count == 2
     
     @pytest.mark.asyncio
     async def test_create_instance_invalid_size(self):
@@ -267,6 +314,31 @@ class TestHetznerProvider:
         
         mock_server.delete.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_destroy_instances_concurrently(self):
+        """Test blocking API calls run off the event loop so destroys overlap."""
+        import asyncio
+        import threading
+        
+        with patch('clwd.providers.hetzner.Client') as mock_client:
+            provider = HetznerProvider(api_token="test-token")
+        
+        # Each lookup only returns once both are in flight at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def get_by_id(server_id):
+            barrier.wait()
+            return Mock()
+        
+        mock_client.return_value.servers.get_by_id.side_effect = get_by_id
+        
+        await asyncio.gather(
+            provider.destroy_instance("1"),
+            provider.destroy_instance("2"),
+        )
+        
+        assert mock_client.return_value.servers.get_by_id.call_count == 2
+    
     @pytest.mark.asyncio
     async def test_destroy_instance_not_found(self):
         """Test destroying non-existent instance."""
@@ -306,6 +378,15 @@ class TestHetznerProvider:
         with pytest.raises(InstanceNotFoundError):
             await provider.get_instance_status("12345")
     
+    @staticmethod
+    def _ssh_stream(banner=b"SSH-2.0-OpenSSH_9.6\r\n"):
+        """Build a fake (reader, writer) pair that sends the given banner."""
+        reader = Mock()
+        reader.readline = AsyncMock(return_value=banner)
+        writer = Mock()
+        writer.wait_closed = AsyncMock()
+        return reader, writer
+    
     @pytest.mark.asyncio
     async def test_wait_for_ssh_success(self):
         """Test waiting for SSH successfully."""
@@ -313,14 +394,16 @@ class TestHetznerProvider:
             mock_client.return_value.server_types.get_all.return_value = []
             provider = HetznerProvider(api_token="test-token")
         
-        with patch('socket.socket') as mock_socket:
-            mock_sock = Mock()
-            mock_sock.connect_ex.return_value = 0  # Success
-            mock_socket.return_value = mock_sock
-            
+        reader, writer = self._ssh_stream()
+        with patch('clwd.providers.hetzner.asyncio.open_connection',
+                   new_callable=AsyncMock, return_value=(reader, writer)) as mock_open, \
+             patch('clwd.providers.hetzner.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
             result = await provider.wait_for_ssh("192.168.1.100", timeout=10)
-            
+        
             assert result is True
+            mock_open.assert_awaited_once_with("192.168.1.100", 22)
+            writer.close.assert_called_once()
+            mock_sleep.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_wait_for_ssh_timeout(self):
@@ -329,11 +412,73 @@ class TestHetznerProvider:
             mock_client.return_value.server_types.get_all.return_value = []
             provider = HetznerProvider(api_token="test-token")
         
-        with patch('socket.socket') as mock_socket:
-            mock_sock = Mock()
-            mock_sock.connect_ex.return_value = 1  # Connection refused
-            mock_socket.return_value = mock_sock
-            
+        with patch('clwd.providers.hetzner.asyncio.open_connection',
+                   new_callable=AsyncMock, side_effect=ConnectionRefusedError):
             result = await provider.wait_for_ssh("192.168.1.100", timeout=0.1)
-            
-            assert result is False
\ No newline at end of file
+        
+            assert result is False
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_ssh_requires_banner(self):
+        """Test an open port without an SSH banner is not treated as ready."""
+        with patch('clwd.providers.hetzner.Client') as mock_client:
+            mock_client.return_value.server_types.get_all.return_value = []
+            provider = HetznerProvider(api_token="test-token")
+        
+        streams = [self._ssh_stream(b""), self._ssh_stream()]
+        with patch('clwd.providers.hetzner.asyncio.open_connection',
+                   new_callable=AsyncMock, side_effect=streams) as mock_open, \
+             patch('clwd.providers.hetzner.asyncio.sleep', new_callable=AsyncMock):
+            result = await provider.wait_for_ssh("192.168.1.100", timeout=300)
+        
+        assert result is True
+        assert mock_open.await_count == 2
+        streams[0][1].close.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_ssh_backs_off(self):
+        """Test SSH polling starts fast and backs off while the port is closed."""
+        with patch('clwd.providers.hetzner.Client') as mock_client:
+            mock_client.return_value.server_types.get_all.return_value = []
+            provider = HetznerProvider(api_token="test-token")
+        
+        attempts = [ConnectionRefusedError()] * 5 + [self._ssh_stream()]
+        with patch('clwd.providers.hetzner.asyncio.open_connection',
+                   new_callable=AsyncMock, side_effect=attempts), \
+             patch('clwd.providers.hetzner.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result = await provider.wait_for_ssh("192.168.1.100", timeout=300)
+        
+        assert result is True
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert delays == [0.5, 1.0, 2.0, 4.0, 5.0]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("host", ["127.0.0.1", "::1"])
+    @pytest.mark.parametrize("banner,expected", [
+        (b"SSH-2.0-OpenSSH_9.6\r\n", True),
+        (b"HTTP/1.1 400 Bad Request\r\n", False),
+    ])
+    async def test_ssh_banner_probe_over_real_socket(self, host, banner, expected):
+        """Test the banner probe against a local listener on IPv4 and IPv6."""
+        import asyncio
+        import socket
+        
+        if host == "::1" and not socket.has_ipv6:
+            pytest.skip("IPv6 not available")
+        
+        with patch('clwd.providers.hetzner.Client'):
+            provider = HetznerProvider(api_token="test-token")
+        
+        async def greet(reader, writer):
+            writer.write(banner)
+            await writer.drain()
+            writer.close()
+        
+        try:
+            server = await asyncio.start_server(greet, host, 0)
+        except OSError:
+            pytest.skip(f"Cannot listen on {host}")
+        port = server.sockets[0].getsockname()[1]
+        
+        async with server:
+            assert await provider._ssh_banner_ready(host, timeout=2, port=port) is expected
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""Tests for Claude Code credential helpers."""
+
+import ctypes
+import json
+import subprocess
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from clwd.utils import keychain
+from clwd.utils.jsonio import dumps
+from clwd.utils.keychain import (
+    KeychainError,
+    create_credentials_json,
+    create_minimal_claude_json,
+    get_claude_authentication,
+    get_claude_credentials_from_keychain,
+    get_claude_session_from_file,
+    validate_claude_authentication,
+)
+
+
+class TestSessionFile:
+    """Test reading ~/.claude.json."""
+    
+    def test_returns_file_content_verbatim(self, tmp_path, monkeypatch):
+        """Test a valid session file is returned exactly as stored."""
+        content = '{"oauthAccount": {"displayName": "Zoë"}, "numStartups": 3}\n'
+        (tmp_path / ".claude.json").write_text(content, encoding="utf-8")
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        assert get_claude_session_from_file() == content
+    
+    def test_invalid_json_is_rejected(self, tmp_path, monkeypatch):
+        """Test a corrupt session file is reported as missing."""
+        (tmp_path / ".claude.json").write_text("{not json")
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        assert get_claude_session_from_file() is None
+    
+    def test_missing_file(self, tmp_path, monkeypatch):
+        """Test no session file yields None."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        assert get_claude_session_from_file() is None
+    
+    def test_validate_detects_oauth_account(self, tmp_path, monkeypatch):
+        """Test validation reads the session file's oauthAccount."""
+        (tmp_path / ".claude.json").write_text('{"oauthAccount": {}}')
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr("clwd.utils.keychain.is_macos", lambda: False)
+        
+        result = validate_claude_authentication()
+        
+        assert result["session_valid"] is True
+        assert result["ready_for_deployment"] is True
+    
+    def test_session_parsed_once(self, tmp_path, monkeypatch):
+        """Test validation and reading share one parse of an unchanged file."""
+        (tmp_path / ".claude.json").write_text('{"oauthAccount": {}}')
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr("clwd.utils.keychain.is_macos", lambda: False)
+        
+        with patch("clwd.utils.keychain.loads", side_effect=json.loads) as mock_loads:
+            assert validate_claude_authentication()["session_valid"] is True
+            assert get_claude_session_from_file() == '{"oauthAccount": {}}'
+        
+        mock_loads.assert_called_once()
+    
+    def test_session_change_is_reread(self, tmp_path, monkeypatch):
+        """Test a rewritten session file is parsed again."""
+        session_file = tmp_path / ".claude.json"
+        session_file.write_text('{"a": 1}')
+        monkeypatch.setenv("HOME", str(tmp_path))
+        assert get_claude_session_from_file() == '{"a": 1}'
+        
+        session_file.write_text('{"a": 22}')
+        
+        assert get_claude_session_from_file() == '{"a": 22}'
+    
+    def test_authentication_reuses_validated_session(self, tmp_path, monkeypatch):
+        """Test the session checked by validation is returned without another read."""
+        content = '{"oauthAccount": {"emailAddress": "a@b.c"}}'
+        (tmp_path / ".claude.json").write_text(content)
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr("clwd.utils.keychain.is_macos", lambda: False)
+        assert validate_claude_authentication()["session_valid"] is True
+        
+        with patch("pathlib.Path.read_bytes", side_effect=AssertionError("file re-read")):
+            assert get_claude_authentication() == (None, content)
+
+
+class TestCredentialsJson:
+    """Test building .credentials.json content."""
+    
+    def test_structured_credentials(self):
+        """Test JSON keychain data is copied through."""
+        result = create_credentials_json({"claude_code": '{"claudeAiOauth": {"accessToken": "abc"}}'})
+        
+        assert json.loads(result) == {"claudeAiOauth": {"accessToken": "abc"}}
+    
+    def test_structured_credentials_keep_key_order(self):
+        """Test keychain JSON is uploaded with its keys in their original order."""
+        result = create_credentials_json({"claude_code": '{"z": 1, "a": {"y": 2, "b": 3}}'})
+        
+        assert list(json.loads(result)) == ["z", "a"]
+        assert list(json.loads(result)["a"]) == ["y", "b"]
+    
+    def test_plain_token(self):
+        """Test non-JSON keychain data is stored as a token."""
+        result = create_credentials_json({"claude_code": "sk-plain-token"})
+        
+        assert json.loads(result) == {"token": "sk-plain-token"}
+    
+    def test_no_credentials(self):
+        """Test empty keychain data yields None."""
+        assert create_credentials_json({}) is None
+
+
+class TestMinimalSession:
+    """Test building the minimal session for cloud-init."""
+    
+    def test_matches_full_encoding(self):
+        """Test the template output equals encoding the whole document."""
+        full_data = {
+            "oauthAccount": {"emailAddress": "a@b.c", "displayName": "Zoë", "orgs": [1, {"x": None}]},
+            "firstStartTime": "2025-03-01T00:00:00.000Z",
+            "numStartups": 12,
+        }
+        
+        expected = dumps({
+            "installMethod": "clwd",
+            "autoUpdates": False,
+            "firstStartTime": "2025-03-01T00:00:00.000Z",
+            "oauthAccount": full_data["oauthAccount"],
+            "isQualifiedForDataSharing": False,
+            "hasCompletedOnboarding": True,
+            "lastOnboardingVersion": "1.0.69",
+            "projects": {
+                "/app": {
+                    "allowedTools": [],
+                    "history": [],
+                    "mcpContextUris": [],
+                    "mcpServers": {},
+                    "enabledMcpjsonServers": [],
+                    "disabledMcpjsonServers": [],
+                    "hasTrustDialogAccepted": False,
+                    "projectOnboardingSeenCount": 0,
+                    "hasClaudeMdExternalIncludesApproved": False,
+                    "hasClaudeMdExternalIncludesWarningShown": False
+                }
+            }
+        }, sort_keys=False).decode()
+        
+        assert create_minimal_claude_json(full_data) == expected
+    
+    def test_requires_oauth_account(self):
+        """Test sessions without an account are rejected."""
+        assert create_minimal_claude_json({"firstStartTime": "x"}) is None
+
+
+class TestKeychainLookup:
+    """Test the shared Keychain lookup."""
+    
+    @pytest.fixture(autouse=True)
+    def on_macos(self, monkeypatch):
+        """Pretend to run on macOS with an empty lookup cache."""
+        monkeypatch.setattr("clwd.utils.keychain.is_macos", lambda: True)
+        monkeypatch.setattr("clwd.utils.keychain._KEYCHAIN_LOOKUP", None)
+        monkeypatch.setattr("clwd.utils.keychain._SECURITY", False)
+    
+    @patch("subprocess.run")
+    def test_validate_runs_security_once(self, mock_run, tmp_path, monkeypatch):
+        """Test availability and credentials come from a single lookup."""
+        mock_run.return_value = Mock(returncode=0, stdout='{"claudeAiOauth": {}}\n')
+        monkeypatch.setenv("HOME", str(tmp_path))
+        
+        result = validate_claude_authentication()
+        
+        assert result["keychain_available"] is True
+        assert result["keychain_credentials"] is True
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][-1] == "-w"
+    
+    @patch("subprocess.run")
+    def test_lookup_expires(self, mock_run, monkeypatch):
+        """Test a lookup is reused briefly, then repeated."""
+        mock_run.return_value = Mock(returncode=0, stdout="token\n")
+        
+        assert get_claude_credentials_from_keychain() == {"claude_code": "token"}
+        assert get_claude_credentials_from_keychain() == {"claude_code": "token"}
+        assert mock_run.call_count == 1
+        
+        monkeypatch.setattr("clwd.utils.keychain._KEYCHAIN_LOOKUP_TTL", 0.0)
+        get_claude_credentials_from_keychain()
+        assert mock_run.call_count == 2
+    
+    @patch("subprocess.run")
+    def test_timeout_is_not_cached(self, mock_run):
+        """Test a timed-out lookup raises and is retried next time."""
+        mock_run.side_effect = [subprocess.TimeoutExpired("security", 30), Mock(returncode=44, stdout="")]
+        
+        with pytest.raises(KeychainError, match="timed out"):
+            get_claude_credentials_from_keychain()
+        assert get_claude_credentials_from_keychain() is None
+        assert mock_run.call_count == 2
+    
+    @staticmethod
+    def _fake_framework(status=0, password=b""):
+        """Build a stand-in for Security.framework returning the given item."""
+        buffer = ctypes.create_string_buffer(password)
+        lib = Mock()
+        
+        def find(keychain, service_len, service, account_len, account, length, data, item):
+            assert service[:service_len] == b"Claude Code-credentials"
+            if status == 0:
+                length.contents.value = len(password)
+                data.contents.value = ctypes.addressof(buffer)
+            return status
+        
+        lib.SecKeychainFindGenericPassword.side_effect = find
+        return lib
+    
+    @patch("subprocess.run")
+    def test_framework_lookup_avoids_fork(self, mock_run, monkeypatch):
+        """Test credentials are read in-process when Security.framework loads."""
+        lib = self._fake_framework(password='{"claudeAiOauth": {"x": "é"}}'.encode())
+        monkeypatch.setattr("clwd.utils.keychain._SECURITY", lib)
+        monkeypatch.setenv("CLWD_NATIVE_KEYCHAIN", "1")
+        
+        assert get_claude_credentials_from_keychain() == {"claude_code": '{"claudeAiOauth": {"x": "é"}}'}
+        mock_run.assert_not_called()
+        lib.SecKeychainItemFreeContent.assert_called_once()
+    
+    @patch("subprocess.run")
+    def test_framework_missing_item(self, mock_run, monkeypatch):
+        """Test a missing Keychain item maps to no credentials."""
+        monkeypatch.setattr("clwd.utils.keychain._SECURITY", self._fake_framework(status=-25300))
+        monkeypatch.setenv("CLWD_NATIVE_KEYCHAIN", "1")
+        
+        assert get_claude_credentials_from_keychain() is None
+        mock_run.assert_not_called()
+    
+    @patch("subprocess.run")
+    def test_framework_lookup_is_opt_in(self, mock_run, monkeypatch):
+        """Test `security` stays the default even when the framework loads."""
+        lib = self._fake_framework(password=b"token")
+        monkeypatch.setattr("clwd.utils.keychain._SECURITY", lib)
+        monkeypatch.delenv("CLWD_NATIVE_KEYCHAIN", raising=False)
+        mock_run.return_value = Mock(returncode=0, stdout="token\n")
+        
+        assert get_claude_credentials_from_keychain() == {"claude_code": "token"}
+        mock_run.assert_called_once()
+        lib.SecKeychainFindGenericPassword.assert_not_called()
+    
+    @patch("subprocess.run")
+    def test_session_read_overlaps_lookup(self, mock_run, tmp_path, monkeypatch):
+        """Test ~/.claude.json is loaded while the Keychain lookup is running."""
+        (tmp_path / ".claude.json").write_text('{"oauthAccount": {}}')
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr("clwd.utils.keychain._CLAUDE_SESSION", None)
+        seen_during_lookup = []
+        
+        def slow_lookup(*args, **kwargs):
+            deadline = time.monotonic() + 5
+            while keychain._CLAUDE_SESSION is None and time.monotonic() < deadline:
+                time.sleep(0.001)
+            seen_during_lookup.append(keychain._CLAUDE_SESSION is not None)
+            return Mock(returncode=44, stdout="")
+        
+        mock_run.side_effect = slow_lookup
+        
+        credentials, session = get_claude_authentication()
+        
+        assert seen_during_lookup == [True]
+        assert (credentials, session) == (None, '{"oauthAccount": {}}')
\ No newline at end of file
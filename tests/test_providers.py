@@ -10,6 +10,7 @@ from clwd.providers import (
     InstanceNotFoundError,
     QuotaExceededError,
     AuthenticationError,
+    get_provider_class,
 )
 
 
@@ -214,4 +215,19 @@ class TestProvider:
         provider = MockProvider()
         
         result = await provider.wait_for_ssh("192.168.1.100")
-        assert result is True
\ No newline at end of file
+        assert result is True
+
+
+class TestProviderRegistry:
+    """Test provider lookup by name."""
+    
+    def test_get_provider_class_hetzner(self):
+        """Test the Hetzner provider is resolved from its registered path."""
+        from clwd.providers.hetzner import HetznerProvider
+        
+        assert get_provider_class("hetzner") is HetznerProvider
+    
+    def test_get_provider_class_unknown(self):
+        """Test unknown provider names are rejected."""
+        with pytest.raises(ValueError, match="Unsupported provider: aws"):
+            get_provider_class("aws")
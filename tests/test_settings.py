@@ -0,0 +1,81 @@
+"""Tests for CLI settings."""
+
+import os
+from unittest.mock import patch
+
+from clwd.core.settings import Settings
+
+
+class TestEnvFile:
+    """Test loading variables from a .env file."""
+    
+    def test_load_env_file(self, tmp_path, monkeypatch):
+        """Test keys, quoting, comments and precedence of existing values."""
+        (tmp_path / ".env").write_text(
+            "# comment\n"
+            "\n"
+            "CLWD_TEST_PLAIN=value\n"
+            "  CLWD_TEST_SPACED = spaced value  \n"
+            'CLWD_TEST_DOUBLE="double quoted"\n'
+            "CLWD_TEST_SINGLE='single quoted'\n"
+            "CLWD_TEST_URL=https://example.com/?a=b\n"
+            "CLWD_TEST_SET=from-file\n"
+            "not a setting\n"
+            "=no-key\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        
+        with patch.dict(os.environ, {"CLWD_TEST_SET": "from-env"}):
+            Settings().debug
+            
+            assert os.environ["CLWD_TEST_PLAIN"] == "value"
+            assert os.environ["CLWD_TEST_SPACED"] == "spaced value"
+            assert os.environ["CLWD_TEST_DOUBLE"] == "double quoted"
+            assert os.environ["CLWD_TEST_SINGLE"] == "single quoted"
+            assert os.environ["CLWD_TEST_URL"] == "https://example.com/?a=b"
+            assert os.environ["CLWD_TEST_SET"] == "from-env"
+            assert "" not in os.environ
+    
+    def test_missing_env_file(self, tmp_path, monkeypatch):
+        """Test settings load without a .env file."""
+        monkeypatch.chdir(tmp_path)
+        
+        with patch.dict(os.environ, {}, clear=True):
+            settings = Settings()
+            
+            assert settings.hetzner_api_token == ""
+    
+    def test_env_file_read_on_first_use(self, tmp_path, monkeypatch):
+        """Test construction does no I/O and .env is loaded on first use."""
+        (tmp_path / ".env").write_text("HETZNER_API_TOKEN=from-file\n")
+        monkeypatch.chdir(tmp_path)
+        
+        with patch.dict(os.environ, {}, clear=True):
+            with patch.object(Settings, "_load_env_file", autospec=True,
+                              side_effect=Settings._load_env_file) as mock_load:
+                settings = Settings()
+                mock_load.assert_not_called()
+                
+                assert settings.debug is False
+                assert settings.hetzner_api_token == ""
+                mock_load.assert_called_once()
+                assert os.environ["HETZNER_API_TOKEN"] == "from-file"
+    
+    def test_environment_read_before_env_file(self, tmp_path, monkeypatch):
+        """Test settings reflect the process environment, not values from .env."""
+        (tmp_path / ".env").write_text("CLWD_DEBUG=1\nHETZNER_API_TOKEN=from-file\n")
+        monkeypatch.chdir(tmp_path)
+        
+        with patch.dict(os.environ, {"HETZNER_API_TOKEN": "from-env"}, clear=True):
+            settings = Settings()
+            
+            assert settings.hetzner_api_token == "from-env"
+            assert settings.debug is False
+            assert os.environ["CLWD_DEBUG"] == "1"
+    
+    def test_module_settings_is_shared(self):
+        """Test the module-level instance is created once."""
+        from clwd.core import settings as settings_module
+        
+        assert settings_module.settings is settings_module.settings
+        assert isinstance(settings_module.settings, Settings)
@@ -2,10 +2,30 @@
 
 import pytest
 import subprocess
+import time
 from unittest.mock import Mock, patch, call
 from pathlib import Path
 
-from clwd.utils.ssh import SSHOperations, SSHError, SSHSessionManager
+from clwd.utils.ssh import (
+    CIPHERS,
+    CONTROL_DIR,
+    INSTANCE_INFO_COMMAND,
+    SETUP_WAIT_COMMAND,
+    SSHError,
+    SSHOperations,
+    SSHSessionManager,
+    _SFTP,
+    _SSH,
+    _default_ssh_key,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_ssh_key_lookup():
+    """Forget the cached default SSH key between tests."""
+    _default_ssh_key.cache_clear()
+    yield
+    _default_ssh_key.cache_clear()
 
 
 class TestSSHOperations:
@@ -48,6 +68,15 @@ class TestSSHOperations:
             key_path = ssh_ops._find_ssh_key()
             assert key_path is None
     
+    def test_find_ssh_key_cached_across_sessions(self):
+        """Test the default key is looked up once, not per SSHOperations."""
+        with patch('pathlib.Path.exists', return_value=True) as mock_exists:
+            first = SSHOperations("192.168.1.1")
+            second = SSHOperations("192.168.1.2")
+        
+        assert first.ssh_key_path == second.ssh_key_path
+        mock_exists.assert_called_once()
+    
     def test_build_ssh_command_basic(self):
         """Test building basic SSH command."""
         ssh_ops = SSHOperations("192.168.1.1", ssh_key_path="/path/to/key")
@@ -55,13 +84,17 @@ class TestSSHOperations:
         cmd = ssh_ops._build_ssh_command()
         
         expected = [
-            "ssh",
+            _SSH,
             "-o", "StrictHostKeyChecking=no",
             "-o", "UserKnownHostsFile=/dev/null",
             "-o", "LogLevel=ERROR",
             "-o", "ConnectTimeout=10",
             "-o", "ServerAliveInterval=60",
             "-o", "ServerAliveCountMax=3",
+            "-o", f"Ciphers={CIPHERS}",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={CONTROL_DIR}/cm-%r@%h:%p",
+            "-o", "ControlPersist=600",
             "-i", "/path/to/key",
             "root@192.168.1.1"
         ]
@@ -87,6 +120,43 @@ class TestSSHOperations:
         assert cmd[-1] == "echo hello"
         assert cmd[-2] == "root@192.168.1.1"
     
+    def test_build_ssh_command_reuses_options(self):
+        """Test the shared options are built once per session."""
+        ssh_ops = SSHOperations("192.168.1.1", ssh_key_path="/path/to/key")
+        
+        with patch('pathlib.Path.mkdir') as mock_mkdir:
+            first = ssh_ops._build_ssh_command("uptime")
+            second = ssh_ops._build_ssh_command(tty=True)
+        
+        mock_mkdir.assert_called_once()
+        assert first[:-2] == second[:-2]
+        assert first[-2:] == ["root@192.168.1.1", "uptime"]
+        assert second[-2:] == ["-t", "root@192.168.1.1"]
+    
+    def test_build_ssh_command_without_multiplexing_on_windows(self):
+        """Test ControlMaster options are omitted where OpenSSH lacks them."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch('clwd.utils.ssh.sys.platform', 'win32'):
+            cmd = ssh_ops._build_ssh_command()
+        
+        assert "ControlMaster=auto" not in cmd
+    
+    @patch('subprocess.run')
+    def test_close_stops_running_master(self, mock_run, tmp_path):
+        """Test close asks the master to exit when its socket exists."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch('clwd.utils.ssh.CONTROL_DIR', tmp_path):
+            ssh_ops.close()
+            mock_run.assert_not_called()
+            
+            (tmp_path / "cm-root@192.168.1.1:22").touch()
+            ssh_ops.close()
+        
+        args = mock_run.call_args[0][0]
+        assert args[-3:] == ["-O", "exit", "root@192.168.1.1"]
+    
     @patch('subprocess.run')
     def test_test_connection_success(self, mock_run):
         """Test successful connection test."""
@@ -98,6 +168,25 @@ class TestSSHOperations:
         assert result is True
         mock_run.assert_called_once()
     
+    @patch('subprocess.run')
+    def test_test_connection_trusts_recent_command(self, mock_run):
+        """Test a command that just reached the host makes the probe unnecessary."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        mock_run.return_value = Mock(returncode=255, stdout="", stderr="")
+        ssh_ops.execute_command("uptime")
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="")
+        assert ssh_ops.test_connection() is False
+        
+        ssh_ops.execute_command("false")
+        mock_run.reset_mock()
+        assert ssh_ops.test_connection() is True
+        mock_run.assert_not_called()
+        
+        with patch('time.monotonic', return_value=time.monotonic() + 31):
+            assert ssh_ops.test_connection() is False
+        mock_run.assert_called_once()
+    
     @patch('subprocess.run')
     def test_test_connection_failure(self, mock_run):
         """Test failed connection test."""
@@ -118,6 +207,111 @@ class TestSSHOperations:
         
         assert result is False
     
+    @patch('subprocess.run')
+    def test_check_setup_complete(self, mock_run):
+        """Test one probe distinguishes ready, in progress and unreachable."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        assert ssh_ops.check_setup_complete() is True
+        
+        mock_run.return_value = Mock(returncode=1, stdout="", stderr="")
+        assert ssh_ops.check_setup_complete() is False
+        
+        mock_run.return_value = Mock(returncode=255, stdout="", stderr="")
+        assert ssh_ops.check_setup_complete() is None
+        
+        mock_run.side_effect = subprocess.TimeoutExpired("ssh", 10)
+        assert ssh_ops.check_setup_complete() is None
+        assert mock_run.call_count == 4
+    
+    @patch('time.sleep')
+    def test_wait_for_connection_returns_once_ready(self, mock_sleep):
+        """Test polling stops at the first successful connection."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch.object(ssh_ops, 'test_connection', side_effect=[False, True]) as mock_test:
+            assert ssh_ops.wait_for_connection(timeout=30) is True
+        
+        assert mock_test.call_count == 2
+        mock_sleep.assert_called_once_with(1.0)
+    
+    @patch('time.sleep')
+    def test_wait_for_connection_timeout(self, mock_sleep):
+        """Test polling gives up when the deadline passes."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch.object(ssh_ops, 'test_connection', return_value=False), \
+             patch('time.monotonic', side_effect=[0, 0, 2]):
+            assert ssh_ops.wait_for_connection(timeout=2) is False
+        
+        mock_sleep.assert_not_called()
+    
+    @staticmethod
+    def _wait_process(stdout=b"READY\n", returncode=0):
+        """Build a fake Popen for the remote setup wait loop."""
+        proc = Mock(returncode=returncode)
+        proc.communicate.return_value = (stdout, None)
+        return proc
+    
+    @patch('time.sleep')
+    @patch('subprocess.Popen')
+    def test_wait_for_setup_complete_single_session(self, mock_popen, mock_sleep):
+        """Test one ssh session waits remotely for the marker file."""
+        mock_popen.return_value = self._wait_process()
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.wait_for_setup_complete(timeout=300) is True
+        
+        mock_popen.assert_called_once()
+        assert mock_popen.call_args[0][0][-1] == SETUP_WAIT_COMMAND
+        assert 0 < mock_popen.return_value.communicate.call_args.kwargs["timeout"] <= 300
+        mock_sleep.assert_not_called()
+    
+    def test_setup_wait_command_wakes_on_inotify(self, tmp_path):
+        """Test the remote loop waits on inotifywait and stops once the marker exists."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        marker = tmp_path / "clwd-setup-complete"
+        # Stand-in for inotifywait that reports the marker being created
+        inotifywait = bin_dir / "inotifywait"
+        inotifywait.write_text(f"#!/bin/sh\necho \"$@\" >> {tmp_path}/calls\ntouch {marker}\n")
+        inotifywait.chmod(0o755)
+        command = SETUP_WAIT_COMMAND.replace("/tmp", str(tmp_path))
+        
+        result = subprocess.run(
+            ["sh", "-c", command],
+            capture_output=True, text=True, timeout=10,
+            env={"PATH": f"{bin_dir}:/usr/bin:/bin"}
+        )
+        
+        assert result.stdout == "READY\n"
+        assert (tmp_path / "calls").read_text() == f"-qq -t 2 -e create -e moved_to {tmp_path}\n"
+    
+    @patch('time.sleep')
+    @patch('subprocess.Popen')
+    def test_wait_for_setup_complete_reconnects(self, mock_popen, mock_sleep):
+        """Test a failed connection is retried within the deadline."""
+        mock_popen.side_effect = [self._wait_process(b"", 255), self._wait_process()]
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.wait_for_setup_complete(timeout=300) is True
+        
+        assert mock_popen.call_count == 2
+        mock_sleep.assert_called_once_with(5.0)
+    
+    @patch('subprocess.Popen')
+    def test_wait_for_setup_complete_timeout(self, mock_popen):
+        """Test the remote wait is killed when the deadline passes."""
+        proc = self._wait_process()
+        proc.communicate.side_effect = [subprocess.TimeoutExpired("ssh", 1), (b"", None)]
+        mock_popen.return_value = proc
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.wait_for_setup_complete(timeout=1) is False
+        
+        proc.kill.assert_called_once()
+    
     @patch('subprocess.run')
     def test_execute_command_success(self, mock_run):
         """Test successful command execution."""
@@ -134,6 +328,22 @@ class TestSSHOperations:
         assert stdout == "Hello World"
         assert stderr == ""
     
+    @patch('subprocess.run')
+    def test_execute_command_discard_output(self, mock_run):
+        """Test return-code-only calls send output to /dev/null."""
+        mock_run.return_value = subprocess.CompletedProcess([], 1)
+        
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.execute_command("false", discard_output=True) == (1, "", "")
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["stdout"] is subprocess.DEVNULL
+        assert kwargs["stderr"] is subprocess.DEVNULL
+        assert "capture_output" not in kwargs
+        
+        ssh_ops.check_setup_complete()
+        assert mock_run.call_args.kwargs["stdout"] is subprocess.DEVNULL
+    
     @patch('subprocess.run')
     def test_execute_command_failure(self, mock_run):
         """Test failed command execution."""
@@ -183,6 +393,67 @@ class TestSSHOperations:
         
         assert exit_code == 130
     
+    def test_execute_many_one_session(self):
+        """Test several commands run in one remote shell with separated results."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        run = subprocess.run
+        
+        # Run the generated script with a local bash instead of over ssh
+        with patch('subprocess.run', side_effect=lambda cmd, **kw: run(["bash", "-s"], **kw)) as mock_run:
+            results = ssh_ops.execute_many([
+                "echo hi",
+                "printf 'no newline'",
+                "echo oops >&2; exit 3",
+                "cat",
+                "printf 'a\\n\\n'",
+            ])
+        
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][-1] == "bash -s"
+        assert results == [
+            (0, "hi\n", ""),
+            (0, "no newline", ""),
+            (3, "", "oops\n"),
+            (0, "", ""),
+            (0, "a\n\n", ""),
+        ]
+    
+    @patch('subprocess.run')
+    def test_execute_many_connection_failure(self, mock_run):
+        """Test commands that never ran report the ssh exit status."""
+        mock_run.return_value = Mock(returncode=255, stdout="", stderr="Connection refused\n")
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.execute_many(["true", "true"]) == [
+            (255, "", "Connection refused\n"),
+            (255, "", ""),
+        ]
+    
+    def test_execute_command_output_encoding(self):
+        """Test output is decoded leniently, or returned raw without an encoding."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        command = "printf 'caf\\303\\251 \\377\\n'; printf '\\033[1m' >&2"
+        
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            assert ssh_ops.execute_command(command) == (0, "café \ufffd\n", "\x1b[1m")
+            assert ssh_ops.execute_command(command, encoding=None) == (0, b"caf\xc3\xa9 \xff\n", b"\x1b[1m")
+            assert ssh_ops.execute_command("true", encoding=None) == (0, b"", b"")
+            assert ssh_ops.execute_command(command, discard_output=True) == (0, "", "")
+    
+    @patch('subprocess.run')
+    def test_execute_command_spawn_stays_on_vfork_path(self, mock_run):
+        """Test commands spawn without options that force a full fork."""
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        ssh_ops.execute_command("uptime")
+        ssh_ops.test_connection()
+        
+        for args, kwargs in mock_run.call_args_list:
+            assert args[0][0] == _SSH
+            assert not {"preexec_fn", "start_new_session", "user", "group", "extra_groups"} & kwargs.keys()
+            assert kwargs.get("close_fds", True) is True
+    
     @patch('subprocess.run')
     def test_copy_file_success(self, mock_run):
         """Test successful file copy."""
@@ -193,13 +464,55 @@ class TestSSHOperations:
         
         assert result is True
         
-        # Verify SCP command was called correctly
+        # Verify SFTP command was called correctly
         args = mock_run.call_args[0][0]
-        assert args[0] == "scp"
-        assert "/local/file" in args
-        assert "root@192.168.1.1:/remote/file" in args
+        assert args[:3] == [_SFTP, "-b", "-"]
+        assert args[-1] == "root@192.168.1.1"
         assert "-i" in args
         assert "/path/to/key" in args
+        assert mock_run.call_args.kwargs["input"] == 'put "/local/file" "/remote/file"\n'
+    
+    @patch('subprocess.run')
+    def test_copy_files_one_session(self, mock_run, tmp_path):
+        """Test several files share one sftp batch, compressed only when worthwhile."""
+        mock_run.return_value = Mock(returncode=0)
+        small = tmp_path / "app.py"
+        small.write_text("print('hi')")
+        archive = tmp_path / "assets.tar.gz"
+        archive.write_bytes(b"x" * 100_000)
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.copy_files_to_remote([
+            (str(small), "/app/app.py"),
+            (str(archive), '/app/we"ird [1].gz'),
+        ]) is True
+        
+        mock_run.assert_called_once()
+        assert "-C" not in mock_run.call_args[0][0]
+        batch = mock_run.call_args.kwargs["input"].splitlines()
+        assert batch == [
+            f'put "{small}" "/app/app.py"',
+            f'put "{archive}" "/app/we\\"ird \\[1\\].gz"',
+        ]
+        
+        source = tmp_path / "bundle.js"
+        source.write_text("x" * 100_000)
+        ssh_ops.copy_files_to_remote([(str(source), "/app/bundle.js")])
+        assert "-C" in mock_run.call_args[0][0]
+    
+    @patch('subprocess.run')
+    def test_copy_file_shares_ssh_master(self, mock_run):
+        """Test file copies multiplex over the same master connection as ssh."""
+        mock_run.return_value = Mock(returncode=0)
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        ssh_ops.copy_file_to_remote("/local/file", "/remote/file")
+        ssh_ops.execute_command("true")
+        
+        sftp_args, ssh_args = (c[0][0] for c in mock_run.call_args_list)
+        control = ssh_ops._control_options()
+        for args in (sftp_args, ssh_args):
+            assert any(args[i:i + len(control)] == control for i in range(len(args)))
     
     @patch('subprocess.run')
     def test_copy_file_failure(self, mock_run):
@@ -211,11 +524,47 @@ class TestSSHOperations:
         
         assert result is False
     
+    @patch('subprocess.run')
+    def test_write_files_single_tar_stream(self, mock_run):
+        """Test several files are sent as one tar archive over one session."""
+        import io
+        import tarfile
+        
+        mock_run.return_value = Mock(returncode=0)
+        ssh_ops = SSHOperations("192.168.1.1", user="claude-user")
+        
+        result = ssh_ops.write_files({
+            ".claude/.credentials.json": '{"token": "abc"}',
+            ".claude.json": "{}",
+            ".claude/settings.json": b'{"theme": "dark"}',
+        })
+        
+        assert result is True
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd[-2:] == ["claude-user@192.168.1.1", 'tar -xmf - -C "$HOME"']
+        
+        with tarfile.open(fileobj=io.BytesIO(mock_run.call_args.kwargs["input"])) as archive:
+            members = {m.name: m for m in archive.getmembers()}
+            assert all(not m.pax_headers for m in members.values())
+            assert set(members) == {".claude/.credentials.json", ".claude.json", ".claude/settings.json"}
+            assert members[".claude/.credentials.json"].mode == 0o600
+            assert archive.extractfile(".claude/.credentials.json").read() == b'{"token": "abc"}'
+            assert archive.extractfile(".claude/settings.json").read() == b'{"theme": "dark"}'
+    
+    @patch('subprocess.run')
+    def test_write_files_failure(self, mock_run):
+        """Test a failing remote tar is reported."""
+        mock_run.return_value = Mock(returncode=2)
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        assert ssh_ops.write_files({"a.txt": "a"}) is False
+    
     def test_get_instance_info_no_connection(self):
         """Test getting instance info when connection fails."""
         ssh_ops = SSHOperations("192.168.1.1")
         
-        with patch.object(ssh_ops, 'test_connection', return_value=False):
+        with patch.object(ssh_ops, 'execute_command', return_value=(255, "", "Connection refused")):
             info = ssh_ops.get_instance_info()
             
             assert info["ip"] == "192.168.1.1"
@@ -227,21 +576,28 @@ class TestSSHOperations:
         """Test getting instance info with successful connection."""
         ssh_ops = SSHOperations("192.168.1.1")
         
-        with patch.object(ssh_ops, 'test_connection', return_value=True), \
-             patch.object(ssh_ops, 'execute_command') as mock_exec:
-            
-            # Mock setup complete check
-            mock_exec.side_effect = [
-                (0, "", ""),  # setup complete
-                (0, "Linux host 5.4.0\nload average: 0.1", "")  # system info
-            ]
+        with patch.object(ssh_ops, 'execute_command') as mock_exec:
+            mock_exec.return_value = (
+                0, "__CONN_OK__\n__SETUP_OK__\nLinux host 5.4.0\nload average: 0.1\n", ""
+            )
             
             info = ssh_ops.get_instance_info()
             
             assert info["connection_available"] is True
             assert info["setup_complete"] is True
-            assert "kernel" in info["system_info"]
-            assert "uptime" in info["system_info"]
+            assert info["system_info"] == {"kernel": "Linux host 5.4.0", "uptime": "load average: 0.1"}
+            mock_exec.assert_called_once_with(INSTANCE_INFO_COMMAND, timeout=10)
+    
+    def test_get_instance_info_setup_running(self):
+        """Test a reachable instance still being set up."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch.object(ssh_ops, 'execute_command', return_value=(0, "__CONN_OK__\n__SETUP_NO__\n", "")):
+            info = ssh_ops.get_instance_info()
+        
+        assert info["connection_available"] is True
+        assert info["setup_complete"] is False
+        assert info["system_info"] == {}
 
 
 class TestSSHSessionManager:
@@ -266,6 +622,30 @@ class TestSSHSessionManager:
         
         assert session1 is session2
     
+    def test_get_session_concurrent_callers_share(self):
+        """Test threads racing to create a session all get the same one."""
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+        import time
+        
+        manager = SSHSessionManager()
+        start = threading.Barrier(8)
+        init = SSHOperations.__init__
+        
+        def slow_init(self, *args, **kwargs):
+            time.sleep(0.01)
+            init(self, *args, **kwargs)
+        
+        def get():
+            start.wait()
+            return manager.get_session("192.168.1.1")
+        
+        with patch.object(SSHOperations, '__init__', slow_init):
+            with ThreadPoolExecutor(8) as pool:
+                sessions = list(pool.map(lambda _: get(), range(8)))
+        
+        assert all(session is sessions[0] for session in sessions)
+    
     def test_get_session_different_user(self):
         """Test getting session with different user creates new instance."""
         manager = SSHSessionManager()
@@ -300,4 +680,75 @@ class TestSSHSessionManager:
         session4 = manager.get_session("192.168.1.2")
         
         assert session1 is not session3
-        assert session2 is not session4
\ No newline at end of file
+        assert session2 is not session4
+    
+    @pytest.mark.asyncio
+    async def test_gather_runs_sessions_concurrently(self, tmp_path):
+        """Test commands on different sessions overlap instead of running in turn."""
+        manager = SSHSessionManager()
+        first = manager.get_session("192.168.1.1")
+        second = manager.get_session("192.168.1.2")
+        flag = tmp_path / "flag"
+        
+        # Run locally: the first command only finishes once the second has run
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            results = await manager.gather([
+                (first, f"while [ ! -e {flag} ]; do sleep 0.01; done; echo first"),
+                (second, f"touch {flag}; echo second >&2; exit 4"),
+            ], timeout=10)
+        
+        assert results == [(0, "first\n", ""), (4, "", "second\n")]
+    
+    def test_execute_command_streaming(self, tmp_path):
+        """Test lines reach the callbacks while the command is still running."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        stdout, stderr = [], []
+        
+        def on_stdout(line):
+            stdout.append(line)
+            if line == "first\n":
+                # The command only finishes once it sees this file
+                flag.touch()
+        
+        flag = tmp_path / "flag"
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            return_code = ssh_ops.execute_command_streaming(
+                f"echo first; while [ ! -e {flag} ]; do sleep 0.01; done; echo warn >&2; printf last; exit 2",
+                on_stdout,
+                stderr.append,
+                timeout=10
+            )
+        
+        assert return_code == 2
+        assert stdout == ["first\n", "last"]
+        assert stderr == ["warn\n"]
+    
+    def test_execute_command_streaming_invalid_utf8(self):
+        """Test undecodable output is replaced instead of stalling the reader."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        stdout = []
+        
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            return_code = ssh_ops.execute_command_streaming(
+                "printf 'ok\\n\\377\\n'", stdout.append, timeout=2
+            )
+        
+        assert return_code == 0
+        assert stdout == ["ok\n", "\ufffd\n"]
+    
+    def test_execute_command_streaming_timeout(self):
+        """Test a streaming command past its timeout is killed and reported."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            with pytest.raises(SSHError, match="timed out"):
+                ssh_ops.execute_command_streaming("echo start; sleep 5", print, timeout=0.2)
+    
+    @pytest.mark.asyncio
+    async def test_execute_command_async_timeout(self):
+        """Test a command past its timeout is killed and reported."""
+        ssh_ops = SSHOperations("192.168.1.1")
+        
+        with patch.object(SSHOperations, '_build_ssh_command', lambda self, command: ["sh", "-c", command]):
+            with pytest.raises(SSHError, match="timed out"):
+                await ssh_ops.execute_command_async("sleep 5", timeout=0.2)
\ No newline at end of file